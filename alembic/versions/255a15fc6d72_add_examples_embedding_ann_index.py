@@ -0,0 +1,35 @@
+"""Add HNSW index on examples.embedding
+
+Revision ID: 255a15fc6d72
+Revises:
+Create Date: 2026-10-16 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '255a15fc6d72'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Default ANN index for cosine-distance search. To switch to IVFFlat or tune
+    # build parameters use: python app/scripts/vector_index/main.py rebuild --method ivfflat
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # The schema is created by app/scripts/initial_data (create_all), which also creates this
+    # index. On a database where it has not run yet there is nothing to index.
+    if not sa.inspect(op.get_bind()).has_table("examples"):
+        return
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_examples_embedding_hnsw "
+        "ON examples USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_examples_embedding_hnsw")
@@ -0,0 +1,38 @@
+"""Add embedding_cache table
+
+Revision ID: 42d5ac5eea35
+Revises: 255a15fc6d72
+Create Date: 2026-10-16 11:40:07.813554
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision = '42d5ac5eea35'
+down_revision = '255a15fc6d72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The table is also declared on EmbeddingCacheEntry, so create_all (app/scripts/initial_data)
+    # may have created it already
+    if sa.inspect(op.get_bind()).has_table('embedding_cache'):
+        return
+    op.create_table(
+        'embedding_cache',
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('text_hash', sa.String(), nullable=False),
+        sa.Column('embedding', pgvector.sqlalchemy.Vector(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('model', 'text_hash'),
+    )
+    op.create_index(op.f('ix_embedding_cache_created_at'), 'embedding_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_embedding_cache_created_at'), table_name='embedding_cache')
+    op.drop_table('embedding_cache')
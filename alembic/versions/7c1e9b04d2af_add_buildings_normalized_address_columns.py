@@ -0,0 +1,79 @@
+"""Add normalized address columns and trigram index on buildings
+
+Revision ID: 7c1e9b04d2af
+Revises: 42d5ac5eea35
+Create Date: 2026-10-16 14:05:51.226410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e9b04d2af'
+down_revision = '42d5ac5eea35'
+branch_labels = None
+depends_on = None
+
+
+# Same expressions as app.db_models.services (copied: migrations must not change with the model)
+STREET_NAME_NORM_SQL = (
+    "btrim(regexp_replace(regexp_replace(regexp_replace(regexp_replace(regexp_replace("
+    "translate(lower(street_name), 'ёєэыіїйґъь''’ʼ`', 'еееииииг'), "
+    "'[.,;:\"«»()]', ' ', 'g'), "
+    "'(^|\\s)(вулиця|вул|улица|ул|проспект|просп|пр|пр-т|пр-кт|площа|пл|площадь|бульвар|бул|б-р|"
+    "провулок|пров|переулок|пер|узвиз|спуск|тупик|шосе|шоссе|набережна|набережная|street|st|avenue|ave)"
+    "(?=\\s|$)', ' ', 'g'), "
+    "'(ая|яя)(?=\\s|$)', 'а', 'g'), "
+    "'ои(?=\\s|$)', 'ии', 'g'), "
+    "'\\s+', ' ', 'g'))"
+)
+
+HOUSE_NUMBER_NORM_SQL = (
+    "translate(regexp_replace(lower(house_number), '[\\s-]', '', 'g'), 'abvgdek', 'абвгдек')"
+)
+
+
+def upgrade() -> None:
+    # The columns and indexes are also declared on Building, so create_all (app/scripts/initial_data)
+    # may have created them already; a database without buildings gets them from create_all
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('buildings'):
+        return
+    columns = {column['name'] for column in inspector.get_columns('buildings')}
+    indexes = {index['name'] for index in inspector.get_indexes('buildings')}
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    if 'street_name_norm' not in columns:
+        op.add_column(
+            'buildings',
+            sa.Column('street_name_norm', sa.Text(), sa.Computed(STREET_NAME_NORM_SQL, persisted=True)),
+        )
+    if 'house_number_norm' not in columns:
+        op.add_column(
+            'buildings',
+            sa.Column('house_number_norm', sa.Text(), sa.Computed(HOUSE_NUMBER_NORM_SQL, persisted=True)),
+        )
+    if 'ix_buildings_street_name_norm_trgm' not in indexes:
+        op.create_index(
+            'ix_buildings_street_name_norm_trgm',
+            'buildings',
+            ['street_name_norm'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'street_name_norm': 'gin_trgm_ops'},
+        )
+    if 'ix_buildings_city_street_house_norm' not in indexes:
+        op.create_index(
+            'ix_buildings_city_street_house_norm',
+            'buildings',
+            ['city', 'street_name_norm', 'house_number_norm'],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_buildings_city_street_house_norm', table_name='buildings')
+    op.drop_index('ix_buildings_street_name_norm_trgm', table_name='buildings')
+    op.drop_column('buildings', 'house_number_norm')
+    op.drop_column('buildings', 'street_name_norm')
@@ -0,0 +1,86 @@
+"""Align buildings.street_name_norm with the gazetteer street key
+
+Revision ID: b3d17e5a90c4
+Revises: 7c1e9b04d2af
+Create Date: 2026-10-16 21:02:14.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d17e5a90c4'
+down_revision = '7c1e9b04d2af'
+branch_labels = None
+depends_on = None
+
+
+# Same expression as app.db_models.services (copied: migrations must not change with the model).
+# Also drops place words ("м.", "Львів", "обл.") and dashes around words, like street_key().
+STREET_NAME_NORM_SQL = (
+    "btrim(regexp_replace(regexp_replace(regexp_replace(translate("
+    "regexp_replace(regexp_replace(regexp_replace(regexp_replace(lower(street_name), "
+    "'[.,;:\"«»()]', ' ', 'g'), "
+    "'(^|\\s)-+', '\\1', 'g'), "
+    "'-+(\\s|$)', '\\1', 'g'), "
+    "'(^|\\s)(вулиця|вул|улица|ул|проспект|просп|пр|пр-т|пр-кт|площа|пл|площадь|бульвар|бул|б-р|"
+    "провулок|пров|переулок|пер|узвіз|спуск|тупик|шосе|шоссе|набережна|набережная|street|st|avenue|ave|"
+    "україна|украина|львів|львов|місто|город|м|г|область|обл|район|р-н)"
+    "(?=\\s|$)', ' ', 'g'), "
+    "'ёєэыіїйґъь''’ʼ`', 'еееииииг'), "
+    "'(ая|яя)(?=\\s|$)', 'а', 'g'), "
+    "'ои(?=\\s|$)', 'ии', 'g'), "
+    "'\\s+', ' ', 'g'))"
+)
+
+# Expression of revision 7c1e9b04d2af, restored on downgrade
+PREVIOUS_STREET_NAME_NORM_SQL = (
+    "btrim(regexp_replace(regexp_replace(regexp_replace(regexp_replace(regexp_replace("
+    "translate(lower(street_name), 'ёєэыіїйґъь''’ʼ`', 'еееииииг'), "
+    "'[.,;:\"«»()]', ' ', 'g'), "
+    "'(^|\\s)(вулиця|вул|улица|ул|проспект|просп|пр|пр-т|пр-кт|площа|пл|площадь|бульвар|бул|б-р|"
+    "провулок|пров|переулок|пер|узвиз|спуск|тупик|шосе|шоссе|набережна|набережная|street|st|avenue|ave)"
+    "(?=\\s|$)', ' ', 'g'), "
+    "'(ая|яя)(?=\\s|$)', 'а', 'g'), "
+    "'ои(?=\\s|$)', 'ии', 'g'), "
+    "'\\s+', ' ', 'g'))"
+)
+
+
+def _replace_street_name_norm(expression: str) -> None:
+    # A generation expression cannot be altered in place (before Postgres 17): drop the column
+    # with its indexes and add it again, Postgres recomputes it for every row
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('buildings'):
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_buildings_city_street_house_norm")
+    op.execute("DROP INDEX IF EXISTS ix_buildings_street_name_norm_trgm")
+    op.execute("ALTER TABLE buildings DROP COLUMN IF EXISTS street_name_norm")
+    op.add_column(
+        'buildings',
+        sa.Column('street_name_norm', sa.Text(), sa.Computed(expression, persisted=True)),
+    )
+    op.create_index(
+        'ix_buildings_street_name_norm_trgm',
+        'buildings',
+        ['street_name_norm'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'street_name_norm': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_buildings_city_street_house_norm',
+        'buildings',
+        ['city', 'street_name_norm', 'house_number_norm'],
+        unique=False,
+    )
+
+
+def upgrade() -> None:
+    _replace_street_name_norm(STREET_NAME_NORM_SQL)
+
+
+def downgrade() -> None:
+    _replace_street_name_norm(PREVIOUS_STREET_NAME_NORM_SQL)
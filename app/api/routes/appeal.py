@@ -1,9 +1,27 @@
+import json
+from typing import AsyncIterator
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
+from app.core.logging import get_logger
 from app.schemas.appeal import AppealRequest, AppealResponse
-from app.services.appeal import generate_appeal_text
+from app.services.appeal import generate_appeal_text, stream_appeal_text
 
 router = APIRouter(prefix="/appeal", tags=["appeal"])
+logger = get_logger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Disable proxy buffering (nginx), otherwise tokens arrive in one piece
+    "X-Accel-Buffering": "no",
+}
+
+
+def _sse_event(data: dict, event: str | None = None) -> str:
+    """Format one server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
 @router.post("/generate", response_model=AppealResponse)
@@ -21,3 +39,27 @@ async def generate_appeal(request: AppealRequest) -> AppealResponse:
             status_code=500,
             detail=f"Failed to generate appeal: {str(e)}"
         )
+
+
+@router.post("/generate/stream")
+async def generate_appeal_stream(request: AppealRequest) -> StreamingResponse:
+    """
+    Streaming version of /appeal/generate (server-sent events).
+
+    Emits `data: {"delta": "..."}` events as the LLM produces tokens, then
+    `event: done` with the full letter, or `event: error` if generation fails.
+    """
+    async def events() -> AsyncIterator[str]:
+        chunks = []
+        try:
+            async for chunk in stream_appeal_text(request):
+                chunks.append(chunk)
+                yield _sse_event({"delta": chunk})
+        except Exception as e:
+            logger.error(f"Appeal streaming error: {str(e)}")
+            yield _sse_event({"detail": f"Failed to generate appeal: {str(e)}"}, event="error")
+            return
+
+        yield _sse_event({"letter_text": "".join(chunks).strip()}, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -4,6 +4,7 @@ from sqlmodel import Session
 from app.api.deps import get_db
 from app.core.logging import get_logger
 from app.schemas.problems import ProblemRequest, ProblemClassificationResponse
+from app.schemas.problems_schemas import BatchProblemRequest, BatchClassificationResponse
 from app.services.classifier.classifier_factory import get_classifier
 
 router = APIRouter(prefix="/classify", tags=["classification"])
@@ -19,9 +20,28 @@ async def classify_problem(
     logger.info(f"Classifying problem, text length: {len(request.problem_text)} characters")
     try:
         classifier = get_classifier(db)
-        result = classifier.classify_with_category(request.problem_text)
+        result = await classifier.aclassify_with_category(request.problem_text)
         logger.info(f"Classification result: category={result.get('category_name')}, confidence={result.get('confidence', 0.0):.2f}")
         return ProblemClassificationResponse(**result)
     except Exception as e:
         logger.error(f"Classification error: {str(e)}")
         raise HTTPException(500, f"Classification error: {str(e)}")
+
+
+
+@router.post("/batch", response_model=BatchClassificationResponse)
+async def classify_problems_batch(
+    request: BatchProblemRequest,
+    db: Session = Depends(get_db)
+) -> BatchClassificationResponse:
+    """Classify several problems with one embeddings call and one neighbor search"""
+    logger.info(f"Classifying batch of {len(request.problem_texts)} problems")
+    try:
+        classifier = get_classifier(db)
+        results = await classifier.aclassify_with_category_batch(request.problem_texts)
+        return BatchClassificationResponse(
+            results=[ProblemClassificationResponse(**result) for result in results]
+        )
+    except Exception as e:
+        logger.error(f"Batch classification error: {str(e)}")
+        raise HTTPException(500, f"Classification error: {str(e)}")
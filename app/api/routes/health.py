@@ -1,9 +1,15 @@
-from fastapi import APIRouter
+from datetime import datetime
+from fastapi import APIRouter, Response, status
 from pydantic import BaseModel
 from typing import Any
 
 from app.core.logging import get_logger
-from app.services.health_check import get_health_check_service
+from app.llm.client import get_embedding_cache_stats
+from app.llm.completion_cache import get_completion_cache_stats
+from app.services.classifier.hybrid_classifier import get_hedging_stats
+from app.services.classifier.result_cache import get_classification_cache_stats
+from app.services.health_check import get_health_prober
+from app.services.transcript_store import get_transcript_store_stats
 
 router = APIRouter(prefix="/health", tags=["health"])
 logger = get_logger(__name__)
@@ -13,45 +19,63 @@ class HealthCheckResponse(BaseModel):
     """Health check response"""
     status: str
     services: dict[str, Any]
+    # When the background prober last ran the checks (None until the first probe finishes)
+    checked_at: datetime | None = None
+    age_seconds: float | None = None
 
 
 @router.get("/ping")
+@router.get("/live")
 async def ping() -> dict:
     """
-    Simple ping endpoint for basic liveness check
+    Liveness: the process is up and serving requests
     
     Returns immediately without any dependencies
     """
     return {"status": "ok"}
 
 
+@router.get("/ready", responses={503: {"description": "Not ready"}})
+async def readiness(response: Response) -> dict:
+    """
+    Readiness: the last background probe is recent and the application is not unhealthy
+    (database reachable, CodeMie not completely unavailable). Answers 503 otherwise.
+    """
+    prober = get_health_prober()
+    state = prober.state
+    if state is None or prober.is_stale() or state["status"] == "unhealthy":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "not_ready" if state is None else state["status"], "stale": prober.is_stale()}
+    return {"status": state["status"], "stale": False}
+
+
 @router.get("/", response_model=HealthCheckResponse)
 async def health_check() -> HealthCheckResponse:
     """
-    Detailed health check endpoint
+    Detailed health check endpoint, served from the background prober's cached state
     
-    Checks:
+    Checks (every HEALTH_PROBE_INTERVAL_SECONDS, concurrently):
     - Database connectivity and pgvector extension
-    - CodeMie LLM API (text generation)
-    - CodeMie Embeddings API (vector embeddings)
-    - CodeMie Transcription API (audio to text)
+    - CodeMie LLM and Embeddings API (models.list or a max_tokens=1 probe, see HEALTH_PROBE_MODE)
+    - CodeMie Transcription client
+    Plus, live:
+    - Embedding, classification, LLM completion and transcript cache hit/miss counters
+    - Hedged hybrid LLM fallback counters
     """
-    logger.info("Health check requested")
-    
-    # Get health check service
-    health_service = get_health_check_service()
-    
-    # Check all services
-    db_status = health_service.check_database()
-    codemie_status = health_service.check_codemie_api()
-    
-    # Determine overall status
-    overall_status = health_service.get_overall_status(db_status, codemie_status)
-    
+    prober = get_health_prober()
+    state = prober.state
+    age = prober.age_seconds()
+
     return HealthCheckResponse(
-        status=overall_status,
+        status=state["status"] if state else "starting",
         services={
-            "database": db_status,
-            "codemie_api": codemie_status
-        }
-    )
\ No newline at end of file
+            **(state["services"] if state else {}),
+            "embedding_cache": get_embedding_cache_stats(),
+            "classification_cache": get_classification_cache_stats(),
+            "llm_cache": get_completion_cache_stats(),
+            "hybrid_llm_hedging": get_hedging_stats(),
+            "transcript_cache": get_transcript_store_stats()
+        },
+        checked_at=state["checked_at"] if state else None,
+        age_seconds=round(age, 1) if age is not None else None,
+    )
@@ -3,7 +3,10 @@ End-to-end orchestration API route.
 Provides a single endpoint for the complete flow:
 problem classification -> service resolution -> appeal generation
 """
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
 from app.api.deps import get_db
@@ -55,3 +58,31 @@ async def solve_problem(
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+
+
+@router.post("/stream")
+async def solve_problem_stream(
+    request: OrchestrationRequest,
+    db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Streaming version of /solve: newline-delimited JSON, one event per line.
+
+    Events (see OrchestrationEvent):
+        - classification: Problem classification, as soon as it is ready
+        - service: Responsible service (right after classification)
+        - appeal_delta: Appeal letter text chunks, generated concurrently
+        - done: Complete OrchestrationResponse
+        - error: Failed stage, status_code and detail (last event)
+    """
+    service = OrchestrationService(db)
+
+    async def lines() -> AsyncIterator[str]:
+        async for event in service.stream_complete_flow(request):
+            yield event.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,30 +1,188 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from typing import AsyncIterator, Callable
 
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from starlette.types import Receive, Scope, Send
+
+from app.api.deps import get_db
 from app.core.logging import get_logger
-from app.schemas.voice import VoiceTranscriptionResponse
-from app.services.voice import get_voice_service
+from app.schemas.voice import VoiceStreamEvent, VoiceTranscriptionResponse
+from app.services.orchestrator import OrchestrationService
+from app.services.voice import VoiceStreamSession, get_voice_service
 from app.utils.security import sanitize_filename
+from app.utils.uploads import AudioUploadError, receive_audio_upload
 
 router = APIRouter(prefix="/voice", tags=["voice"])
 logger = get_logger(__name__)
 
+ALLOWED_AUDIO_TYPES = ["audio/mpeg", "audio/mp3", "audio/wav", "audio/webm", "audio/ogg", "audio/m4a", "audio/mp4", "audio/x-m4a"]
+
+# The body is parsed by receive_audio_upload (streaming, size-limited), documented here for OpenAPI
+AUDIO_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["audio"],
+                    "properties": {
+                        "audio": {
+                            "type": "string",
+                            "format": "binary",
+                            "description": "Audio file (mp3, wav, webm, m4a, x-m4a, mp4, ogg)",
+                        }
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that runs `close` however the response ends: finished, failed, or the client
+    gone before the first chunk (Starlette then skips `background` and never starts the generator)
+    """
+
+    def __init__(self, content, close: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self.close = close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.close()
+
 
-@router.post("/transcribe", response_model=VoiceTranscriptionResponse)
-async def transcribe_voice(
-    audio: UploadFile = File(..., description="Audio file (mp3, wav, webm, m4a, x-m4a, mp4, ogg)")
-) -> VoiceTranscriptionResponse:
+@router.post("/transcribe", response_model=VoiceTranscriptionResponse, openapi_extra=AUDIO_UPLOAD_OPENAPI)
+async def transcribe_voice(request: Request) -> VoiceTranscriptionResponse:
     """Transcribe audio to Ukrainian text for user editing"""
+    try:
+        audio = await receive_audio_upload(request, field_name="audio", allowed_types=ALLOWED_AUDIO_TYPES)
+    except AudioUploadError as e:
+        logger.warning(f"Audio upload rejected: {str(e)}")
+        raise HTTPException(e.status_code, str(e))
+
     safe_filename = sanitize_filename(audio.filename or "unknown")
-    logger.info(f"Transcribing audio file: {safe_filename}, type: {audio.content_type}")
-    allowed_types = ["audio/mpeg", "audio/mp3", "audio/wav", "audio/webm", "audio/ogg", "audio/m4a", "audio/mp4", "audio/x-m4a"]
-    if audio.content_type not in allowed_types:
-        raise HTTPException(400, f"Unsupported format: {audio.content_type}")
-    
+    logger.info(
+        f"Transcribing audio file: {safe_filename}, type: {audio.declared_type} "
+        f"(detected {audio.mime_type}), size: {audio.size} bytes"
+    )
+
     try:
         voice_service = get_voice_service()
-        transcription = voice_service.transcribe_audio(audio.file, audio.content_type or "audio/webm")
+        transcription = await voice_service.atranscribe_audio(audio.file, audio.mime_type, audio.sha256)
         logger.info(f"Transcription successful, length: {len(transcription)} characters")
         return VoiceTranscriptionResponse(transcription=transcription, transcription_successful=True)
+    except TimeoutError:
+        logger.error("Transcription timed out")
+        raise HTTPException(504, "Transcription timed out")
     except Exception as e:
         logger.error(f"Transcription failed: {str(e)}")
         raise HTTPException(500, f"Transcription failed: {str(e)}")
+    finally:
+        audio.close()
+
+
+@router.post("/solve", openapi_extra=AUDIO_UPLOAD_OPENAPI)
+async def solve_voice(request: Request, db: Session = Depends(get_db)) -> StreamingResponse:
+    """
+    Voice-to-solution in one call: newline-delimited JSON, one event per line.
+
+    Events (see OrchestrationEvent):
+        - transcription: Transcript of the recording
+        - user_info: Name, address and phone found in the transcript (null when not dictated)
+        - classification, service, appeal_delta, done: as in /solve/stream, for the transcript
+        - error: Failed stage, status_code and detail (last event)
+    """
+    try:
+        audio = await receive_audio_upload(request, field_name="audio", allowed_types=ALLOWED_AUDIO_TYPES)
+    except AudioUploadError as e:
+        logger.warning(f"Audio upload rejected: {str(e)}")
+        raise HTTPException(e.status_code, str(e))
+
+    logger.info(f"Voice solve: {sanitize_filename(audio.filename or 'unknown')}, {audio.mime_type}, {audio.size} bytes")
+    try:
+        service = OrchestrationService(db)
+    except Exception:
+        audio.close()
+        raise
+
+    async def lines() -> AsyncIterator[str]:
+        async for event in service.stream_voice_flow(audio.file, audio.mime_type, audio.sha256):
+            yield event.model_dump_json() + "\n"
+
+    # The upload lives until the response is done, not until the generator body happens to run
+    return ClosingStreamingResponse(
+        lines(),
+        close=audio.close,
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream")
+async def stream_voice(websocket: WebSocket, sample_rate: int = 16000, channels: int = 1) -> None:
+    """
+    Live transcription while the user speaks.
+
+    Client -> server: binary frames of 16-bit little-endian PCM (`sample_rate`, `channels`
+    query parameters), then a text frame "end" when recording stops.
+    Server -> client: JSON VoiceStreamEvent messages:
+        - segment: a speech segment closed at a pause was transcribed, with the transcript so far
+        - error: a segment failed (the stream continues) or the stream was rejected
+        - final: full transcript after "end", then the server closes the socket
+    """
+    await websocket.accept()
+    if not 8000 <= sample_rate <= 48000 or channels not in (1, 2):
+        await websocket.send_text(VoiceStreamEvent(
+            event="error", detail="Unsupported audio format: expected PCM16, 8-48 kHz, mono or stereo"
+        ).model_dump_json())
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+        return
+
+    async def send(event: VoiceStreamEvent) -> None:
+        try:
+            await websocket.send_text(event.model_dump_json())
+        except (RuntimeError, OSError) as e:
+            # The client closed the socket while events were pending: same as a disconnect
+            raise WebSocketDisconnect(status.WS_1006_ABNORMAL_CLOSURE) from e
+
+    async def close(code: int = status.WS_1000_NORMAL_CLOSURE) -> None:
+        try:
+            await websocket.close(code=code)
+        except (RuntimeError, OSError) as e:
+            raise WebSocketDisconnect(status.WS_1006_ABNORMAL_CLOSURE) from e
+
+    session = VoiceStreamSession(get_voice_service(), sample_rate, channels, send)
+    logger.info(f"Voice stream started: {sample_rate} Hz, {channels} channel(s)")
+    try:
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+                if message.get("bytes"):
+                    session.feed(message["bytes"])
+                elif (message.get("text") or "").strip().lower() == "end":
+                    break
+
+            transcript = await session.finish()
+            logger.info(
+                f"Voice stream finished: {session.segmenter.received_seconds:.1f}s, {len(transcript)} characters"
+            )
+            await session.send(VoiceStreamEvent(event="final", transcript=transcript))
+            await close()
+        except ValueError as e:
+            logger.warning(f"Voice stream rejected: {str(e)}")
+            await session.send(VoiceStreamEvent(event="error", transcript=session.transcript(), detail=str(e)))
+            await close(status.WS_1009_MESSAGE_TOO_BIG)
+    except WebSocketDisconnect:
+        logger.info("Voice stream client disconnected")
+    finally:
+        # Segments still in flight are cancelled whichever way the stream ended
+        await session.aclose()
@@ -59,16 +59,126 @@ class Settings(BaseSettings):
     CODEMIE_EMBEDDING_MODEL: str = "codemie-text-embedding-ada-002"
     CODEMIE_TRANSCRIPTION_MODEL: str = "gemini-2.5-flash"
 
+    # Shared HTTP connection pool for LLM/embedding calls (created once at startup)
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    # Seconds; read/write/pool timeout and (shorter) connect timeout
+    LLM_HTTP_TIMEOUT: float = 60.0
+    LLM_HTTP_CONNECT_TIMEOUT: float = 5.0
+    LLM_MAX_RETRIES: int = 2
+
     CLASSIFIER_TYPE: Literal["knn", "llm", "hybrid"] = "knn"
     
     # Minimum confidence score (0.0 - 1.0). 
     # Used by 'hybrid' mode to decide when to fallback to LLM.
     CLASSIFIER_THRESHOLD: float = 0.4
+    # Hedged LLM fallback in 'hybrid' mode (async path): if the LLM has not answered within
+    # HYBRID_HEDGE_DELAY_SECONDS, a second identical call is started and the first answer wins.
+    # Lower delay = better tail latency, more duplicate (wasted) LLM calls. Off by default: every
+    # hedged fallback may cost a second LLM call. The fallback cannot start earlier than the k-NN
+    # vote, it needs the same neighbors as few-shot examples.
+    HYBRID_HEDGE_ENABLED: bool = False
+    HYBRID_HEDGE_DELAY_SECONDS: float = 2.0
 
     # TOP_K: Number of nearest neighbors for k-NN voting
     # Rationale: Changed from 7 to 3 after empirical testing on a balanced test set
     TOP_K: int = 3
 
+    # Maximum number of texts accepted by /classify/batch
+    CLASSIFY_BATCH_MAX_SIZE: int = 100
+    # LLM calls in flight at once for one /classify/batch request (CLASSIFIER_TYPE=llm)
+    CLASSIFY_BATCH_LLM_CONCURRENCY: int = 8
+
+    # Keep example embeddings in an in-process NumPy index instead of querying pgvector per request.
+    # The index is built at startup (or on first use) and dropped when the examples/categories version stamp
+    # changes (checked every CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS), then rebuilt on the next request.
+    KNN_INDEX_ENABLED: bool = False
+
+    # ANN index on examples.embedding (see alembic migrations and app/scripts/vector_index).
+    # Decides which pgvector search parameter is set before each neighbor query; "none" skips tuning.
+    VECTOR_INDEX_TYPE: Literal["none", "hnsw", "ivfflat"] = "hnsw"
+    # HNSW candidate list size at query time: higher = better recall, slower search (pgvector default: 40)
+    HNSW_EF_SEARCH: int = 40
+    # IVFFlat lists probed at query time: higher = better recall, slower search (pgvector default: 1)
+    IVFFLAT_PROBES: int = 10
+
+    # Building lookup for service routing:
+    # "gazetteer" - in-memory street index (trigrams + edit distance),
+    # "trigram" - one pg_trgm similarity query over buildings.street_name_norm, "like" - legacy LIKE query
+    BUILDING_LOOKUP_MODE: Literal["gazetteer", "trigram", "like"] = "gazetteer"
+    # Minimum street similarity (0.0 - 1.0) for a gazetteer or trigram match
+    BUILDING_MATCH_MIN_SCORE: float = 0.6
+    # How often the services/assignments/buildings version stamp is rechecked: the routing tables
+    # and the street gazetteer are rebuilt on the next request after a change
+    ROUTING_DATA_VERSION_CHECK_SECONDS: int = 60
+
+    # Embedding cache: bounded in-process LRU backed by the persistent `embedding_cache` table.
+    # Keyed by (embedding model, SHA-256 of the normalized text).
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ITEMS: int = 10_000
+    # 60 seconds * 60 minutes * 24 hours * 30 days = 30 days
+    EMBEDDING_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 30
+    EMBEDDING_CACHE_DB_ENABLED: bool = True
+    EMBEDDING_CACHE_DB_MAX_ROWS: int = 200_000
+
+    # LLM completion cache in SimpleLLM (opt-in), keyed by (model, temperature, prompt hash).
+    # Bypass per call with use_cache=False.
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_MAX_ITEMS: int = 2_000
+    # 60 seconds * 60 minutes * 24 hours = 1 day
+    LLM_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    # Optional SQLite file that keeps completions across restarts, e.g. "/tmp/llm_cache.sqlite3"
+    LLM_CACHE_SQLITE_PATH: str | None = None
+
+    # Classification result cache in front of classify_with_category.
+    # Keyed by normalized text, classifier type, TOP_K/threshold and a version stamp of examples/categories.
+    CLASSIFICATION_CACHE_ENABLED: bool = True
+    CLASSIFICATION_CACHE_MAX_ITEMS: int = 5_000
+    # 60 seconds * 60 minutes * 24 hours = 1 day
+    CLASSIFICATION_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    # How often the examples/categories version stamp is recomputed (data changes are picked up within this delay)
+    CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS: int = 60
+
+    # Voice uploads are streamed into a spooled temp file: in memory up to the spool size, then on disk.
+    # 20 MB is the provider limit for inline audio.
+    VOICE_UPLOAD_MAX_BYTES: int = 20 * 1024 * 1024
+    VOICE_UPLOAD_SPOOL_MAX_MEMORY: int = 1024 * 1024
+    # Transcriptions run in worker threads; the slots bound concurrent provider calls (and audio held in memory)
+    VOICE_MAX_CONCURRENT_TRANSCRIPTIONS: int = 4
+    VOICE_TRANSCRIPTION_TIMEOUT_SECONDS: float = 120.0
+    # Long-audio mode: 16-bit WAV recordings longer than VOICE_LONG_AUDIO_MIN_SECONDS are split at pauses
+    # into chunks of VOICE_CHUNK_MIN_SECONDS..VOICE_CHUNK_MAX_SECONDS and transcribed concurrently
+    VOICE_LONG_AUDIO_ENABLED: bool = True
+    VOICE_LONG_AUDIO_MIN_SECONDS: float = 45.0
+    VOICE_CHUNK_MIN_SECONDS: float = 15.0
+    VOICE_CHUNK_MAX_SECONDS: float = 30.0
+    # Chunks of one recording in flight at once (keep below VOICE_MAX_CONCURRENT_TRANSCRIPTIONS so one
+    # long recording leaves slots to other requests), and retries of a failed chunk
+    VOICE_CHUNK_CONCURRENCY: int = 2
+    VOICE_CHUNK_RETRIES: int = 1
+    # /voice/stream WebSocket: a segment is closed after VOICE_STREAM_PAUSE_SECONDS below VOICE_STREAM_SILENCE_RMS
+    # (PCM16 amplitude) once it is VOICE_STREAM_MIN_SEGMENT_SECONDS long, or at VOICE_CHUNK_MAX_SECONDS
+    VOICE_STREAM_MIN_SEGMENT_SECONDS: float = 3.0
+    VOICE_STREAM_PAUSE_SECONDS: float = 0.6
+    VOICE_STREAM_SILENCE_RMS: float = 300.0
+    VOICE_STREAM_MAX_SECONDS: float = 600.0
+    # Transcripts stored by (CODEMIE_TRANSCRIPTION_MODEL, SHA-256 of the audio): a re-uploaded recording is not
+    # sent to the provider again, and concurrent uploads of the same bytes share one in-flight call
+    TRANSCRIPT_CACHE_ENABLED: bool = True
+    TRANSCRIPT_CACHE_MAX_ITEMS: int = 1_000
+    # 60 seconds * 60 minutes = 1 hour
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 60 * 60
+
+    # /health serves the state of a background prober: database and CodeMie checks run concurrently
+    # every HEALTH_PROBE_INTERVAL_SECONDS. Probe mode: "models" - one models.list call (no tokens),
+    # "completion" - chat completion with max_tokens=1 and a one-word embedding
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 30.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 10.0
+    HEALTH_PROBE_MODE: Literal["models", "completion"] = "models"
+    # /health/ready fails when the last probe is older than this many intervals (prober stuck)
+    HEALTH_PROBE_STALE_INTERVALS: int = 3
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
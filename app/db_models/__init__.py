@@ -1,5 +1,6 @@
 from sqlmodel import SQLModel
 from app.db_models.classification import Category, Example
 from app.db_models.services import Service, Building, ServiceAssignment
+from app.db_models.cache import EmbeddingCacheEntry
 
-__all__ = ["SQLModel", "Category", "Example", "Service", "Building", "ServiceAssignment"]
+__all__ = ["SQLModel", "Category", "Example", "Service", "Building", "ServiceAssignment", "EmbeddingCacheEntry"]
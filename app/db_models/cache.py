@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+
+from pgvector.sqlalchemy import Vector
+from sqlmodel import Column, DateTime, Field, SQLModel
+
+
+class EmbeddingCacheEntry(SQLModel, table=True):
+    """Persistent embedding cache keyed by model and hash of the normalized text."""
+    __tablename__ = "embedding_cache"
+
+    model: str = Field(primary_key=True)
+    text_hash: str = Field(primary_key=True, description="SHA-256 of the normalized text")
+
+    embedding: list[float] = Field(sa_column=Column(Vector(), nullable=False))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True),
+    )
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Column, Computed, Index, Text, UniqueConstraint
 from sqlmodel import Field, SQLModel, Relationship
 
 
@@ -21,11 +21,44 @@ class Service(SQLModel, table=True):
     assignments: List["ServiceAssignment"] = Relationship(back_populates="service")
 
 
+# Normalized street name, the same as app.services.address.gazetteer.street_key() (tests/test_gazetteer.py
+# checks the pair on a shared list): lowercased, punctuation and dashes around words removed, street type
+# and place words dropped, then Ukrainian/Russian spellings and adjective endings folded.
+STREET_NAME_NORM_SQL = (
+    "btrim(regexp_replace(regexp_replace(regexp_replace(translate("
+    "regexp_replace(regexp_replace(regexp_replace(regexp_replace(lower(street_name), "
+    "'[.,;:\"«»()]', ' ', 'g'), "
+    "'(^|\\s)-+', '\\1', 'g'), "
+    "'-+(\\s|$)', '\\1', 'g'), "
+    "'(^|\\s)(вулиця|вул|улица|ул|проспект|просп|пр|пр-т|пр-кт|площа|пл|площадь|бульвар|бул|б-р|"
+    "провулок|пров|переулок|пер|узвіз|спуск|тупик|шосе|шоссе|набережна|набережная|street|st|avenue|ave|"
+    "україна|украина|львів|львов|місто|город|м|г|область|обл|район|р-н)"
+    "(?=\\s|$)', ' ', 'g'), "
+    "'ёєэыіїйґъь''’ʼ`', 'еееииииг'), "
+    "'(ая|яя)(?=\\s|$)', 'а', 'g'), "
+    "'ои(?=\\s|$)', 'ии', 'g'), "
+    "'\\s+', ' ', 'g'))"
+)
+
+# Normalized house number, same as gazetteer.normalize_house_number(): "10 Б" / "10-б" / "10b" -> "10б"
+HOUSE_NUMBER_NORM_SQL = (
+    "translate(regexp_replace(lower(house_number), '[\\s-]', '', 'g'), 'abvgdek', 'абвгдек')"
+)
+
+
 class Building(SQLModel, table=True):
     """Unique geographic object (house number on a street)."""
     __tablename__ = "buildings"
     __table_args__ = (
         UniqueConstraint("city", "street_name", "house_number", name="uq_building_address"),
+        # Trigram index for similarity-ranked street lookup (needs the pg_trgm extension)
+        Index(
+            "ix_buildings_street_name_norm_trgm",
+            "street_name_norm",
+            postgresql_using="gin",
+            postgresql_ops={"street_name_norm": "gin_trgm_ops"},
+        ),
+        Index("ix_buildings_city_street_house_norm", "city", "street_name_norm", "house_number_norm"),
     )
 
     building_id: Optional[int] = Field(default=None, primary_key=True)
@@ -37,6 +70,14 @@ class Building(SQLModel, table=True):
     street_name: str = Field(index=True, description="Street name")
     house_number: str = Field(description="House number (e.g., '12', '12А')")
 
+    # Generated by Postgres, never written by the application
+    street_name_norm: Optional[str] = Field(
+        default=None, sa_column=Column(Text, Computed(STREET_NAME_NORM_SQL, persisted=True))
+    )
+    house_number_norm: Optional[str] = Field(
+        default=None, sa_column=Column(Text, Computed(HOUSE_NUMBER_NORM_SQL, persisted=True))
+    )
+
     assignments: List["ServiceAssignment"] = Relationship(back_populates="building")
 
 
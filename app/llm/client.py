@@ -1,30 +1,43 @@
-from openai import OpenAI
-import google.generativeai as genai
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from openai import AsyncOpenAI, OpenAI
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+
 from app.core.config import settings
+from app.core.db import engine
+from app.core.logging import get_logger
+from app.db_models import EmbeddingCacheEntry
+from app.llm.completion_cache import completion_cache_key, get_completion_cache
+from app.llm.registry import get_provider_clients
+from app.utils.cache import TTLCache, normalized_text_hash
+
+logger = get_logger(__name__)
 
 
 def _create_openai_client() -> OpenAI:
     """
-    Create and configure OpenAI-compatible client for CodeMie
+    Get the shared OpenAI-compatible client for CodeMie (pooled connections)
     """
-    return OpenAI(
-        api_key=settings.CODEMIE_API_KEY,
-        base_url=settings.CODEMIE_API_BASE,
-    )
+    return get_provider_clients().openai
 
 
-def _create_genai_client():
+def _create_async_openai_client() -> AsyncOpenAI:
     """
-    Configure and return genai client for CodeMie endpoint
+    Get the shared async OpenAI-compatible client for CodeMie (pooled connections)
     """
-    genai.configure( 
-        api_key=settings.CODEMIE_API_KEY,
-        transport="rest",
-        client_options={
-            "api_endpoint": settings.CODEMIE_API_BASE
-        }
-    )
-    return genai
+    return get_provider_clients().async_openai
+
+
+class LLMResponse:
+    """LLM response with .content attribute"""
+
+    def __init__(self, text):
+        self.content = text
 
 
 class SimpleLLM:
@@ -32,34 +45,64 @@ class SimpleLLM:
     
     def __init__(self):
         self.client = _create_openai_client()
+        self.async_client = _create_async_openai_client()
         self.model = settings.CODEMIE_LLM_MODEL
     
-    def invoke(self, prompt: str):
-        """Invoke LLM with prompt and return Response object with .content attribute"""
+    def invoke(self, prompt: str, use_cache: bool = True) -> LLMResponse:
+        """
+        Invoke LLM with prompt and return Response object with .content attribute.
+        Served from the completion cache when LLM_CACHE_ENABLED, unless use_cache is False.
+        """
+        cache_key = self._cache_key(prompt, 0.0, use_cache)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return LLMResponse(cached)
+
         response = self.client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.0
         )
         
-        class Response:
-            def __init__(self, text):
-                self.content = text
-        
-        return Response(response.choices[0].message.content)
+        content = response.choices[0].message.content
+        self._store_cached(cache_key, content)
+        return LLMResponse(content)
+
+    async def ainvoke(self, prompt: str, use_cache: bool = True) -> LLMResponse:
+        """Async version of invoke, does not block the event loop"""
+        cache_key = self._cache_key(prompt, 0.0, use_cache)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return LLMResponse(cached)
+
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.0
+        )
+
+        content = response.choices[0].message.content
+        self._store_cached(cache_key, content)
+        return LLMResponse(content)
     
-    async def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
+    async def generate_text(self, prompt: str, temperature: float = 0.7, use_cache: bool = True) -> str:
         """
         Generate text based on prompt (async version).
         
         Args:
             prompt: Input prompt for text generation
             temperature: Sampling temperature (0.0 to 1.0)
+            use_cache: Set to False to bypass the completion cache for this call
             
         Returns:
             Generated text
         """
-        response = self.client.chat.completions.create(
+        cache_key = self._cache_key(prompt, temperature, use_cache)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        response = await self.async_client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=temperature
@@ -69,14 +112,62 @@ class SimpleLLM:
         if content is None:
             raise ValueError("LLM returned empty response")
         
+        self._store_cached(cache_key, content)
         return content
 
+    def _cache_key(self, prompt: str, temperature: float, use_cache: bool) -> str | None:
+        """Completion cache key, or None when caching is off for this call"""
+        if not use_cache or get_completion_cache() is None:
+            return None
+        return completion_cache_key(self.model, temperature, prompt)
+
+    @staticmethod
+    def _get_cached(cache_key: str | None) -> str | None:
+        if cache_key is None:
+            return None
+        return get_completion_cache().get(cache_key)
+
+    @staticmethod
+    def _store_cached(cache_key: str | None, content: str | None) -> None:
+        # Empty completions are provider errors, never cache them
+        if cache_key is not None and content:
+            get_completion_cache().set(cache_key, content)
+
+    async def astream(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """
+        Stream generated text as it is produced (provider stream=True mode).
+
+        Args:
+            prompt: Input prompt for text generation
+            temperature: Sampling temperature (0.0 to 1.0)
+
+        Yields:
+            Non-empty text deltas in generation order
+        """
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            # Release the pooled connection when the consumer stops early (client disconnect)
+            await stream.close()
+
 
 class SimpleEmbeddings:
     """Wrapper for embeddings via CodeMie"""
     
     def __init__(self):
         self.client = _create_openai_client()
+        self.async_client = _create_async_openai_client()
         self.model = settings.CODEMIE_EMBEDDING_MODEL
     
     def embed_query(self, text: str) -> list[float]:
@@ -87,22 +178,248 @@ class SimpleEmbeddings:
         )
         return response.data[0].embedding
 
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts in a single API call"""
+        if not texts:
+            return []
+
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=texts
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """Async version of embed_query"""
+        response = await self.async_client.embeddings.create(
+            model=self.model,
+            input=text
+        )
+        return response.data[0].embedding
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Async version of embed_documents"""
+        if not texts:
+            return []
+
+        response = await self.async_client.embeddings.create(
+            model=self.model,
+            input=texts
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+# Persistent tier is pruned (TTL + row limit) once per this many writes
+EMBEDDING_CACHE_PRUNE_EVERY = 500
+
+_embedding_memory_cache = TTLCache(
+    maxsize=settings.EMBEDDING_CACHE_MAX_ITEMS,
+    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+)
+_embedding_db_stats = {"hits": 0, "misses": 0, "errors": 0, "writes": 0}
+_embedding_db_stats_lock = threading.Lock()
+
+
+def _count_db_event(name: str, amount: int = 1) -> int:
+    with _embedding_db_stats_lock:
+        _embedding_db_stats[name] += amount
+        return _embedding_db_stats[name]
+
+
+def embedding_cache_key(text: str) -> str:
+    """SHA-256 of the text normalized for caching (Unicode NFC, collapsed whitespace, case-folded)"""
+    return normalized_text_hash(text)
+
+
+class CachedEmbeddings:
+    """
+    Two-tier cache around SimpleEmbeddings:
+    bounded in-process LRU first, then the persistent `embedding_cache` table, then the API.
+    """
+
+    def __init__(self, embeddings: SimpleEmbeddings):
+        self.embeddings = embeddings
+        self.client = embeddings.client
+        self.model = embeddings.model
+
+    def embed_query(self, text: str) -> list[float]:
+        """Generate embedding for text, reusing a cached one when available"""
+        return self.embed_documents([text])[0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for several texts.
+        Cached texts are served from memory or the database, the rest are embedded in one API call.
+        """
+        text_hashes, results = self._lookup_memory(texts)
+        missing = [text_hash for text_hash in dict.fromkeys(text_hashes) if text_hash not in results]
+        if missing:
+            results.update(self._load_persistent(missing))
+
+        to_embed = self._texts_to_embed(texts, text_hashes, results)
+        if to_embed:
+            embedded = dict(zip(to_embed, self.embeddings.embed_documents(list(to_embed.values()))))
+            self._store_persistent(embedded)
+            results.update(embedded)
+
+        return self._remember(text_hashes, missing, results)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """Async version of embed_query"""
+        return (await self.aembed_documents([text]))[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Async version of embed_documents, database access runs in a worker thread"""
+        text_hashes, results = self._lookup_memory(texts)
+        missing = [text_hash for text_hash in dict.fromkeys(text_hashes) if text_hash not in results]
+        if missing:
+            results.update(await asyncio.to_thread(self._load_persistent, missing))
+
+        to_embed = self._texts_to_embed(texts, text_hashes, results)
+        if to_embed:
+            embedded = dict(zip(to_embed, await self.embeddings.aembed_documents(list(to_embed.values()))))
+            await asyncio.to_thread(self._store_persistent, embedded)
+            results.update(embedded)
+
+        return self._remember(text_hashes, missing, results)
+
+    def _lookup_memory(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]]]:
+        """Hash texts and collect embeddings already held by the in-process LRU"""
+        text_hashes = [embedding_cache_key(text) for text in texts]
+        results: dict[str, list[float]] = {}
+
+        for text_hash in dict.fromkeys(text_hashes):
+            cached = _embedding_memory_cache.get((self.model, text_hash))
+            if cached is not None:
+                results[text_hash] = list(cached)
+
+        return text_hashes, results
+
+    @staticmethod
+    def _texts_to_embed(
+        texts: list[str], text_hashes: list[str], results: dict[str, list[float]]
+    ) -> dict[str, str]:
+        """Texts not found in any tier, each hash once even if it repeats in the batch"""
+        to_embed: dict[str, str] = {}
+        for text_hash, text in zip(text_hashes, texts):
+            if text_hash not in results:
+                to_embed.setdefault(text_hash, text)
+        return to_embed
+
+    def _remember(
+        self, text_hashes: list[str], missing: list[str], results: dict[str, list[float]]
+    ) -> list[list[float]]:
+        """Promote database hits and fresh embeddings into the in-process LRU"""
+        for text_hash in missing:
+            _embedding_memory_cache.set((self.model, text_hash), tuple(results[text_hash]))
+
+        return [results[text_hash] for text_hash in text_hashes]
+
+    def _load_persistent(self, text_hashes: list[str]) -> dict[str, list[float]]:
+        if not settings.EMBEDDING_CACHE_DB_ENABLED:
+            return {}
+
+        min_created_at = datetime.now(timezone.utc) - timedelta(seconds=settings.EMBEDDING_CACHE_TTL_SECONDS)
+        try:
+            with Session(engine) as session:
+                rows = session.execute(
+                    select(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.embedding)
+                    .where(EmbeddingCacheEntry.model == self.model)
+                    .where(EmbeddingCacheEntry.text_hash.in_(text_hashes))
+                    .where(EmbeddingCacheEntry.created_at >= min_created_at)
+                ).all()
+        except Exception as e:
+            # The cache must never break classification
+            _count_db_event("errors")
+            logger.warning(f"Embedding cache read failed: {str(e)}")
+            return {}
+
+        found = {row.text_hash: [float(x) for x in row.embedding] for row in rows}
+        _count_db_event("hits", len(found))
+        _count_db_event("misses", len(text_hashes) - len(found))
+        return found
+
+    def _store_persistent(self, embeddings: dict[str, list[float]]) -> None:
+        if not settings.EMBEDDING_CACHE_DB_ENABLED or not embeddings:
+            return
+
+        created_at = datetime.now(timezone.utc)
+        try:
+            with Session(engine) as session:
+                statement = insert(EmbeddingCacheEntry).values([
+                    {"model": self.model, "text_hash": text_hash, "embedding": embedding, "created_at": created_at}
+                    for text_hash, embedding in embeddings.items()
+                ])
+                session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=["model", "text_hash"],
+                        set_={
+                            "embedding": statement.excluded.embedding,
+                            "created_at": statement.excluded.created_at,
+                        },
+                    )
+                )
+                writes = _count_db_event("writes", len(embeddings))
+                # Prune whenever the write counter crosses a multiple of EMBEDDING_CACHE_PRUNE_EVERY
+                if writes // EMBEDDING_CACHE_PRUNE_EVERY != (writes - len(embeddings)) // EMBEDDING_CACHE_PRUNE_EVERY:
+                    _prune_persistent_cache(session)
+                session.commit()
+        except Exception as e:
+            _count_db_event("errors")
+            logger.warning(f"Embedding cache write failed: {str(e)}")
+
+
+def _prune_persistent_cache(session: Session) -> None:
+    """Delete expired rows, then the oldest rows above EMBEDDING_CACHE_DB_MAX_ROWS"""
+    min_created_at = datetime.now(timezone.utc) - timedelta(seconds=settings.EMBEDDING_CACHE_TTL_SECONDS)
+    session.execute(delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.created_at < min_created_at))
+
+    cutoff = session.execute(
+        select(EmbeddingCacheEntry.created_at)
+        .order_by(EmbeddingCacheEntry.created_at.desc())
+        .offset(settings.EMBEDDING_CACHE_DB_MAX_ROWS)
+        .limit(1)
+    ).scalar_one_or_none()
+    if cutoff is not None:
+        session.execute(delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.created_at <= cutoff))
+
+
+def get_embedding_cache_stats() -> dict:
+    """Hit/miss counters of both cache tiers"""
+    with _embedding_db_stats_lock:
+        persistent = dict(_embedding_db_stats)
+    return {
+        "enabled": settings.EMBEDDING_CACHE_ENABLED,
+        "memory": _embedding_memory_cache.stats(),
+        "persistent": {"enabled": settings.EMBEDDING_CACHE_DB_ENABLED, **persistent},
+    }
+
+
 def get_llm():
     """Get LLM client"""
     return SimpleLLM()
 
 
-def get_embeddings():
-    """Get embeddings client"""
-    return SimpleEmbeddings()
+def get_embeddings(cached: bool = True):
+    """
+    Get embeddings client
+
+    Args:
+        cached: Wrap the client with the embedding cache (if EMBEDDING_CACHE_ENABLED)
+    """
+    embeddings = SimpleEmbeddings()
+    if cached and settings.EMBEDDING_CACHE_ENABLED:
+        return CachedEmbeddings(embeddings)
+    return embeddings
 
 
 class GeminiClient:
     """Wrapper for Gemini API via CodeMie"""
     
     def __init__(self):
-        self.client = _create_genai_client()
-        self.model = self.client.GenerativeModel(settings.CODEMIE_TRANSCRIPTION_MODEL)
+        clients = get_provider_clients()
+        self.client = clients.genai
+        self.model = clients.transcription_model
 
 
 def get_gemini_client() -> GeminiClient:
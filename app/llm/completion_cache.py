@@ -0,0 +1,142 @@
+"""
+Completion cache for SimpleLLM.
+
+Keyed by (model, temperature, SHA-256 of the prompt). A bounded in-process LRU
+is checked first; an optional SQLite file keeps completions across restarts and
+is shared by workers on the same host.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+
+def completion_cache_key(model: str, temperature: float, prompt: str) -> str:
+    """Stable key of one completion request"""
+    payload = f"{model}\0{temperature:.3f}\0{prompt}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteCompletionStore:
+    """Persistent key -> completion text store with TTL, safe to share between threads"""
+
+    def __init__(self, path: str, ttl_seconds: float | None):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            content, created_at = row
+            if self.ttl_seconds and created_at + self.ttl_seconds < time.time():
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                return None
+            return content
+
+    def set(self, key: str, content: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, content, created_at) VALUES (?, ?, ?)",
+                (key, content, time.time()),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CompletionCache:
+    """Memory LRU in front of an optional SQLite store"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float | None, sqlite_path: str | None = None):
+        self.memory = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.store = SQLiteCompletionStore(sqlite_path, ttl_seconds) if sqlite_path else None
+        self.store_hits = 0
+
+    def get(self, key: str) -> str | None:
+        content = self.memory.get(key)
+        if content is not None or self.store is None:
+            return content
+
+        try:
+            content = self.store.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM completion cache read failed: {str(e)}")
+            return None
+
+        if content is not None:
+            self.store_hits += 1
+            self.memory.set(key, content)
+        return content
+
+    def set(self, key: str, content: str) -> None:
+        self.memory.set(key, content)
+        if self.store is None:
+            return
+        try:
+            self.store.set(key, content)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM completion cache write failed: {str(e)}")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "memory": self.memory.stats(),
+            "sqlite": {"enabled": self.store is not None, "hits": self.store_hits},
+        }
+
+
+_completion_cache: CompletionCache | None = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache | None:
+    """Shared cache, or None when LLM_CACHE_ENABLED is off"""
+    global _completion_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _completion_cache is None:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                _completion_cache = CompletionCache(
+                    maxsize=settings.LLM_CACHE_MAX_ITEMS,
+                    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                    sqlite_path=settings.LLM_CACHE_SQLITE_PATH,
+                )
+    return _completion_cache
+
+
+def get_completion_cache_stats() -> dict:
+    """Hit/miss counters for health endpoints"""
+    cache = get_completion_cache()
+    if cache is None:
+        return {"enabled": False}
+    return cache.stats()
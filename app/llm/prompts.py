@@ -16,6 +16,7 @@ CLASSIFIER_SAFE_TEMPLATE = _load_prompt("classifier_safe.txt")
 
 # Voice input prompts
 AUDIO_TRANSCRIPTION_PROMPT = _load_prompt("audio_transcription.txt")
+AUDIO_CHUNK_TRANSCRIPTION_PROMPT = _load_prompt("audio_transcription_chunk.txt")
 
 # Appeal template
 APPEAL_TEMPLATE = _load_prompt("appeal.txt")
@@ -0,0 +1,100 @@
+"""
+Process-wide registry of LLM provider clients.
+
+Created once at application startup (FastAPI lifespan) and shared by all services,
+so requests reuse pooled keep-alive connections instead of opening a new
+connection pool and TLS session per request. Scripts get a lazily created registry.
+"""
+import threading
+
+import google.generativeai as genai
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=settings.LLM_HTTP_CONNECT_TIMEOUT)
+
+
+class ProviderClients:
+    """Shared OpenAI-compatible and Gemini clients for the CodeMie endpoint"""
+
+    def __init__(self):
+        self.http_client = httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+        self.openai = OpenAI(
+            api_key=settings.CODEMIE_API_KEY,
+            base_url=settings.CODEMIE_API_BASE,
+            http_client=self.http_client,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+        # Native async client for request handlers, so provider calls never block the event loop
+        self.async_http_client = httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout())
+        self.async_openai = AsyncOpenAI(
+            api_key=settings.CODEMIE_API_KEY,
+            base_url=settings.CODEMIE_API_BASE,
+            http_client=self.async_http_client,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+
+        # genai keeps module-level clients, configure it once per process
+        genai.configure(
+            api_key=settings.CODEMIE_API_KEY,
+            transport="rest",
+            client_options={
+                "api_endpoint": settings.CODEMIE_API_BASE
+            }
+        )
+        self.genai = genai
+        self.transcription_model = genai.GenerativeModel(settings.CODEMIE_TRANSCRIPTION_MODEL)
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        self.openai.close()
+        await self.async_openai.close()
+
+
+_clients: ProviderClients | None = None
+_clients_lock = threading.Lock()
+
+
+def init_provider_clients() -> ProviderClients:
+    """Create the registry (idempotent). Called from the FastAPI lifespan."""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = ProviderClients()
+            logger.info(
+                f"Provider clients initialized (max connections: {settings.LLM_HTTP_MAX_CONNECTIONS}, "
+                f"keep-alive: {settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS})"
+            )
+    return _clients
+
+
+def get_provider_clients() -> ProviderClients:
+    """Get the shared registry, creating it on first use outside the app (scripts, tests)"""
+    if _clients is None:
+        return init_provider_clients()
+    return _clients
+
+
+async def close_provider_clients() -> None:
+    """Close pooled connections. Called on application shutdown."""
+    global _clients
+    with _clients_lock:
+        clients, _clients = _clients, None
+    if clients is not None:
+        await clients.aclose()
+        logger.info("Provider clients closed")
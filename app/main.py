@@ -3,6 +3,8 @@ from dotenv import load_dotenv
 # IMPORTANT: Load .env BEFORE everything else
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
@@ -10,17 +12,49 @@ from starlette.middleware.cors import CORSMiddleware
 from app.api.main import api_router
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.logging import get_logger
+from app.llm.registry import close_provider_clients, init_provider_clients
+from app.services.address.gazetteer import reload_gazetteer
+from app.services.category_registry import reload_category_registry
+from app.services.classifier.knn_index import rebuild_knn_index
+from app.services.health_check import start_health_prober, stop_health_prober
+from app.services.routing_tables import reload_routing_tables
 
 # Setup logging
 setup_logging(log_level="INFO")
+logger = get_logger(__name__)
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create shared provider clients, load the category registry, routing tables, street
+    gazetteer and KNN index and start the health prober on startup, close connections on shutdown
+    """
+    init_provider_clients()
+    try:
+        reload_category_registry()
+        reload_routing_tables()
+        if settings.BUILDING_LOOKUP_MODE == "gazetteer":
+            reload_gazetteer()
+        if settings.KNN_INDEX_ENABLED:
+            rebuild_knn_index()
+    except Exception as e:
+        # Do not block startup on the database, registries are loaded on first use
+        logger.warning(f"Category registry / routing tables / gazetteer / KNN index not loaded at startup: {str(e)}")
+    start_health_prober()
+    yield
+    await stop_health_prober()
+    await close_provider_clients()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
@@ -1,6 +1,8 @@
 """Export all schemas for easy importing"""
 from app.schemas.base import ClassificationBase, TextValidator, PersonalInfo
 from app.schemas.problems_schemas import (
+    BatchClassificationResponse,
+    BatchProblemRequest,
     ProblemClassificationResponse,
     ProblemRequest,
     ProblemResponse,
@@ -16,6 +18,8 @@ __all__ = [
     "ProblemRequest",
     "ProblemClassificationResponse",
     "ProblemResponse",
+    "BatchProblemRequest",
+    "BatchClassificationResponse",
     # Services
     "IssueRequest",
     "ServiceInfo",
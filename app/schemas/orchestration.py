@@ -2,6 +2,8 @@
 Schemas for end-to-end orchestration flow.
 Combines user info, problem classification, service resolution, and appeal generation.
 """
+from typing import Any, Literal
+
 from pydantic import BaseModel, Field
 
 from app.schemas.base import PersonalInfo
@@ -21,3 +23,14 @@ class OrchestrationResponse(BaseModel):
     classification: ProblemClassificationResponse = Field(..., description="Problem classification")
     service: ServiceResponse = Field(..., description="Assigned service information")
     appeal_text: str = Field(..., description="Generated appeal letter text")
+
+
+class OrchestrationEvent(BaseModel):
+    """One line of the streaming /solve and /voice/solve responses (NDJSON)"""
+    event: Literal["transcription", "user_info", "classification", "service", "appeal_delta", "done", "error"] = Field(
+        ..., description="Stage the event belongs to"
+    )
+    data: dict[str, Any] = Field(
+        ...,
+        description="Stage result: transcript, extracted contacts, classification, service, appeal text chunk, full response or error",
+    )
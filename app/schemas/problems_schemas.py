@@ -1,6 +1,9 @@
 """Problem-related request and response schemas"""
-from pydantic import BaseModel, Field, field_validator
+from typing import Annotated
 
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints, field_validator
+
+from app.core.config import settings
 from app.schemas.base import ClassificationBase, TextValidator, PersonalInfo
 
 
@@ -22,6 +25,28 @@ class ProblemClassificationResponse(ClassificationBase):
     reasoning: str = Field(..., description="Explanation why this category was chosen")
 
 
+BatchProblemText = Annotated[
+    str,
+    StringConstraints(min_length=5),
+    AfterValidator(TextValidator.validate_non_empty_text),
+]
+
+
+class BatchProblemRequest(BaseModel):
+    """Several problem texts classified in one request"""
+    problem_texts: list[BatchProblemText] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.CLASSIFY_BATCH_MAX_SIZE,
+        description="Problem descriptions to classify",
+    )
+
+
+class BatchClassificationResponse(BaseModel):
+    """Classification results in the same order as the request texts"""
+    results: list[ProblemClassificationResponse] = Field(..., description="Per-text classification")
+
+
 class ProblemResponse(ClassificationBase):
     """Full response with classification, service and letter"""
     service_info: PersonalInfo = Field(..., description="Service contact information")
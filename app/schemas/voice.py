@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -5,3 +7,12 @@ class VoiceTranscriptionResponse(BaseModel):
     """Response from voice audio transcription"""
     transcription: str = Field(..., description="Full text transcription from audio")
     transcription_successful: bool = Field(..., description="Whether transcription succeeded")
+
+
+class VoiceStreamEvent(BaseModel):
+    """Server message of the /voice/stream WebSocket (JSON text frame)"""
+    event: Literal["segment", "final", "error"] = Field(..., description="Message type")
+    segment: Optional[int] = Field(None, description="Index of the transcribed speech segment, in speaking order")
+    text: Optional[str] = Field(None, description="Transcription of this segment")
+    transcript: str = Field("", description="Transcript so far: completed segments up to the first pending one")
+    detail: Optional[str] = Field(None, description="Error description")
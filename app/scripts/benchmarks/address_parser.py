@@ -0,0 +1,149 @@
+"""
+Throughput micro-benchmark for the address parser.
+
+Generates synthetic free-form addresses (prefixes, street types, house letters,
+apartments, punctuation variants) and reports addresses/second and per-call
+latency for app.services.address.parser.parse_address against the former
+per-call-compiling implementation of OrchestrationService._parse_address.
+
+Run from the project root (no database or LLM needed):
+    python app/scripts/benchmarks/address_parser.py --count 100000 --repeat 5
+"""
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable
+
+# Ensure app is in python path for imports to work if running from root
+sys.path.insert(0, ".")
+
+from app.services.address.parser import parse_address
+
+STREETS = [
+    "Городоцька", "Стрийська", "Личаківська", "Зелена", "Наукова", "Шевченка",
+    "Володимира Великого", "Червоної Калини", "Свободи", "Ринок", "Тараса Шевченка", "Хуторівка",
+]
+STREET_TYPES = ["вулиця", "вул.", "вул", "проспект", "просп.", "площа", "пл.", "бульвар", "провулок", ""]
+PREFIXES = [
+    "", "Львів, ", "м. Львів, ", "місто Львів, ", "Україна, Львівська область, місто Львів, ",
+    "Україна, область Львівська, м. Львів, Франківський район, ",
+]
+HOUSE_LETTERS = ["", "", "", "а", "б", " А", "-в"]
+APARTMENTS = ["", "", ", кв 54", ", кв. 7", " кв 12", ", квартира 3"]
+
+
+def generate_addresses(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    addresses = []
+    for _ in range(count):
+        street_type = rng.choice(STREET_TYPES)
+        street = f"{street_type} {rng.choice(STREETS)}".strip()
+        house = f"{rng.randint(1, 250)}{rng.choice(HOUSE_LETTERS)}"
+        separator = rng.choice([" ", ", ", " буд. "])
+        addresses.append(f"{rng.choice(PREFIXES)}{street}{separator}{house}{rng.choice(APARTMENTS)}")
+    return addresses
+
+
+def legacy_parse_address(address: str) -> dict[str, str]:
+    """Former OrchestrationService._parse_address, kept as the baseline"""
+    if not address:
+        return {"street": "", "building": ""}
+
+    cleaned = address.replace("\n", " ")
+    parts = [p.strip() for p in re.split(r"[;,]", cleaned) if p.strip()]
+
+    street_segment = ""
+    house_number = ""
+
+    street_keywords = [
+        "вулиця", "вул", "улица", "проспект", "просп", "площа", "пл",
+        "бульвар", "бул", "провулок", "пров", "въезд", "street",
+    ]
+    house_pattern = re.compile(r"\b(\d+\s*[а-яА-Яa-zA-Z]?)\b")
+
+    apartment_tokens = {"кв", "квартира", "apt", "apartment"}
+
+    for idx in range(len(parts) - 1, -1, -1):
+        segment = parts[idx]
+        lower_segment = segment.lower()
+        if any(token in lower_segment.split() for token in apartment_tokens):
+            continue
+
+        match = house_pattern.search(segment)
+        if match:
+            house_number = match.group(1).replace(" ", "")
+            prefix = segment[: match.start()].strip()
+            if prefix:
+                street_segment = prefix
+            elif idx > 0:
+                street_segment = parts[idx - 1]
+            else:
+                street_segment = segment
+            break
+
+    if not street_segment and parts:
+        street_segment = parts[-1]
+
+    if street_segment:
+        lowered = street_segment.lower()
+        for token in ["україна", "область", "район", "місто", "м.", "обл.", "р-н"]:
+            if lowered.startswith(token):
+                street_segment = street_segment[len(token):].strip(", .")
+                lowered = street_segment.lower()
+
+        for keyword in street_keywords:
+            pattern = re.compile(rf"\b{keyword}\.?\b", re.IGNORECASE)
+            if pattern.search(street_segment):
+                street_segment = pattern.sub("", street_segment).strip()
+                break
+
+    street = re.sub(r"\s+", " ", street_segment).strip()
+    return {"street": street, "building": house_number}
+
+
+def _measure(parse: Callable[[str], object], addresses: list[str], repeat: int) -> list[float]:
+    """Seconds per full pass over the addresses"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for address in addresses:
+            parse(address)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _report(label: str, count: int, timings: list[float]) -> float:
+    best = min(timings)
+    rate = count / best
+    print(
+        f"{label:<14} | {rate:>12,.0f} | {best / count * 1e6:>9.2f} | "
+        f"{statistics.median(timings) / count * 1e6:>11.2f}"
+    )
+    return rate
+
+
+def run(args: argparse.Namespace) -> None:
+    addresses = generate_addresses(args.count, args.seed)
+    print(f"{args.count} addresses, best / median of {args.repeat} passes")
+    print(f"{'parser':<14} | {'addresses/s':>12} | {'best µs':>9} | {'median µs':>11}")
+    print("-" * 56)
+
+    rate = _report("parse_address", args.count, _measure(parse_address, addresses, args.repeat))
+    if not args.skip_legacy:
+        legacy_rate = _report("legacy", args.count, _measure(legacy_parse_address, addresses, args.repeat))
+        print(f"\nspeedup: {rate / legacy_rate:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark address parsing throughput.")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-legacy", action="store_true", help="Only measure the current parser")
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
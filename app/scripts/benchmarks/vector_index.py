@@ -0,0 +1,168 @@
+"""
+Recall / latency benchmark for pgvector ANN indexes.
+
+Loads synthetic clustered embeddings into a scratch table, computes exact
+top-K neighbors in NumPy, then measures query latency and recall@K for an
+exact scan, HNSW (per ef_search) and IVFFlat (per probes).
+
+Run from the project root (the scratch table is dropped afterwards):
+    python app/scripts/benchmarks/vector_index.py --sizes 10000 100000 1000000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import psycopg
+from dotenv import load_dotenv
+from pgvector.psycopg import register_vector
+
+# Ensure app is in python path for imports to work if running from root
+sys.path.insert(0, ".")
+
+from app.core.config import settings
+from app.scripts.vector_index.index_ops import build_index_sql, default_ivfflat_lists
+
+load_dotenv()
+
+BENCH_TABLE = "bench_examples"
+CHUNK_SIZE = 10_000
+
+
+def _connect() -> psycopg.Connection:
+    connection = psycopg.connect(
+        host=settings.POSTGRES_SERVER,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        dbname=settings.POSTGRES_DB,
+        autocommit=True,
+    )
+    connection.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    register_vector(connection)
+    return connection
+
+
+def _generate_chunk(rng: np.random.Generator, centers: np.ndarray, size: int) -> np.ndarray:
+    """Clustered unit vectors, similar in shape to text embeddings of a few topics"""
+    assignment = rng.integers(0, len(centers), size=size)
+    noise = rng.normal(scale=0.6, size=(size, centers.shape[1])).astype(np.float32)
+    chunk = centers[assignment] + noise / np.sqrt(centers.shape[1])
+    return chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+
+
+def _load_table(
+    connection: psycopg.Connection, size: int, dim: int, queries: np.ndarray, k: int, seed: int
+) -> np.ndarray:
+    """Fill the scratch table and return exact top-K ids per query"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(64, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+
+    connection.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    connection.execute(f"CREATE UNLOGGED TABLE {BENCH_TABLE} (id bigint PRIMARY KEY, embedding vector({dim}))")
+
+    best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+    best_sims = np.zeros((len(queries), 0), dtype=np.float32)
+
+    with connection.cursor() as cursor:
+        with cursor.copy(f"COPY {BENCH_TABLE} (id, embedding) FROM STDIN WITH (FORMAT BINARY)") as copy:
+            copy.set_types(["int8", "vector"])
+            for offset in range(0, size, CHUNK_SIZE):
+                chunk = _generate_chunk(rng, centers, min(CHUNK_SIZE, size - offset))
+                for position, vector in enumerate(chunk):
+                    copy.write_row((offset + position, vector))
+
+                # Streaming exact top-K: merge this chunk's similarities with the running best
+                ids = np.arange(offset, offset + len(chunk), dtype=np.int64)
+                sims = np.concatenate([best_sims, queries @ chunk.T], axis=1)
+                all_ids = np.concatenate([best_ids, np.broadcast_to(ids, (len(queries), len(ids)))], axis=1)
+                top = np.argsort(-sims, axis=1)[:, :k]
+                best_sims = np.take_along_axis(sims, top, axis=1)
+                best_ids = np.take_along_axis(all_ids, top, axis=1)
+
+    connection.execute(f"ANALYZE {BENCH_TABLE}")
+    return best_ids
+
+
+def _run_queries(
+    connection: psycopg.Connection, queries: np.ndarray, truth: np.ndarray, k: int
+) -> tuple[float, float, float]:
+    """Return (recall@K, p50 ms, p95 ms)"""
+    latencies = []
+    hits = 0
+    statement = f"SELECT id FROM {BENCH_TABLE} ORDER BY embedding <=> %s LIMIT %s"
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        rows = connection.execute(statement, (query, k)).fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len({row[0] for row in rows} & set(expected.tolist()))
+
+    return hits / truth.size, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+
+def _report(size: int, label: str, recall: float, p50: float, p95: float) -> None:
+    print(f"{size:>9} | {label:<22} | {recall:>8.3f} | {p50:>8.2f} | {p95:>8.2f}")
+
+
+def run(args: argparse.Namespace) -> None:
+    connection = _connect()
+    rng = np.random.default_rng(args.seed + 1)
+
+    print(f"{'rows':>9} | {'index / search param':<22} | {'recall':>8} | {'p50 ms':>8} | {'p95 ms':>8}")
+    print("-" * 68)
+    try:
+        for size in args.sizes:
+            # Queries come from the same distribution as the data, but are not in the table
+            centers_rng = np.random.default_rng(args.seed)
+            centers = centers_rng.normal(size=(64, args.dim)).astype(np.float32)
+            centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+            queries = _generate_chunk(rng, centers, args.queries)
+
+            truth = _load_table(connection, size, args.dim, queries, args.k, args.seed)
+
+            if not args.skip_exact:
+                _report(size, "exact scan", *_run_queries(connection, queries[: args.exact_queries], truth[: args.exact_queries], args.k))
+
+            for method in args.methods:
+                lists = default_ivfflat_lists(size)
+                started = time.perf_counter()
+                connection.execute(
+                    build_index_sql(method, f"ix_{BENCH_TABLE}_{method}", args.m, args.ef_construction, lists, table=BENCH_TABLE)
+                )
+                build_seconds = time.perf_counter() - started
+                print(f"{size:>9} | {method} built in {build_seconds:.1f}s" + (f" (lists={lists})" if method == "ivfflat" else ""))
+
+                if method == "hnsw":
+                    for ef_search in args.ef_search:
+                        connection.execute(f"SET hnsw.ef_search = {int(ef_search)}")
+                        _report(size, f"hnsw ef_search={ef_search}", *_run_queries(connection, queries, truth, args.k))
+                else:
+                    for probes in args.probes:
+                        connection.execute(f"SET ivfflat.probes = {int(probes)}")
+                        _report(size, f"ivfflat probes={probes}", *_run_queries(connection, queries, truth, args.k))
+
+                connection.execute(f"DROP INDEX IF EXISTS ix_{BENCH_TABLE}_{method}")
+    finally:
+        connection.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recall and latency of pgvector ANN indexes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--exact-queries", type=int, default=20, help="Queries for the (slow) exact scan baseline")
+    parser.add_argument("--skip-exact", action="store_true")
+    parser.add_argument("--k", type=int, default=settings.TOP_K)
+    parser.add_argument("--methods", nargs="+", choices=["hnsw", "ivfflat"], default=["hnsw", "ivfflat"])
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 20, 40, 80, 160])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from sqlmodel import Session, SQLModel, text
 
+from app.scripts.vector_index.index_ops import create_index, list_indexes
+
 def init_pgvector_extension(engine):
     """Create pgvector extension in PostgreSQL."""
     try:
@@ -10,7 +12,27 @@ def init_pgvector_extension(engine):
     except Exception as e:
         print(f"Could not create pgvector extension. Ensure you have superuser privileges. Error: {e}")
 
+def init_pg_trgm_extension(engine):
+    """Create pg_trgm extension (trigram index on buildings.street_name_norm)."""
+    try:
+        with Session(engine) as session:
+            session.exec(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            session.commit()
+        print("pg_trgm extension ensured")
+    except Exception as e:
+        print(f"Could not create pg_trgm extension. Ensure you have superuser privileges. Error: {e}")
+
 def create_tables(engine):
     """Create all tables."""
     SQLModel.metadata.create_all(engine)
     print("Tables ensured")
+
+def init_vector_index(engine):
+    """Create the default HNSW index on examples.embedding unless an ANN index already exists."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        existing = list_indexes(connection)
+        if existing:
+            print(f"ANN index present: {', '.join(index['name'] for index in existing)}")
+            return
+        print(f"ANN index created: {create_index(connection, 'hnsw')}")
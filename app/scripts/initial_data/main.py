@@ -7,7 +7,12 @@ from sqlmodel import Session, create_engine
 sys.path.insert(0, ".")
 
 from app.core.config import settings
-from app.scripts.initial_data.db_setup import init_pgvector_extension, create_tables
+from app.scripts.initial_data.db_setup import (
+    create_tables,
+    init_pg_trgm_extension,
+    init_pgvector_extension,
+    init_vector_index,
+)
 from app.scripts.initial_data.seed_classification import load_categories_and_examples
 from app.scripts.initial_data.seed_services import load_services_and_areas
 
@@ -26,7 +31,9 @@ def main():
     
     # 2. Structure
     init_pgvector_extension(engine)
+    init_pg_trgm_extension(engine)
     create_tables(engine)
+    init_vector_index(engine)
 
     # 3. Data
     with Session(engine) as session:
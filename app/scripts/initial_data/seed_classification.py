@@ -3,6 +3,7 @@ from pathlib import Path
 from sqlmodel import Session, select
 from app.db_models import Category, Example
 from app.llm.client import get_embeddings
+from app.services.classifier.result_cache import invalidate_classification_cache
 
 def load_categories_and_examples(session: Session, categories_file: str, force: bool = False):
     """Load categories and examples from JSON file."""
@@ -71,6 +72,9 @@ def load_categories_and_examples(session: Session, categories_file: str, force:
                 added_ex += 1
 
     session.commit()
+    # In-process caches (result cache, category registry, KNN index); running servers
+    # pick the change up through the classification data-version stamp
+    invalidate_classification_cache()
     print(
         f"Categories: {added_cats} added, {updated_cats} updated. "
         f"Examples: {added_ex} added, {skipped_ex} skipped."
@@ -0,0 +1,117 @@
+"""
+DDL helpers for the ANN index on examples.embedding.
+
+All statements use CONCURRENTLY, so they must run on an autocommit connection.
+"""
+import math
+from typing import Literal
+
+from sqlalchemy import Connection, text
+
+TABLE_NAME = "examples"
+COLUMN_NAME = "embedding"
+
+IndexMethod = Literal["hnsw", "ivfflat"]
+
+
+def index_name(method: IndexMethod) -> str:
+    """Name of the ANN index for the given method"""
+    return f"ix_{TABLE_NAME}_{COLUMN_NAME}_{method}"
+
+
+def default_ivfflat_lists(row_count: int) -> int:
+    """pgvector recommendation: rows / 1000 up to 1M rows, sqrt(rows) above"""
+    if row_count <= 1_000_000:
+        return max(1, row_count // 1000)
+    return int(math.sqrt(row_count))
+
+
+def build_index_sql(
+    method: IndexMethod,
+    name: str,
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int = 100,
+    table: str = TABLE_NAME,
+) -> str:
+    """CREATE INDEX statement for cosine-distance search"""
+    if method == "hnsw":
+        params = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    elif method == "ivfflat":
+        params = f"lists = {int(lists)}"
+    else:
+        raise ValueError(f"Unsupported index method: {method}")
+
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+        f"ON {table} USING {method} ({COLUMN_NAME} vector_cosine_ops) WITH ({params})"
+    )
+
+
+def list_indexes(connection: Connection) -> list[dict]:
+    """Existing ANN indexes on examples.embedding with their size"""
+    rows = connection.execute(
+        text(
+            "SELECT i.indexname, i.indexdef, "
+            "pg_size_pretty(pg_relation_size(quote_ident(i.indexname)::regclass)) AS size "
+            "FROM pg_indexes i "
+            "WHERE i.tablename = :table AND (i.indexdef ILIKE '%USING hnsw%' OR i.indexdef ILIKE '%USING ivfflat%')"
+        ),
+        {"table": TABLE_NAME},
+    ).all()
+    return [{"name": row.indexname, "definition": row.indexdef, "size": row.size} for row in rows]
+
+
+def count_rows(connection: Connection) -> int:
+    return connection.execute(text(f"SELECT count(*) FROM {TABLE_NAME}")).scalar_one()
+
+
+def drop_ann_indexes(connection: Connection, keep: str | None = None) -> list[str]:
+    """Drop every ANN index on examples.embedding except `keep`"""
+    dropped = []
+    for index in list_indexes(connection):
+        if index["name"] == keep:
+            continue
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index['name']}"))
+        dropped.append(index["name"])
+    return dropped
+
+
+def create_index(
+    connection: Connection,
+    method: IndexMethod,
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int | None = None,
+) -> str:
+    """Create the ANN index if it does not exist yet"""
+    if lists is None:
+        lists = default_ivfflat_lists(count_rows(connection))
+
+    name = index_name(method)
+    connection.execute(text(build_index_sql(method, name, m, ef_construction, lists)))
+    return name
+
+
+def rebuild_index(
+    connection: Connection,
+    method: IndexMethod,
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int | None = None,
+) -> str:
+    """
+    Build a fresh index next to the current one, then swap it in.
+    Queries keep using the old index until the new one is ready.
+    """
+    if lists is None:
+        lists = default_ivfflat_lists(count_rows(connection))
+
+    name = index_name(method)
+    staging_name = f"{name}_new"
+
+    connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {staging_name}"))
+    connection.execute(text(build_index_sql(method, staging_name, m, ef_construction, lists)))
+    drop_ann_indexes(connection, keep=staging_name)
+    connection.execute(text(f"ALTER INDEX {staging_name} RENAME TO {name}"))
+    return name
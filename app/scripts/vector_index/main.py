@@ -0,0 +1,49 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+from sqlmodel import create_engine
+
+# Ensure app is in python path for imports to work if running from root
+sys.path.insert(0, ".")
+
+from app.core.config import settings
+from app.scripts.vector_index.index_ops import (
+    create_index,
+    drop_ann_indexes,
+    list_indexes,
+    rebuild_index,
+)
+
+load_dotenv()
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the ANN index on examples.embedding.")
+    parser.add_argument("command", choices=["status", "create", "rebuild", "drop"])
+    parser.add_argument("--method", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--m", type=int, default=16, help="HNSW: max connections per layer")
+    parser.add_argument("--ef-construction", type=int, default=64, help="HNSW: candidate list size at build time")
+    parser.add_argument("--lists", type=int, default=None, help="IVFFlat: number of lists (default: derived from row count)")
+    args = parser.parse_args()
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as connection:
+        if args.command == "create":
+            name = create_index(connection, args.method, args.m, args.ef_construction, args.lists)
+            print(f"Index ensured: {name}")
+        elif args.command == "rebuild":
+            name = rebuild_index(connection, args.method, args.m, args.ef_construction, args.lists)
+            print(f"Index rebuilt: {name}")
+        elif args.command == "drop":
+            dropped = drop_ann_indexes(connection)
+            print(f"Dropped: {', '.join(dropped) if dropped else 'nothing'}")
+
+        indexes = list_indexes(connection)
+        if not indexes:
+            print("No ANN index on examples.embedding (queries use exact sequential scan)")
+        for index in indexes:
+            print(f"   {index['name']} ({index['size']}): {index['definition']}")
+
+if __name__ == "__main__":
+    main()
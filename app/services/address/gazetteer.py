@@ -0,0 +1,325 @@
+"""
+In-memory street gazetteer for building lookup.
+
+Built from the `buildings` table: street names are normalized (street type
+words such as "вул."/"просп." removed, Ukrainian/Russian spellings folded to one
+form), indexed by character trigrams and ranked by edit distance. Every street
+keeps a house-number map, so a lookup returns the best scored building without
+touching the database. The gazetteer is rebuilt when the version stamp of
+`buildings` changes (checked every ROUTING_DATA_VERSION_CHECK_SECONDS).
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, Literal
+
+import Levenshtein
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.core.logging import get_logger
+from app.db_models import Building
+from app.services.table_version import TableVersion
+
+logger = get_logger(__name__)
+
+# Street type words (Ukrainian, abbreviated, Russian, English), dropped from names before matching
+STREET_TYPE_WORDS = {
+    "вулиця", "вул", "улица", "ул",
+    "проспект", "просп", "пр", "пр-т", "пр-кт",
+    "площа", "пл", "площадь",
+    "бульвар", "бул", "б-р",
+    "провулок", "пров", "переулок", "пер",
+    "узвіз", "спуск", "тупик", "шосе", "шоссе", "набережна", "набережная",
+    "street", "st", "avenue", "ave",
+}
+
+# City and region words that users put in front of the street
+PLACE_WORDS = {"україна", "украина", "львів", "львов", "місто", "город", "м", "г", "область", "обл", "район", "р-н"}
+
+# Fold Ukrainian and Russian spellings of the same name to one form ("Личаківська" ~ "Лычаковская")
+_FOLD_TABLE = str.maketrans({
+    "ё": "е", "є": "е", "э": "е",
+    "ы": "и", "і": "и", "ї": "и", "й": "и",
+    "ґ": "г",
+    "ъ": None, "ь": None,
+    "'": None, "’": None, "ʼ": None, "`": None,
+})
+
+# Latin letters typed instead of Cyrillic in house numbers ("10a" -> "10а")
+_HOUSE_LATIN_TABLE = str.maketrans({"a": "а", "b": "б", "v": "в", "g": "г", "d": "д", "e": "е", "k": "к"})
+
+_HOUSE_NUMBER_RE = re.compile(r"\d+")
+
+TRIGRAM_CANDIDATES = 30
+
+
+def _fold_token(token: str) -> str:
+    token = token.translate(_FOLD_TABLE)
+    # Russian adjective endings: "зеленая" -> "зелена", "ои" (from "ой") -> "ии"
+    if token.endswith("ая") or token.endswith("яя"):
+        token = token[:-2] + "а"
+    elif token.endswith("ои"):
+        token = token[:-2] + "ии"
+    return token
+
+
+def street_tokens(name: str) -> list[str]:
+    """
+    Folded significant tokens of a street name (no type or place words).
+    buildings.street_name_norm (STREET_NAME_NORM_SQL) computes the same in Postgres, change both together.
+    """
+    cleaned = unicodedata.normalize("NFC", name).lower()
+    cleaned = re.sub(r"[.,;:\"«»()]", " ", cleaned)
+    tokens = []
+    for token in cleaned.split():
+        token = token.strip("-")
+        if not token or token in STREET_TYPE_WORDS or token in PLACE_WORDS:
+            continue
+        token = _fold_token(token)
+        # A lone apostrophe folds to nothing
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def street_key(name: str) -> str:
+    """Normalized street name used for matching"""
+    return " ".join(street_tokens(name))
+
+
+def normalize_house_number(number: str | None) -> str:
+    """"10 Б" / "10-б" / "10b" -> "10б" """
+    if not number:
+        return ""
+    normalized = re.sub(r"[\s\-]", "", number.strip().lower())
+    return normalized.translate(_HOUSE_LATIN_TABLE)
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class GazetteerBuilding:
+    """Detached, read-only copy of a Building row (same attribute names as the model)"""
+    building_id: int
+    city: str
+    district: str | None
+    street_name: str
+    house_number: str
+
+
+@dataclass
+class StreetEntry:
+    """One street: display name, match key and its house-number map"""
+    name: str
+    key: str
+    tokens: tuple[str, ...]
+    houses: dict[str, GazetteerBuilding] = field(default_factory=dict)
+    # (house number as int, normalized house) sorted, for same-number and nearest-house matches
+    numbers: list[tuple[int, str]] = field(default_factory=list)
+
+    def add(self, building: GazetteerBuilding) -> None:
+        house = normalize_house_number(building.house_number)
+        self.houses.setdefault(house, building)
+        digits = _HOUSE_NUMBER_RE.search(house)
+        if digits:
+            self.numbers.append((int(digits.group()), house))
+
+    def find_house(self, house_number: str) -> tuple[GazetteerBuilding | None, str]:
+        """Best building for the house number and how it matched"""
+        house = normalize_house_number(house_number)
+        if house in self.houses:
+            return self.houses[house], "exact"
+
+        if not self.numbers:
+            return next(iter(self.houses.values()), None), "street"
+
+        digits = _HOUSE_NUMBER_RE.search(house)
+        if not digits:
+            return self.houses[self.numbers[0][1]], "street"
+
+        number = int(digits.group())
+        position = bisect.bisect_left(self.numbers, (number, ""))
+        if position < len(self.numbers) and self.numbers[position][0] == number:
+            # Same number, other letter or block ("10" -> "10а")
+            return self.houses[self.numbers[position][1]], "number"
+
+        # Nearest house on the street, usually the same district and managing company
+        neighbors = self.numbers[max(0, position - 1):position + 1]
+        nearest = min(neighbors, key=lambda item: abs(item[0] - number))
+        return self.houses[nearest[1]], "nearest"
+
+
+@dataclass(frozen=True)
+class BuildingMatch:
+    """Scored lookup result"""
+    building: GazetteerBuilding
+    street_score: float
+    house_match: Literal["exact", "number", "nearest", "street"]
+    score: float
+
+
+# How much a house-number match level keeps of the street score
+HOUSE_MATCH_WEIGHTS = {"exact": 1.0, "number": 0.9, "nearest": 0.6, "street": 0.5}
+
+# Match levels that identify the requested building (a neighbor house may have another ОСББ/ЛКП)
+BUILDING_HOUSE_MATCHES = ("exact", "number")
+
+
+class CityGazetteer:
+    """Trigram index over the streets of one city"""
+
+    def __init__(self, streets: Iterable[StreetEntry]):
+        self.streets = list(streets)
+        self.by_key = {street.key: street for street in self.streets}
+        self.index: dict[str, list[int]] = {}
+        for position, street in enumerate(self.streets):
+            street.numbers.sort()
+            for trigram in _trigrams(street.key):
+                self.index.setdefault(trigram, []).append(position)
+
+    def find_street(self, street_name: str) -> tuple[StreetEntry, float] | None:
+        """Best matching street and its similarity score (0..1)"""
+        tokens = street_tokens(street_name)
+        key = " ".join(tokens)
+        if not key:
+            return None
+
+        exact = self.by_key.get(key)
+        if exact is not None:
+            return exact, 1.0
+
+        shared = Counter()
+        for trigram in _trigrams(key):
+            shared.update(self.index.get(trigram, ()))
+        if not shared:
+            return None
+
+        best: tuple[StreetEntry, float] | None = None
+        for position, _ in shared.most_common(TRIGRAM_CANDIDATES):
+            street = self.streets[position]
+            score = self._similarity(key, tokens, street)
+            if best is None or score > best[1]:
+                best = (street, score)
+        return best
+
+    @staticmethod
+    def _similarity(key: str, tokens: list[str], street: StreetEntry) -> float:
+        whole = Levenshtein.ratio(key, street.key)
+        # "Шевченка" for "Тараса Шевченка": every query token close to some street token
+        token_scores = [
+            max((Levenshtein.ratio(token, street_token) for street_token in street.tokens), default=0.0)
+            for token in tokens
+        ]
+        covered = min(token_scores) if token_scores else 0.0
+        partial = 0.95 * sum(token_scores) / len(token_scores) if covered >= 0.8 else 0.0
+        return max(whole, partial)
+
+
+class StreetGazetteer:
+    """Per-city street indexes built from the buildings table"""
+
+    def __init__(self, buildings: Iterable[GazetteerBuilding]):
+        streets: dict[str, dict[str, StreetEntry]] = {}
+        count = 0
+        for building in buildings:
+            count += 1
+            tokens = street_tokens(building.street_name)
+            key = " ".join(tokens)
+            if not key:
+                continue
+            city_streets = streets.setdefault(building.city, {})
+            entry = city_streets.get(key)
+            if entry is None:
+                entry = city_streets[key] = StreetEntry(name=building.street_name, key=key, tokens=tuple(tokens))
+            entry.add(building)
+
+        self.cities = {city: CityGazetteer(entries.values()) for city, entries in streets.items()}
+        self.buildings_count = count
+        # Version stamp of the buildings the gazetteer was built from
+        self.version: str | None = None
+
+    def match(self, street_name: str, house_number: str, city: str = "Львів", min_score: float = 0.0) -> BuildingMatch | None:
+        """Best scored building for a free-form street name and house number"""
+        city_gazetteer = self.cities.get(city)
+        if city_gazetteer is None:
+            return None
+
+        found = city_gazetteer.find_street(street_name)
+        if found is None or found[1] < min_score:
+            return None
+
+        street, street_score = found
+        building, house_match = street.find_house(house_number)
+        if building is None:
+            return None
+
+        return BuildingMatch(
+            building=building,
+            street_score=street_score,
+            house_match=house_match,
+            score=street_score * HOUSE_MATCH_WEIGHTS[house_match],
+        )
+
+    @classmethod
+    def load(cls, session: Session) -> "StreetGazetteer":
+        rows = session.exec(
+            select(
+                Building.building_id, Building.city, Building.district, Building.street_name, Building.house_number
+            ).order_by(Building.building_id)
+        )
+        return cls(
+            GazetteerBuilding(
+                building_id=row[0], city=row[1], district=row[2], street_name=row[3], house_number=row[4]
+            )
+            for row in rows
+        )
+
+
+_gazetteer: StreetGazetteer | None = None
+_gazetteer_lock = threading.Lock()
+_buildings_version = TableVersion({"buildings": "building_id"})
+
+
+def reload_gazetteer(session: Session | None = None) -> StreetGazetteer:
+    """Build a fresh gazetteer and swap it in atomically"""
+    global _gazetteer
+    if session is None:
+        with Session(engine) as own_session:
+            return reload_gazetteer(own_session)
+
+    # Stamp first: buildings changed while building get a new stamp and are picked up on the next check
+    version = _buildings_version.refresh(session)
+    gazetteer = StreetGazetteer.load(session)
+    gazetteer.version = version
+
+    with _gazetteer_lock:
+        _gazetteer = gazetteer
+    logger.info(f"Street gazetteer built: {gazetteer.buildings_count} buildings")
+    return gazetteer
+
+
+def get_gazetteer(session: Session | None = None) -> StreetGazetteer:
+    """Current gazetteer, built on first use and again after buildings changed"""
+    if session is None:
+        with Session(engine) as own_session:
+            return get_gazetteer(own_session)
+
+    gazetteer = _gazetteer
+    if gazetteer is not None and gazetteer.version == _buildings_version.get(session):
+        return gazetteer
+    return reload_gazetteer(session)
+
+
+def invalidate_gazetteer() -> None:
+    """Drop the gazetteer, the next lookup rebuilds it"""
+    global _gazetteer
+    with _gazetteer_lock:
+        _gazetteer = None
+    _buildings_version.reset()
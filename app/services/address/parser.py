@@ -0,0 +1,142 @@
+"""
+Free-form Ukrainian address parser.
+
+All patterns are compiled once at import: one alternation for street types, one
+for the country/region prefixes, one for apartments. parse_address() makes a
+single pass over the comma-separated segments and returns a structured
+ParsedAddress; it runs in bulk imports and backlog reprocessing, so keep it free
+of per-call regex compilation and database access.
+"""
+import re
+from typing import NamedTuple
+
+# Street type as written (including the inflected forms of dictated addresses) -> canonical form
+STREET_TYPES = {
+    "вулиця": "вулиця", "вул": "вулиця", "улица": "вулиця", "ул": "вулиця",
+    "вулиці": "вулиця", "вулицю": "вулиця", "улице": "вулиця", "улицы": "вулиця",
+    "проспект": "проспект", "просп": "проспект", "пр-т": "проспект", "проспекті": "проспект",
+    "площа": "площа", "пл": "площа", "площі": "площа",
+    "бульвар": "бульвар", "бул": "бульвар", "бульварі": "бульвар",
+    "провулок": "провулок", "пров": "провулок", "провулку": "провулок",
+    "въезд": "в'їзд",
+    "street": "вулиця",
+}
+
+APARTMENT_WORDS = ("квартира", "кв", "apartment", "apt")
+
+_SEGMENT_SPLIT_RE = re.compile(r"[;,\n]")
+_HOUSE_RE = re.compile(r"\b(\d+\s*[а-яА-ЯіїєґІЇЄҐa-zA-Z]?)\b")
+_APARTMENT_RE = re.compile(
+    r"\b(?:" + "|".join(APARTMENT_WORDS) + r")\b\.?\s*(\d+[^\s,;]*)?", re.IGNORECASE
+)
+# Longest first, so "пр-т" is not cut to "пр" by a shorter alternative
+_STREET_TYPE_ALTERNATION = "|".join(re.escape(word) for word in sorted(STREET_TYPES, key=len, reverse=True))
+_STREET_TYPE_RE = re.compile(r"\b(" + _STREET_TYPE_ALTERNATION + r")\b\.?", re.IGNORECASE)
+# Country / region / city prefixes in front of the street ("Україна, м. Львів, ...", "г. Львов ...")
+_PREFIX_RE = re.compile(r"^(?:(?:(?:україна|область|район|місто|город|обл|р-н)\b\.?|м\.|г\.)[\s,.]*)+", re.IGNORECASE)
+# "місто Львів" / "м. Львів" -> city, "Франківський район" / "р-н Сихівський" -> district
+_AREA_RE = re.compile(
+    # The city ends where a street starts: "м. Львів вул. Зелена 5"
+    r"^(?:(?:(?:місто|город)\b|м\.|г\.)\s*(?P<city>\S.*?)(?:\s+(?:" + _STREET_TYPE_ALTERNATION + r")\b.*)?"
+    r"|(?:район|р-н)\.?\s+(?P<district>\S.*)"
+    r"|(?P<district_before>\S.*?)\s+(?:район|р-н)\.?)$",
+    re.IGNORECASE,
+)
+# "буд. 10" / "будинок 10" in front of the house number
+_HOUSE_MARKER_RE = re.compile(r"(?:^|\s)(?:будинок|буд|д)\.?$", re.IGNORECASE)
+_SPACES_RE = re.compile(r"\s+")
+
+
+class ParsedAddress(NamedTuple):
+    """Structured address; empty strings for parts that were not found"""
+    city: str = ""
+    district: str = ""
+    street_type: str = ""
+    street: str = ""
+    house: str = ""
+    apartment: str = ""
+
+
+EMPTY_ADDRESS = ParsedAddress()
+
+
+def _cleanup_street(segment: str) -> tuple[str, str]:
+    """Street name without country/city prefixes and the street type word, and the canonical type"""
+    prefix = _PREFIX_RE.match(segment)
+    if prefix:
+        segment = segment[prefix.end():]
+
+    street_type = ""
+    match = _STREET_TYPE_RE.search(segment)
+    if match:
+        street_type = STREET_TYPES[match.group(1).lower()]
+        # After a prefix, whatever precedes the street type is the city ("м. Львів вул. Зелена")
+        head = "" if prefix else segment[:match.start()]
+        segment = head + segment[match.end():]
+
+    return _SPACES_RE.sub(" ", segment).strip(" .,"), street_type
+
+
+def parse_address(address: str) -> ParsedAddress:
+    """
+    Parse a free-form Ukrainian address.
+
+    Handles inputs like:
+    - "Україна, область Львівська, місто Львів, вулиця Володимира Великого 10б, кв 54"
+    - "Львів, проспект Червоної Калини 36"
+    - "Стрийська, 45"
+    """
+    if not address:
+        return EMPTY_ADDRESS
+
+    parts = [part.strip() for part in _SEGMENT_SPLIT_RE.split(address)]
+    parts = [part for part in parts if part]
+    if not parts:
+        return EMPTY_ADDRESS
+
+    city = district = apartment = street_segment = house = ""
+    for part in parts:
+        match = _AREA_RE.match(part)
+        if match is None:
+            continue
+        found_city, found_district, district_before = match.groups()
+        if found_city and not city:
+            city = found_city.strip()
+        elif not found_city and not district:
+            district = (found_district or district_before).strip()
+
+    # The house number is in the last segment that has one; apartments come after it
+    for idx in range(len(parts) - 1, -1, -1):
+        segment = parts[idx]
+        match = _APARTMENT_RE.search(segment)
+        if match:
+            if not apartment and match.group(1):
+                apartment = match.group(1)
+            segment = segment[:match.start()].strip()
+            if not segment:
+                continue
+
+        match = _HOUSE_RE.search(segment)
+        if match:
+            house = match.group(1).replace(" ", "")
+            prefix = _HOUSE_MARKER_RE.sub("", segment[:match.start()].strip()).strip()
+            if prefix:
+                street_segment = prefix
+            elif idx > 0:
+                street_segment = parts[idx - 1]
+            else:
+                street_segment = segment
+            break
+
+    if not street_segment:
+        street_segment = parts[-1]
+
+    street, street_type = _cleanup_street(street_segment)
+    return ParsedAddress(
+        city=city,
+        district=district,
+        street_type=street_type,
+        street=street,
+        house=house,
+        apartment=apartment,
+    )
@@ -1,6 +1,8 @@
 """
 Service for appeal generation.
 """
+from typing import AsyncIterator
+
 from app.schemas.appeal import AppealRequest
 from app.llm.prompts import APPEAL_TEMPLATE
 from app.llm.client import SimpleLLM
@@ -22,21 +24,43 @@ def format_appeal_prompt(request: AppealRequest) -> str:
     )
 
 
-async def generate_appeal_text(request: AppealRequest) -> str:
+async def stream_appeal_text(request: AppealRequest) -> AsyncIterator[str]:
     """
-    Generate appeal text using LLM.
+    Stream appeal text from LLM as it is generated.
     
     Args:
         request: Appeal request with problem text and address
         
-    Returns:
-        Generated appeal text
+    Yields:
+        Text chunks of the appeal (leading whitespace is skipped)
     """
     # Prepare prompt with user data
     prompt = format_appeal_prompt(request)
     
     # Generate appeal using LLM
     llm = SimpleLLM()
-    letter_text = await llm.generate_text(prompt, temperature=0.7)
+    started = False
+    async for chunk in llm.astream(prompt, temperature=0.7):
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        yield chunk
+
+
+async def generate_appeal_text(request: AppealRequest) -> str:
+    """
+    Generate appeal text using LLM.
+    
+    Args:
+        request: Appeal request with problem text and address
+        
+    Returns:
+        Generated appeal text
+    """
+    letter_text = "".join([chunk async for chunk in stream_appeal_text(request)])
+    if not letter_text:
+        raise ValueError("LLM returned empty response")
     
     return letter_text.strip()
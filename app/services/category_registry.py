@@ -0,0 +1,99 @@
+"""
+Process-level registry of problem categories.
+
+The catalog is a handful of rows that almost never change, so it is loaded once
+(at startup or on first use) into an immutable snapshot together with the
+pre-rendered prompt block. The hot path does no category queries; call
+reload_category_registry() or invalidate_category_registry() after changing
+the categories table.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.core.logging import get_logger
+from app.db_models import Category
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CategoryInfo:
+    """Detached, read-only copy of a Category row"""
+    id: str
+    name: str
+    description: str
+
+
+@dataclass(frozen=True)
+class CategorySnapshot:
+    """Immutable view of the categories table"""
+    categories: Mapping[str, CategoryInfo]
+    # "- id: name - description" lines for the classifier prompt
+    categories_list: str
+    loaded_at: datetime
+
+    def get(self, category_id: str) -> CategoryInfo | None:
+        return self.categories.get(category_id)
+
+    def name_of(self, category_id: str) -> str:
+        category = self.categories.get(category_id)
+        return category.name if category else ""
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    @classmethod
+    def load(cls, session: Session) -> "CategorySnapshot":
+        rows = session.exec(select(Category).order_by(Category.id)).all()
+        categories = {
+            row.id: CategoryInfo(id=row.id, name=row.name, description=row.description)
+            for row in rows
+        }
+        categories_list = "\n".join(
+            f"- {cat.id}: {cat.name} - {cat.description}" for cat in categories.values()
+        )
+        return cls(
+            categories=MappingProxyType(categories),
+            categories_list=categories_list,
+            loaded_at=datetime.now(timezone.utc),
+        )
+
+
+_snapshot: CategorySnapshot | None = None
+_snapshot_lock = threading.Lock()
+
+
+def reload_category_registry(session: Session | None = None) -> CategorySnapshot:
+    """Load a fresh snapshot and swap it in atomically (readers keep the old one until then)"""
+    global _snapshot
+    if session is None:
+        with Session(engine) as own_session:
+            snapshot = CategorySnapshot.load(own_session)
+    else:
+        snapshot = CategorySnapshot.load(session)
+
+    with _snapshot_lock:
+        _snapshot = snapshot
+    logger.info(f"Category registry loaded: {len(snapshot)} categories")
+    return snapshot
+
+
+def get_category_registry(session: Session | None = None) -> CategorySnapshot:
+    """Current snapshot, loaded on first use (an empty catalog is retried, e.g. before seeding)"""
+    snapshot = _snapshot
+    if snapshot is not None and len(snapshot):
+        return snapshot
+    return reload_category_registry(session)
+
+
+def invalidate_category_registry() -> None:
+    """Drop the snapshot, the next access reloads it"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
@@ -1,8 +1,17 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import List, Tuple
 
 from sqlmodel import Session
-from app.db_models import Category
+from app.core.config import settings
+from app.services.category_registry import CategoryInfo, get_category_registry
+from app.services.classifier.result_cache import (
+    aget_data_version,
+    classification_cache_key,
+    get_cached_result,
+    get_data_version,
+    store_result,
+)
 
 
 class BaseClassifier(ABC):
@@ -16,13 +25,117 @@ class BaseClassifier(ABC):
         """Must return (category_id, confidence, reasoning, is_urgent)"""
         pass
 
-    def get_category_info(self, category_id: str) -> Category | None:
-        return self.session.get(Category, category_id)
+    async def aclassify(self, problem_text: str) -> Tuple[str, float, str, bool]:
+        """
+        Async version of classify. Strategies override this with native async provider calls;
+        the default runs the sync version in a worker thread so the event loop is never blocked.
+        """
+        return await asyncio.to_thread(self.classify, problem_text)
+
+    async def aclassify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """Async version of classify_batch"""
+        return [await self.aclassify(problem_text) for problem_text in problem_texts]
+
+    def get_category_info(self, category_id: str) -> CategoryInfo | None:
+        return get_category_registry(self.session).get(category_id)
+
+    def classify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """Classify several problems. Strategies override this to share round trips."""
+        return [self.classify(problem_text) for problem_text in problem_texts]
 
     def classify_with_category(self, problem_text: str) -> dict:
-        """Shared logic for formatting the final response"""
-        category_id, confidence, reasoning, is_urgent = self.classify(problem_text)
-        
+        """Shared logic for formatting the final response (served from the result cache when possible)"""
+        if not settings.CLASSIFICATION_CACHE_ENABLED:
+            return self._format_result(*self.classify(problem_text))
+
+        key = classification_cache_key(get_data_version(self.session), problem_text, self._cache_params())
+        cached = get_cached_result(key)
+        if cached is not None:
+            return cached
+
+        result = self._format_result(*self.classify(problem_text))
+        store_result(key, result)
+        return result
+
+    def classify_with_category_batch(self, problem_texts: List[str]) -> List[dict]:
+        """Batch version of classify_with_category, results are in input order"""
+        data_version = get_data_version(self.session) if settings.CLASSIFICATION_CACHE_ENABLED else None
+        keys, results, misses = self._lookup_cached(problem_texts, data_version)
+        if misses:
+            computed = self.classify_batch([problem_texts[i] for i in misses])
+            self._fill_misses(keys, results, misses, computed)
+        return results
+
+    async def aclassify_with_category(self, problem_text: str) -> dict:
+        """Async version of classify_with_category"""
+        if not settings.CLASSIFICATION_CACHE_ENABLED:
+            return self._format_result(*await self.aclassify(problem_text))
+
+        data_version = await aget_data_version(self.session)
+        key = classification_cache_key(data_version, problem_text, self._cache_params())
+        cached = get_cached_result(key)
+        if cached is not None:
+            return cached
+
+        result = self._format_result(*await self.aclassify(problem_text))
+        store_result(key, result)
+        return result
+
+    async def aclassify_with_category_batch(self, problem_texts: List[str]) -> List[dict]:
+        """Async version of classify_with_category_batch"""
+        data_version = await aget_data_version(self.session) if settings.CLASSIFICATION_CACHE_ENABLED else None
+        keys, results, misses = self._lookup_cached(problem_texts, data_version)
+        if misses:
+            computed = await self.aclassify_batch([problem_texts[i] for i in misses])
+            self._fill_misses(keys, results, misses, computed)
+        return results
+
+    def _cache_params(self) -> tuple:
+        """Classifier parameters that change results, part of the result cache key"""
+        return type(self).__name__, settings.TOP_K
+
+    def _lookup_cached(
+        self, problem_texts: List[str], data_version: str | None
+    ) -> Tuple[list, List[dict | None], List[int]]:
+        """
+        Returns (cache keys, cached results or None, positions to classify).
+        Repeated texts inside one batch are classified once. No data_version: cache disabled.
+        """
+        if data_version is None:
+            return [None] * len(problem_texts), [None] * len(problem_texts), list(range(len(problem_texts)))
+
+        params = self._cache_params()
+        keys = [classification_cache_key(data_version, problem_text, params) for problem_text in problem_texts]
+        results = [get_cached_result(key) for key in keys]
+
+        misses = {}
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                misses.setdefault(key, i)
+        return keys, results, list(misses.values())
+
+    def _fill_misses(
+        self,
+        keys: list,
+        results: List[dict | None],
+        misses: List[int],
+        computed: List[Tuple[str, float, str, bool]],
+    ) -> None:
+        by_key = {}
+        for i, raw_result in zip(misses, computed):
+            result = self._format_result(*raw_result)
+            if keys[i] is not None:
+                store_result(keys[i], result)
+            by_key[keys[i]] = result
+            results[i] = result
+
+        # Duplicates of a classified text share its result
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = dict(by_key[keys[i]])
+
+    def _format_result(self, category_id: str, confidence: float, reasoning: str, is_urgent: bool) -> dict:
+        """Attach category details to a (category_id, confidence, reasoning, is_urgent) result"""
         if category_id == "other":
              return {
                 "category_id": "other",
@@ -1,14 +1,45 @@
+import asyncio
 import logging
+import threading
 from sqlmodel import Session
-from typing import Tuple
+from typing import List, Tuple
 
+from app.core.config import settings
 from app.services.classifier.base_classifier import BaseClassifier
 from app.services.classifier.knn_classifier import KNNClassifier
-from app.services.classifier.llm_classifier import LLMClassifier
+from app.services.classifier.llm_classifier import FEW_SHOT_K, LLMClassifier
+from app.services.classifier.retrieval import RetrievalContext
 
 logger = logging.getLogger(__name__)
 
 
+class _HedgeStats:
+    """Counters of the hedged LLM fallback, to tune HYBRID_HEDGE_DELAY_SECONDS"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {"fallbacks": 0, "hedged": 0, "hedge_wins": 0, "wasted": 0}
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+_hedge_stats = _HedgeStats()
+
+
+def get_hedging_stats() -> dict:
+    """
+    fallbacks: LLM fallbacks on the async path, hedged: second call started,
+    hedge_wins: second call answered first, wasted: calls cancelled after the other answered.
+    """
+    return {"enabled": settings.HYBRID_HEDGE_ENABLED, **_hedge_stats.snapshot()}
+
+
 class HybridClassifier(BaseClassifier):
     """
     Tries the fast k-NN approach first.
@@ -22,25 +53,126 @@ class HybridClassifier(BaseClassifier):
         self.knn_strategy = KNNClassifier(session)
         self.llm_strategy = LLMClassifier(session)
 
+        # Retrieve enough neighbors for both the k-NN vote and the LLM few-shot prompt
+        self.retrieval_k = max(settings.TOP_K, FEW_SHOT_K)
+
     def classify(self, problem_text: str) -> Tuple[str, float, str, bool]:
         """
         Orchestrates the classification flow.
         """
-        cat_id, confidence, reasoning, is_urgent = self.knn_strategy.classify(problem_text)
+        return self._resolve(problem_text, self.knn_strategy.retrieve(problem_text, self.retrieval_k))
+
+    def classify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """
+        Runs k-NN for the whole batch at once, then falls back to LLM per low-confidence item.
+        """
+        contexts = self.knn_strategy.retrieve_batch(problem_texts, self.retrieval_k)
+        return [
+            self._resolve(problem_text, context)
+            for problem_text, context in zip(problem_texts, contexts)
+        ]
+
+    async def aclassify(self, problem_text: str) -> Tuple[str, float, str, bool]:
+        """
+        Async version of classify.
+        """
+        return await self._aresolve(problem_text, await self.knn_strategy.aretrieve(problem_text, self.retrieval_k))
+
+    async def aclassify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """
+        Async version of classify_batch, LLM fallbacks for the batch run concurrently.
+        """
+        contexts = await self.knn_strategy.aretrieve_batch(problem_texts, self.retrieval_k)
+        return list(await asyncio.gather(*(
+            self._aresolve(problem_text, context)
+            for problem_text, context in zip(problem_texts, contexts)
+        )))
+
+    def _resolve(self, problem_text: str, context: RetrievalContext) -> Tuple[str, float, str, bool]:
+        """
+        Accepts a confident k-NN result or falls back to LLM (reusing the same neighbors).
+        """
+        cat_id, confidence, reasoning, is_urgent = self.knn_strategy.classify_context(context)
 
         if confidence >= self.threshold:
             return cat_id, confidence, f"[Hybrid-Fast] {reasoning}", is_urgent
 
+        self._log_fallback(confidence)
+        return self._deep_result(self.llm_strategy.classify(problem_text, context=context), confidence)
+
+    async def _aresolve(self, problem_text: str, context: RetrievalContext) -> Tuple[str, float, str, bool]:
+        """
+        Async version of _resolve.
+        """
+        cat_id, confidence, reasoning, is_urgent = self.knn_strategy.classify_context(context)
+
+        if confidence >= self.threshold:
+            return cat_id, confidence, f"[Hybrid-Fast] {reasoning}", is_urgent
+
+        self._log_fallback(confidence)
+        return self._deep_result(await self._allm_fallback(problem_text, context), confidence)
+
+    async def _allm_fallback(self, problem_text: str, context: RetrievalContext) -> Tuple[str, float, str, bool]:
+        """
+        LLM fallback, hedged when HYBRID_HEDGE_ENABLED: if the first call is still running after
+        HYBRID_HEDGE_DELAY_SECONDS, an identical second call is started, the first answer wins
+        and the other call is cancelled.
+
+        Hedging replaces a speculative start driven by the k-NN vote split: the few-shot prompt
+        needs the neighbors of the same retrieval that produces the vote, and the vote is ready
+        right after retrieval, so the fallback already starts at the earliest possible moment.
+        What is left to cut is the LLM tail latency, at the cost of duplicate calls, hence off
+        by default.
+        """
+        if not settings.HYBRID_HEDGE_ENABLED:
+            return await self.llm_strategy.aclassify(problem_text, context=context)
+
+        _hedge_stats.count("fallbacks")
+        primary = asyncio.create_task(self.llm_strategy.aclassify(problem_text, context=context))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=settings.HYBRID_HEDGE_DELAY_SECONDS)
+            if not done:
+                _hedge_stats.count("hedged")
+                tasks.add(asyncio.create_task(self.llm_strategy.aclassify(problem_text, context=context)))
+
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    winner = succeeded[0]
+                    if winner is not primary:
+                        _hedge_stats.count("hedge_wins")
+                    return winner.result()
+
+                tasks -= done
+                if not tasks:
+                    # Both calls failed, surface the error of the last one
+                    raise done.pop().exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    _hedge_stats.count("wasted")
+                    task.cancel()
+
+    def _cache_params(self) -> tuple:
+        return super()._cache_params() + (self.threshold,)
+
+    def _log_fallback(self, confidence: float) -> None:
         logger.info(
             f"Hybrid Fallback: KNN confidence {confidence} < {self.threshold}. "
             "Перехід до класифікації LLM.."
         )
-        
-        llm_cat, llm_conf, llm_reason, llm_is_urgent = self.llm_strategy.classify(problem_text)
+
+    @staticmethod
+    def _deep_result(
+        llm_result: Tuple[str, float, str, bool], knn_confidence: float
+    ) -> Tuple[str, float, str, bool]:
+        llm_cat, llm_conf, llm_reason, llm_is_urgent = llm_result
 
         final_reasoning = (
             f"[Hybrid-Deep] {llm_reason} "
-            f"(Викликано після невдалої спроби KNN: confidence було лише {confidence:.2f})"
+            f"(Викликано після невдалої спроби KNN: confidence було лише {knn_confidence:.2f})"
         )
         
         return llm_cat, llm_conf, final_reasoning, llm_is_urgent
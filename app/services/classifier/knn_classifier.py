@@ -1,12 +1,21 @@
-from typing import Tuple
-from collections import Counter
-import math
-from sqlmodel import Session, select
+from typing import List, Tuple
+
+import numpy as np
+from sqlmodel import Session
 
 from app.core.config import settings
-from app.db_models import Example
 from app.llm.client import get_embeddings
 from app.services.classifier.base_classifier import BaseClassifier
+from app.services.classifier.knn_index import KNNIndex, get_knn_index
+from app.services.classifier.result_cache import aget_data_version, get_data_version
+from app.services.classifier.retrieval import (
+    EPSILON,
+    MAX_COSINE_DISTANCE,
+    Neighbors,
+    RetrievalContext,
+    find_nearest_examples,
+    find_nearest_examples_batch,
+)
 
 class KNNClassifier(BaseClassifier):
     """
@@ -18,68 +27,73 @@ class KNNClassifier(BaseClassifier):
         super().__init__(session)
         self.embeddings = get_embeddings()
 
-    MAX_COSINE_DISTANCE = 2.0
-    EPSILON = 1e-9
+    MAX_COSINE_DISTANCE = MAX_COSINE_DISTANCE
+    EPSILON = EPSILON
 
-    def _get_nearest_neighbors(self, query_embedding, k: int) -> list[Example]:
+    def _get_nearest_neighbors(self, query_embedding, k: int) -> Neighbors:
         """
         Finds the K nearest neighbors based on cosine distance.
+        Uses the in-process index when enabled, pgvector otherwise.
         """
-        statement = (
-            select(Example)
-            .order_by(Example.embedding.cosine_distance(query_embedding))
-            .limit(k)
-        )
+        if settings.KNN_INDEX_ENABLED:
+            return self._knn_index().search(query_embedding, k)
 
-        return self.session.exec(statement).all()
+        return find_nearest_examples(self.session, query_embedding, k)
 
-    def _cosine_distance(self, vec_a: list[float], vec_b: list[float]) -> float:
+    def _get_nearest_neighbors_batch(self, query_embeddings: list, k: int) -> list[Neighbors]:
         """
-        Compute cosine distance between two vectors (1 - cosine similarity).
-        Falls back to max distance when a zero vector is encountered.
+        Finds the K nearest neighbors for several queries at once
+        (one matrix multiplication or one SQL round trip).
         """
-        norm_a = math.sqrt(sum(x * x for x in vec_a))
-        norm_b = math.sqrt(sum(x * x for x in vec_b))
-        if norm_a < self.EPSILON or norm_b < self.EPSILON:
-            return self.MAX_COSINE_DISTANCE
+        if settings.KNN_INDEX_ENABLED:
+            return self._knn_index().search_batch(query_embeddings, k)
 
-        dot_product = sum(a * b for a, b in zip(vec_a, vec_b))
-        similarity = dot_product / (norm_a * norm_b)
-        # Clamp similarity to avoid floating point artifacts outside [-1, 1].
-        similarity = max(-1.0, min(1.0, similarity))
-        return 1 - similarity
+        return find_nearest_examples_batch(self.session, query_embeddings, k)
 
-    def _prepare_neighbor_distances(
-        self, query_embedding: list[float], neighbors: list[Example]
-    ) -> list[tuple[Example, float]]:
+    def _knn_index(self) -> KNNIndex:
         """
-        Attach cosine distances to each neighbor so we can reason about confidence.
+        Process-wide index. The (rate-limited) data-version check invalidates it when
+        examples/categories change, so new examples are picked up without a restart.
         """
-        return [
-            (neighbor, self._cosine_distance(query_embedding, neighbor.embedding))
-            for neighbor in neighbors
-        ]
+        get_data_version(self.session)
+        return get_knn_index(self.session)
+
+    async def _arefresh_data_version(self) -> None:
+        """Run a due data-version check in a worker thread, so _knn_index does not query on the event loop"""
+        if settings.KNN_INDEX_ENABLED:
+            await aget_data_version(self.session)
+
+    @staticmethod
+    def _majority_vote(labels: np.ndarray) -> tuple[object, int]:
+        """
+        Pick the most frequent label.
+        Ties are broken in favor of the label whose first vote is the closest neighbor.
+        """
+        values, first_positions, counts = np.unique(labels, return_index=True, return_counts=True)
+        tied = np.flatnonzero(counts == counts.max())
+        winner = tied[np.argmin(first_positions[tied])]
+        return values[winner], int(counts[winner])
 
     def _distance_confidence(
-        self, winner_distances: list[float], competitor_distances: list[float]
+        self, distances: np.ndarray, winner_mask: np.ndarray
     ) -> tuple[float, float | None, float | None]:
         """
         Estimate how separated the winning label is from the closest competitor.
         Returns (confidence_component, closest_winner, closest_competitor).
         """
-        if not winner_distances:
+        if not winner_mask.any():
             return 0.0, None, None
 
-        closest_winner = min(winner_distances)
+        closest_winner = float(distances[winner_mask].min())
 
-        if not competitor_distances:
+        if winner_mask.all():
             # No competitor → rely on absolute distance (smaller distance => higher confidence).
             absolute_component = max(
                 0.0, 1 - (closest_winner / self.MAX_COSINE_DISTANCE)
             )
             return absolute_component, closest_winner, None
 
-        closest_competitor = min(competitor_distances)
+        closest_competitor = float(distances[~winner_mask].min())
         if closest_competitor < self.EPSILON:
             return 0.0, closest_winner, closest_competitor
 
@@ -96,6 +110,51 @@ class KNNClassifier(BaseClassifier):
         blended = 0.5 * vote_component + 0.5 * distance_component
         return max(0.0, min(1.0, blended))
 
+    def retrieve(self, problem_text: str, k: int) -> RetrievalContext:
+        """
+        Embed the text and find its K nearest neighbors.
+        The context can be handed to the LLM stage so it does not embed and search again.
+        """
+        query_embedding = self.embeddings.embed_query(problem_text)
+        return RetrievalContext(query_embedding, self._get_nearest_neighbors(query_embedding, k), k)
+
+    def retrieve_batch(self, problem_texts: List[str], k: int) -> List[RetrievalContext]:
+        """
+        Batch version of retrieve: one embeddings API call and one neighbor search.
+        """
+        query_embeddings = self.embeddings.embed_documents(problem_texts)
+        neighbors_batch = self._get_nearest_neighbors_batch(query_embeddings, k)
+        return [
+            RetrievalContext(query_embedding, neighbors, k)
+            for query_embedding, neighbors in zip(query_embeddings, neighbors_batch)
+        ]
+
+    async def aretrieve(self, problem_text: str, k: int) -> RetrievalContext:
+        """
+        Async version of retrieve (embedding call does not block the event loop).
+        """
+        query_embedding = await self.embeddings.aembed_query(problem_text)
+        await self._arefresh_data_version()
+        return RetrievalContext(query_embedding, self._get_nearest_neighbors(query_embedding, k), k)
+
+    async def aretrieve_batch(self, problem_texts: List[str], k: int) -> List[RetrievalContext]:
+        """
+        Async version of retrieve_batch.
+        """
+        query_embeddings = await self.embeddings.aembed_documents(problem_texts)
+        await self._arefresh_data_version()
+        neighbors_batch = self._get_nearest_neighbors_batch(query_embeddings, k)
+        return [
+            RetrievalContext(query_embedding, neighbors, k)
+            for query_embedding, neighbors in zip(query_embeddings, neighbors_batch)
+        ]
+
+    def classify_context(self, context: RetrievalContext) -> Tuple[str, float, str, bool]:
+        """
+        Vote among the TOP_K closest neighbors of an already retrieved context.
+        """
+        return self._classify_neighbors(context.neighbors.head(settings.TOP_K))
+
     def classify(self, problem_text: str) -> Tuple[str, float, str, bool]:
         """
         Classify the problem by category and determine its urgency (is_urgent).
@@ -103,80 +162,59 @@ class KNNClassifier(BaseClassifier):
         Returns:
             Tuple[category_id, confidence, reasoning, is_urgent, is_relevant]
         """
-        k_neighbors = settings.TOP_K 
-        query_embedding = self.embeddings.embed_query(problem_text)
+        # One retrieval feeds both category and urgency votes
+        return self.classify_context(self.retrieve(problem_text, settings.TOP_K))
 
-        # 1. FIND NEIGHBORS FOR CATEGORY (Use ALL data)
-        # Category uses all available data
-        neighbors_category = self._get_nearest_neighbors(query_embedding, k_neighbors)
-        
-        if not neighbors_category:
+    def classify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """
+        Classify several problems with one embeddings API call and one neighbor search.
+        """
+        return [self.classify_context(context) for context in self.retrieve_batch(problem_texts, settings.TOP_K)]
+
+    async def aclassify(self, problem_text: str) -> Tuple[str, float, str, bool]:
+        """
+        Async version of classify (embedding call does not block the event loop).
+        """
+        return self.classify_context(await self.aretrieve(problem_text, settings.TOP_K))
+
+    async def aclassify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """
+        Async version of classify_batch.
+        """
+        contexts = await self.aretrieve_batch(problem_texts, settings.TOP_K)
+        return [self.classify_context(context) for context in contexts]
+
+    def _classify_neighbors(self, neighbors: Neighbors) -> Tuple[str, float, str, bool]:
+        """
+        Vote on category and urgency among the retrieved neighbors.
+        """
+        if not len(neighbors):
             return "other", 0.0, "No historical examples found for category classification.", False
 
         # --- A. VOTING FOR CATEGORY (Multi-Class) ---
-        votes_cat = [ex.category_id for ex in neighbors_category]
-        vote_counts_cat = Counter(votes_cat)
-        winner_cat, count_cat = vote_counts_cat.most_common(1)[0]
-        neighbor_distances_cat = self._prepare_neighbor_distances(
-            query_embedding, neighbors_category
-        )
-        winner_distance_values = [
-            dist for example, dist in neighbor_distances_cat if example.category_id == winner_cat
-        ]
-        competitor_distance_values = [
-            dist for example, dist in neighbor_distances_cat if example.category_id != winner_cat
-        ]
+        winner_cat, count_cat = self._majority_vote(neighbors.category_ids)
         distance_component_cat, closest_winner_cat, closest_competitor_cat = self._distance_confidence(
-            winner_distance_values, competitor_distance_values
+            neighbors.distances, neighbors.category_ids == winner_cat
         )
-        vote_component_cat = count_cat / len(neighbors_category)
+        vote_component_cat = count_cat / len(neighbors)
         confidence_cat = self._blend_confidence(vote_component_cat, distance_component_cat)
 
-        # 2. FIND NEIGHBORS FOR URGENCY
-        neighbors_urgency = self._get_nearest_neighbors(
-            query_embedding, 
-            k_neighbors
-        )
-        
-        # If no neighbors found even in tagged zone, we cannot determine urgency.
-        if not neighbors_urgency:
-             is_urgent_result = False
-             
-             reasoning = (
-                 f"[KNN] Category: '{winner_cat}' ({count_cat}/{len(neighbors_category)} votes). "
-             )
-             return winner_cat, round(confidence_cat, 2), reasoning, is_urgent_result
-
-
         # --- B. VOTING FOR URGENCY (Binary) ---
         
         # 1. Count votes for True
-        neighbor_distances_urgency = self._prepare_neighbor_distances(
-            query_embedding, neighbors_urgency
-        )
-        urgent_votes = sum(1 for ex in neighbors_urgency if ex.is_urgent)
+        urgent_votes = int(np.count_nonzero(neighbors.is_urgent))
         
         # 2. Determine urgency: Majority voting
-        is_urgent_result = urgent_votes > (len(neighbors_urgency) / 2) 
+        is_urgent_result = urgent_votes > (len(neighbors) / 2) 
         
         # 3. Confidence for urgency (number of True votes / Total)
-        urgent_winner_distances = [
-            dist
-            for example, dist in neighbor_distances_urgency
-            if bool(example.is_urgent) == is_urgent_result
-        ]
-        urgent_competitor_distances = [
-            dist
-            for example, dist in neighbor_distances_urgency
-            if bool(example.is_urgent) != is_urgent_result
-        ]
         distance_component_urgency, closest_winner_urgency, closest_competitor_urgency = self._distance_confidence(
-            urgent_winner_distances, urgent_competitor_distances
+            neighbors.distances, neighbors.is_urgent == is_urgent_result
         )
         vote_component_urgency = (
-            urgent_votes / len(neighbors_urgency)
+            urgent_votes / len(neighbors)
             if is_urgent_result
-            else (len(neighbors_urgency) - urgent_votes) / len(neighbors_urgency)
+            else (len(neighbors) - urgent_votes) / len(neighbors)
         )
         confidence_urgent = self._blend_confidence(
             vote_component_urgency, distance_component_urgency
@@ -196,9 +234,9 @@ class KNNClassifier(BaseClassifier):
             return f"closest dist: {closest_winner:.3f}, gap: {gap:.3f}"
 
         reasoning = (
-            f"[KNN] Category: '{cat_name}' ({count_cat}/{len(neighbors_category)} votes, "
+            f"[KNN] Category: '{cat_name}' ({count_cat}/{len(neighbors)} votes, "
             f"{_format_distance_details(closest_winner_cat, closest_competitor_cat)}). "
-            f"Urgency: {'True' if is_urgent_result else 'False'} ({urgent_votes}/{len(neighbors_urgency)} votes, "
+            f"Urgency: {'True' if is_urgent_result else 'False'} ({urgent_votes}/{len(neighbors)} votes, "
             f"{_format_distance_details(closest_winner_urgency, closest_competitor_urgency)}). "
             f"Confidence in Category: {round(confidence_cat, 2)}. "
             f"Confidence in Urgency: {round(confidence_urgent, 2)}"
@@ -0,0 +1,179 @@
+"""
+In-process vectorized k-NN index over the `examples` table.
+
+Keeps a pre-normalized float32 copy of every example embedding in memory,
+so nearest-neighbor search is a single matrix-vector product instead of
+a pgvector round trip per request. Built at startup when KNN_INDEX_ENABLED,
+invalidated by the classification data-version check when examples change.
+"""
+import threading
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.core.logging import get_logger
+from app.db_models import Example
+from app.services.classifier.retrieval import EPSILON, MAX_COSINE_DISTANCE, Neighbors
+
+logger = get_logger(__name__)
+
+
+class KNNIndex:
+    """Immutable snapshot of example embeddings with category and urgency labels"""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        category_ids: np.ndarray,
+        is_urgent: np.ndarray,
+        texts: np.ndarray,
+        matrix: np.ndarray,
+    ):
+        norms = np.linalg.norm(matrix, axis=1) if len(matrix) else np.zeros(0, dtype=np.float32)
+        # Zero vectors cannot be compared by angle, they are always treated as the farthest neighbors.
+        self.valid = norms >= EPSILON
+        safe_norms = np.where(self.valid, norms, 1.0).astype(np.float32)
+
+        self.ids = ids
+        self.category_ids = category_ids
+        self.is_urgent = is_urgent
+        self.texts = texts
+        self.matrix = np.ascontiguousarray(matrix / safe_norms[:, None], dtype=np.float32)
+
+    @classmethod
+    def build(cls, session: Session) -> "KNNIndex":
+        """Load all examples with embeddings from the database"""
+        statement = (
+            select(Example.id, Example.category_id, Example.is_urgent, Example.text, Example.embedding)
+            .where(Example.embedding.is_not(None))
+            .order_by(Example.id)
+        )
+        rows = session.exec(statement).all()
+
+        if rows:
+            matrix = np.vstack([np.asarray(row.embedding, dtype=np.float32) for row in rows])
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        index = cls(
+            ids=np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows)),
+            category_ids=np.array([row.category_id for row in rows], dtype=object),
+            is_urgent=np.fromiter((bool(row.is_urgent) for row in rows), dtype=bool, count=len(rows)),
+            texts=np.array([row.text for row in rows], dtype=object),
+            matrix=matrix,
+        )
+        logger.info(f"KNN index built: {len(index)} examples")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query_embedding, k: int) -> Neighbors:
+        """
+        Find the K nearest examples by cosine distance.
+
+        Args:
+            query_embedding: Query vector (same dimension as stored embeddings)
+            k: Number of neighbors to return
+
+        Returns:
+            Neighbors sorted by ascending distance
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return self._take(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if query_norm < EPSILON:
+            distances = np.full(len(self), MAX_COSINE_DISTANCE, dtype=np.float32)
+        else:
+            similarities = self.matrix @ (query / query_norm)
+            # Clamp similarity to avoid floating point artifacts outside [-1, 1].
+            distances = 1.0 - np.clip(similarities, -1.0, 1.0)
+            distances[~self.valid] = MAX_COSINE_DISTANCE
+
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind="stable")]
+        return self._take(top, distances[top])
+
+    def search_batch(self, query_embeddings, k: int) -> list[Neighbors]:
+        """
+        Find the K nearest examples for several queries with one matrix multiplication.
+
+        Args:
+            query_embeddings: Query vectors, one per row
+            k: Number of neighbors to return per query
+
+        Returns:
+            Neighbors for each query, in input order
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or not len(queries):
+            return []
+
+        k = min(k, len(self))
+        if k <= 0:
+            return [self._take(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)) for _ in queries]
+
+        query_norms = np.linalg.norm(queries, axis=1)
+        valid_queries = query_norms >= EPSILON
+        queries = queries / np.where(valid_queries, query_norms, 1.0)[:, None]
+
+        similarities = queries @ self.matrix.T
+        # Clamp similarity to avoid floating point artifacts outside [-1, 1].
+        distances = 1.0 - np.clip(similarities, -1.0, 1.0)
+        distances[:, ~self.valid] = MAX_COSINE_DISTANCE
+        distances[~valid_queries, :] = MAX_COSINE_DISTANCE
+
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_distances = np.take_along_axis(top_distances, order, axis=1)
+
+        return [self._take(positions, row_distances) for positions, row_distances in zip(top, top_distances)]
+
+    def _take(self, positions: np.ndarray, distances: np.ndarray) -> Neighbors:
+        return Neighbors(
+            ids=self.ids[positions],
+            category_ids=self.category_ids[positions],
+            is_urgent=self.is_urgent[positions],
+            texts=self.texts[positions],
+            distances=distances.astype(np.float64),
+        )
+
+
+_index: KNNIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_knn_index(session: Session) -> KNNIndex:
+    """Get the process-wide index, building it on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = KNNIndex.build(session)
+    return _index
+
+
+def rebuild_knn_index(session: Session | None = None) -> KNNIndex:
+    """Rebuild the index from the current `examples` table and swap it in atomically"""
+    global _index
+    if session is None:
+        with Session(engine) as own_session:
+            index = KNNIndex.build(own_session)
+    else:
+        index = KNNIndex.build(session)
+    with _index_lock:
+        _index = index
+    return index
+
+
+def invalidate_knn_index() -> None:
+    """Drop the index, the next request rebuilds it"""
+    global _index
+    with _index_lock:
+        _index = None
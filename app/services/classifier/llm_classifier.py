@@ -1,13 +1,24 @@
-from typing import Tuple
+from typing import List, Tuple
+import asyncio
 import json
 
-from sqlmodel import Session, select
+from sqlmodel import Session
+from app.core.config import settings
 from app.llm.client import get_llm, get_embeddings
 from app.llm.prompts import CLASSIFIER_SAFE_TEMPLATE
+from app.services.category_registry import get_category_registry
 from app.services.classifier.base_classifier import BaseClassifier
-from app.db_models import Category, Example
+from app.services.classifier.retrieval import (
+    Neighbors,
+    RetrievalContext,
+    find_nearest_examples,
+    find_nearest_examples_batch,
+)
 from app.utils.security import sanitize_prompt_input
 
+# Number of nearest examples shown to the LLM as few-shot examples
+FEW_SHOT_K = 5
+
 
 class LLMClassifier(BaseClassifier):
     """Intelligent, generative classifier using Few-Shot Prompting"""
@@ -21,36 +32,48 @@ class LLMClassifier(BaseClassifier):
             self.llm = get_llm()
         return self.llm
     
-    def _get_similar_examples(self, problem_text: str, top_k: int = 5) -> list[Example]:
-        """Find most similar examples through vector search"""
+    def _get_similar_examples(
+        self, problem_text: str, top_k: int = FEW_SHOT_K, context: RetrievalContext | None = None
+    ) -> Neighbors:
+        """Find most similar examples through vector search (reuses a retrieval context when it has enough neighbors)"""
+        if context is not None:
+            neighbors = context.neighbors_for(top_k)
+            if neighbors is not None:
+                return neighbors
 
         # Generate embedding for user's problem
         embeddings = get_embeddings()
         query_embedding = embeddings.embed_query(problem_text)
 
-        # Vector search for nearest examples
-        statement = (
-            select(Example)
-            .order_by(Example.embedding.cosine_distance(query_embedding))
-            .limit(top_k)
-        )
- 
-        results = self.session.exec(statement).all()
-        return results
+        # Vector search for nearest examples (text and category only, no embeddings)
+        return find_nearest_examples(self.session, query_embedding, top_k)
+
+    async def _aget_similar_examples(
+        self, problem_text: str, top_k: int = FEW_SHOT_K, context: RetrievalContext | None = None
+    ) -> Neighbors:
+        """Async version of _get_similar_examples (embedding call does not block the event loop)"""
+        if context is not None:
+            neighbors = context.neighbors_for(top_k)
+            if neighbors is not None:
+                return neighbors
+
+        embeddings = get_embeddings()
+        query_embedding = await embeddings.aembed_query(problem_text)
+
+        return find_nearest_examples(self.session, query_embedding, top_k)
 
-    def _build_few_shot_prompt(self, problem_text: str, similar_examples: list[Example]) -> str:
+    def _build_few_shot_prompt(self, problem_text: str, similar_examples: Neighbors) -> str:
         """Build secure prompt with few-shot examples"""
 
-        # Get all categories
-        categories = self.session.exec(select(Category)).all()
-        categories_list = "\n".join([f"- {cat.id}: {cat.name} - {cat.description}" for cat in categories])
+        # Pre-rendered list of all categories
+        categories_list = get_category_registry(self.session).categories_list
 
         # Format examples
         examples_text = ""
-        for i, example in enumerate(similar_examples, 1):
+        for i, (text, category_id) in enumerate(zip(similar_examples.texts, similar_examples.category_ids), 1):
             examples_text += f"\nExample {i}:\n"
-            examples_text += f"Text: \"{example.text}\"\n"
-            examples_text += f"Category: {example.category_id}\n"
+            examples_text += f"Text: \"{text}\"\n"
+            examples_text += f"Category: {category_id}\n"
 
         # Use safe prompt template from file
         prompt = CLASSIFIER_SAFE_TEMPLATE.format(
@@ -61,9 +84,15 @@ class LLMClassifier(BaseClassifier):
 
         return prompt
     
-    def classify(self, problem_text: str) -> Tuple[str, float, str, bool]:
+    def classify(
+        self, problem_text: str, context: RetrievalContext | None = None
+    ) -> Tuple[str, float, str, bool]:
         """
         Classify user's problem, check urgency in single LLM call
+
+        Args:
+            problem_text: User's problem description
+            context: Neighbors already retrieved for this text (e.g. by the hybrid k-NN stage)
         
         Returns:
             Tuple[category_id, confidence, reasoning, is_urgent]
@@ -72,9 +101,9 @@ class LLMClassifier(BaseClassifier):
         sanitized_text = sanitize_prompt_input(problem_text, max_length=2000)
         
         # Step 1: Find similar examples through RAG
-        similar_examples = self._get_similar_examples(sanitized_text, top_k=5)
+        similar_examples = self._get_similar_examples(sanitized_text, context=context)
         
-        if not similar_examples:
+        if not len(similar_examples):
             return "other", 0.5, "No similar examples found in database", False
         
         # Step 2: Build few-shot prompt
@@ -85,9 +114,67 @@ class LLMClassifier(BaseClassifier):
         response = llm.invoke(prompt)
         
         # Step 4: Parse response
+        return self._parse_response(response.content)
+
+    def classify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """
+        Classify several problems with one embeddings API call and one neighbor search,
+        then one LLM call per text.
+        """
+        sanitized_texts = [sanitize_prompt_input(problem_text, max_length=2000) for problem_text in problem_texts]
+        query_embeddings = get_embeddings().embed_documents(sanitized_texts)
+        neighbors_batch = find_nearest_examples_batch(self.session, query_embeddings, FEW_SHOT_K)
+
+        return [
+            self.classify(problem_text, context=RetrievalContext(query_embedding, neighbors, FEW_SHOT_K))
+            for problem_text, query_embedding, neighbors in zip(problem_texts, query_embeddings, neighbors_batch)
+        ]
+
+    async def aclassify(
+        self, problem_text: str, context: RetrievalContext | None = None
+    ) -> Tuple[str, float, str, bool]:
+        """
+        Async version of classify: embedding and LLM calls do not block the event loop
+        """
+        sanitized_text = sanitize_prompt_input(problem_text, max_length=2000)
+
+        similar_examples = await self._aget_similar_examples(sanitized_text, context=context)
+
+        if not len(similar_examples):
+            return "other", 0.5, "No similar examples found in database", False
+
+        prompt = self._build_few_shot_prompt(sanitized_text, similar_examples)
+
+        llm = self._get_llm()
+        response = await llm.ainvoke(prompt)
+
+        return self._parse_response(response.content)
+
+    async def aclassify_batch(self, problem_texts: List[str]) -> List[Tuple[str, float, str, bool]]:
+        """
+        Async version of classify_batch: the LLM calls run concurrently,
+        at most CLASSIFY_BATCH_LLM_CONCURRENCY at a time.
+        """
+        sanitized_texts = [sanitize_prompt_input(problem_text, max_length=2000) for problem_text in problem_texts]
+        query_embeddings = await get_embeddings().aembed_documents(sanitized_texts)
+        neighbors_batch = find_nearest_examples_batch(self.session, query_embeddings, FEW_SHOT_K)
+
+        slots = asyncio.Semaphore(settings.CLASSIFY_BATCH_LLM_CONCURRENCY)
+
+        async def classify_one(problem_text: str, context: RetrievalContext) -> Tuple[str, float, str, bool]:
+            async with slots:
+                return await self.aclassify(problem_text, context=context)
+
+        return list(await asyncio.gather(*(
+            classify_one(problem_text, RetrievalContext(query_embedding, neighbors, FEW_SHOT_K))
+            for problem_text, query_embedding, neighbors in zip(problem_texts, query_embeddings, neighbors_batch)
+        )))
+
+    def _parse_response(self, content: str) -> Tuple[str, float, str, bool]:
+        """Parse the LLM JSON answer into (category_id, confidence, reasoning, is_urgent)"""
         try:
             # Remove possible markdown blocks
-            content = response.content.strip()
+            content = content.strip()
             if content.startswith("```"):
                 content = content.split("```")[1]
                 if content.startswith("json"):
@@ -102,29 +189,23 @@ class LLMClassifier(BaseClassifier):
             
 
             # Check that category exists
-            category = self.session.get(Category, category_id)
+            category = self.get_category_info(category_id)
             if not category:
                 return "other", 0.5, f"Category {category_id} not found", False
             
             return category_id, confidence, reasoning, is_urgent
             
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
+        except (json.JSONDecodeError, KeyError, ValueError, AttributeError) as e:
             return "other", 0.5, f"LLM response parsing error: {str(e)}", False
     
-    def get_category_info(self, category_id: str) -> Category | None:
-        """Get category information"""
-        return self.session.get(Category, category_id)
-    
-    def classify_with_category(self, problem_text: str) -> dict:
+    def _format_result(self, category_id: str, confidence: float, reasoning: str, is_urgent: bool) -> dict:
         """
-        Classify problem and return full response with category info and urgency check
+        Build full response with category info and urgency check
         
-        Performs analysis:
+        Category and urgency come from a single LLM call:
         1. Urgency detection via LLM
         2. Category classification via RAG + few-shot learning
         """
-        # Classify category and check urgency in one call
-        category_id, confidence, reasoning, is_urgent = self.classify(problem_text)
         category = self.get_category_info(category_id)
         
         if not category:
@@ -0,0 +1,139 @@
+"""
+Process-wide cache of formatted classification results.
+
+Repeated complaint texts (e.g. during a neighborhood-wide outage) skip embedding,
+vector search and LLM calls entirely. Keys include a version stamp of the
+`examples`/`categories` tables, so results computed on old training data are
+never served after the data changes (the category registry and k-NN index are
+invalidated together with the results).
+"""
+import asyncio
+import threading
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.category_registry import invalidate_category_registry
+from app.services.classifier.knn_index import invalidate_knn_index
+from app.utils.cache import TTLCache, normalized_text_hash
+
+logger = get_logger(__name__)
+
+# Cheap version stamp of the labeled data: the cumulative insert/update/delete counters of
+# pg_stat_user_tables catch every committed write, max(examples.id) (one primary-key index probe)
+# catches inserts before the counters are flushed. No table is scanned, so the check costs the same
+# for 1k and 1M examples. A stats reset or a rolled-back write only causes one spurious invalidation.
+DATA_VERSION_QUERY = text("""
+    SELECT concat_ws(':',
+        (SELECT coalesce(max(id), 0) FROM examples),
+        (SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0)
+         FROM pg_stat_user_tables WHERE relname IN ('examples', 'categories')))
+""")
+
+_result_cache = TTLCache(
+    maxsize=settings.CLASSIFICATION_CACHE_MAX_ITEMS,
+    ttl_seconds=settings.CLASSIFICATION_CACHE_TTL_SECONDS,
+)
+
+_version_lock = threading.Lock()
+_data_version: str | None = None
+_version_checked_at = 0.0
+_version_refreshing = False
+
+
+def _cached_data_version() -> str | None:
+    """Current stamp if it was checked less than CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS ago"""
+    if _data_version is None:
+        return None
+    if time.monotonic() - _version_checked_at < settings.CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS:
+        return _data_version
+    return None
+
+
+def _on_data_changed() -> None:
+    # Old entries can never be hit again, drop them instead of waiting for LRU eviction;
+    # the category registry and the k-NN index are rebuilt from the new data on next use
+    logger.info("Examples/categories changed, clearing classification cache, category registry and KNN index")
+    _result_cache.clear()
+    invalidate_category_registry()
+    invalidate_knn_index()
+
+
+def get_data_version(session: Session) -> str:
+    """
+    Version stamp of examples/categories, recomputed at most every CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS.
+    The query runs outside the lock: while one thread refreshes, the others keep the previous stamp.
+    """
+    global _data_version, _version_checked_at, _version_refreshing
+    with _version_lock:
+        version = _cached_data_version()
+        if version is None and _version_refreshing:
+            # Another thread is querying, keep serving the previous stamp meanwhile
+            version = _data_version
+        if version is not None:
+            return version
+        _version_refreshing = True
+
+    try:
+        version = session.execute(DATA_VERSION_QUERY).scalar_one()
+    except Exception:
+        with _version_lock:
+            _version_refreshing = False
+        raise
+
+    with _version_lock:
+        if _data_version is not None and version != _data_version:
+            # Before the new stamp is published, so no result is cached under it from stale data
+            _on_data_changed()
+        _data_version = version
+        _version_checked_at = time.monotonic()
+        _version_refreshing = False
+    return version
+
+
+async def aget_data_version(session: Session) -> str:
+    """Async version of get_data_version, the database check runs in a worker thread"""
+    version = _cached_data_version()
+    if version is not None:
+        return version
+    return await asyncio.to_thread(get_data_version, session)
+
+
+def classification_cache_key(data_version: str, problem_text: str, params: tuple) -> tuple:
+    """Key of one result: data version, classifier parameters and normalized text hash"""
+    return data_version, params, normalized_text_hash(problem_text)
+
+
+def get_cached_result(key: tuple) -> dict | None:
+    result = _result_cache.get(key)
+    # Callers may mutate the returned dict
+    return dict(result) if result is not None else None
+
+
+def store_result(key: tuple, result: dict) -> None:
+    # "other" also covers transient failures (LLM parsing errors, no examples yet), do not pin them
+    if result.get("category_id") == "other":
+        return
+    _result_cache.set(key, dict(result))
+
+
+def invalidate_classification_cache() -> None:
+    """
+    Drop all results, the category registry and the k-NN index, and force a version check
+    on the next lookup. Call after changing examples/categories in this process.
+    """
+    global _data_version
+    with _version_lock:
+        _data_version = None
+    _on_data_changed()
+
+
+def get_classification_cache_stats() -> dict:
+    """Hit/miss counters for health endpoints"""
+    return {
+        "enabled": settings.CLASSIFICATION_CACHE_ENABLED,
+        **_result_cache.stats(),
+    }
@@ -0,0 +1,162 @@
+"""
+Nearest-neighbor retrieval over the `examples` table.
+
+Shared by the KNN and LLM classifiers. Only the columns needed for voting
+and few-shot prompts are selected, the cosine distance is computed in SQL,
+so example embeddings never leave the database.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from sqlmodel import Session, select, text
+
+from app.core.config import settings
+from app.db_models import Example
+
+MAX_COSINE_DISTANCE = 2.0
+EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Neighbors:
+    """Ranked nearest neighbors as parallel arrays (closest first)"""
+    ids: np.ndarray
+    category_ids: np.ndarray
+    is_urgent: np.ndarray
+    texts: np.ndarray
+    distances: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def head(self, k: int) -> "Neighbors":
+        """Return the K closest neighbors"""
+        return Neighbors(
+            ids=self.ids[:k],
+            category_ids=self.category_ids[:k],
+            is_urgent=self.is_urgent[:k],
+            texts=self.texts[:k],
+            distances=self.distances[:k],
+        )
+
+
+@dataclass(frozen=True)
+class RetrievalContext:
+    """
+    Query embedding and its ranked neighbors, computed once per text and shared
+    between classifier stages (hybrid k-NN vote -> LLM few-shot fallback).
+    """
+    query_embedding: list[float]
+    neighbors: Neighbors
+    # Number of neighbors requested; fewer are returned only when the table is smaller
+    k: int
+
+    def neighbors_for(self, k: int) -> Neighbors | None:
+        """The K closest neighbors, or None if this context was retrieved with a smaller K"""
+        if k > self.k:
+            return None
+        return self.neighbors.head(k)
+
+
+def _to_neighbors(rows) -> Neighbors:
+    """Convert (id, category_id, is_urgent, text, distance) rows into Neighbors"""
+    distances = np.array(
+        [np.nan if row.distance is None else row.distance for row in rows], dtype=np.float64
+    )
+    # pgvector returns NaN for zero vectors (NULL for missing ones), treat them as the farthest neighbors.
+    distances = np.nan_to_num(distances, nan=MAX_COSINE_DISTANCE)
+
+    return Neighbors(
+        ids=np.array([row.id for row in rows], dtype=np.int64),
+        category_ids=np.array([row.category_id for row in rows], dtype=object),
+        is_urgent=np.array([bool(row.is_urgent) for row in rows], dtype=bool),
+        texts=np.array([row.text for row in rows], dtype=object),
+        distances=distances,
+    )
+
+
+def apply_search_tuning(session: Session) -> None:
+    """
+    Set ANN search parameters for the current transaction.
+    is_local=true keeps the setting from leaking to other users of a pooled connection.
+    """
+    if settings.VECTOR_INDEX_TYPE == "hnsw":
+        session.exec(
+            text("SELECT set_config('hnsw.ef_search', :value, true)").bindparams(
+                value=str(settings.HNSW_EF_SEARCH)
+            )
+        )
+    elif settings.VECTOR_INDEX_TYPE == "ivfflat":
+        session.exec(
+            text("SELECT set_config('ivfflat.probes', :value, true)").bindparams(
+                value=str(settings.IVFFLAT_PROBES)
+            )
+        )
+
+
+def find_nearest_examples(session: Session, query_embedding, k: int) -> Neighbors:
+    """
+    Find the K nearest examples by cosine distance in pgvector.
+
+    Args:
+        session: Database session
+        query_embedding: Query vector
+        k: Number of neighbors to return
+
+    Returns:
+        Neighbors sorted by ascending distance
+    """
+    apply_search_tuning(session)
+
+    distance = Example.embedding.cosine_distance(query_embedding).label("distance")
+    statement = (
+        select(Example.id, Example.category_id, Example.is_urgent, Example.text, distance)
+        .order_by(distance)
+        .limit(k)
+    )
+    return _to_neighbors(session.exec(statement).all())
+
+
+def _vector_literal(embedding) -> str:
+    return "[" + ",".join(str(float(value)) for value in embedding) + "]"
+
+
+def find_nearest_examples_batch(session: Session, query_embeddings: list, k: int) -> list[Neighbors]:
+    """
+    Find the K nearest examples for several queries in a single round trip.
+    Each query runs as a LATERAL subquery, so it can still use the ANN index.
+
+    Args:
+        session: Database session
+        query_embeddings: Query vectors
+        k: Number of neighbors to return per query
+
+    Returns:
+        Neighbors for each query, in input order
+    """
+    if not query_embeddings:
+        return []
+
+    apply_search_tuning(session)
+
+    statement = text(
+        """
+        SELECT q.ord, e.id, e.category_id, e.is_urgent, e.text, e.distance
+        FROM unnest(CAST(:queries AS text[])) WITH ORDINALITY AS q(embedding, ord)
+        CROSS JOIN LATERAL (
+            SELECT ex.id, ex.category_id, ex.is_urgent, ex.text,
+                   ex.embedding <=> CAST(q.embedding AS vector) AS distance
+            FROM examples ex
+            ORDER BY ex.embedding <=> CAST(q.embedding AS vector)
+            LIMIT :k
+        ) e
+        ORDER BY q.ord, e.distance
+        """
+    ).bindparams(queries=[_vector_literal(embedding) for embedding in query_embeddings], k=k)
+    rows = session.exec(statement).all()
+
+    grouped: list[list] = [[] for _ in query_embeddings]
+    for row in rows:
+        grouped[row.ord - 1].append(row)
+
+    return [_to_neighbors(group) for group in grouped]
@@ -0,0 +1,106 @@
+"""
+Local extraction of applicant contacts from a free-form (dictated) text.
+
+Name, phone and address are picked out with precompiled patterns, no LLM call:
+the phone is normalized to +380XXXXXXXXX, the address is kept as spoken (it is
+parsed again by the router) but only accepted when it has a street and a house number.
+"""
+import re
+from typing import NamedTuple
+
+from app.services.address.parser import STREET_TYPES, parse_address
+
+_WORD = r"[А-ЯІЇЄҐ][а-яіїєґ'’ʼ\-]+"
+
+_NAME_RE = re.compile(
+    r"(?:мене звати|меня зовут|моє ім['’ʼ]я|мое имя|моє прізвище|з вами говорить)\s*[:\-]?\s*"
+    rf"({_WORD}(?:\s+{_WORD}){{0,2}})"
+    # "я Іван Петренко": only with first and last name, "я" alone is too common
+    rf"|(?:^|[\s,.!?])[Яя]\s+[—\-]?\s*({_WORD}\s+{_WORD}(?:\s+{_WORD})?)",
+    re.IGNORECASE,
+)
+# Case-sensitive re-check of the captured words (IGNORECASE above also lets lowercase words through)
+_CAPITALIZED_RE = re.compile(rf"{_WORD}(?:\s+{_WORD})*")
+
+# Digits with the separators people dictate: "+38 (067) 123-45-67", "067 123 45 67"
+_PHONE_CANDIDATE_RE = re.compile(r"\+?\d[\d\s\-()]{7,18}\d")
+
+_ADDRESS_MARKER_RE = re.compile(
+    r"(?:за адресою|моя адреса|адреса|по адресу|адрес|проживаю|живу|мешкаю)\s*(?:на|по|за|:|-)?\s*",
+    re.IGNORECASE,
+)
+_STREET_MENTION_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(word) for word in sorted(STREET_TYPES, key=len, reverse=True)) + r")\b\.?\s*\S",
+    re.IGNORECASE,
+)
+# Where an address stops: end of sentence (not after an abbreviation like "вул."), or the next contact
+_ADDRESS_END_RE = re.compile(
+    r"(?<!\bвул)(?<!\bпросп)(?<!\bпл)(?<!\bбуд)(?<!\bкв)(?<!\bм)(?<!\bд)(?<!\bпров)(?<!\bбул)[.!?](?:\s|$)"
+    r"|\s(?:мій|мой|мо[єе])?\s*(?:телефон|номер|тел)\b|\s(?:мене звати|меня зовут)\b",
+    re.IGNORECASE,
+)
+# Address up to the house number (letter, block) and an optional apartment
+_ADDRESS_TRIM_RE = re.compile(
+    r"^.*?\d+(?:\s*[-/]?\s*[а-яіїєґa-z](?![а-яіїєґa-z'’ʼ]))?(?:[\s,]*(?:кв|квартира|apt)\.?\s*\d+)?",
+    re.IGNORECASE,
+)
+ADDRESS_MAX_LENGTH = 150
+
+
+class Contacts(NamedTuple):
+    """Applicant contacts found in a text; None for what was not found"""
+    name: str | None = None
+    phone: str | None = None
+    address: str | None = None
+
+
+def extract_phone(text: str) -> str | None:
+    """First Ukrainian phone number, normalized to +380XXXXXXXXX"""
+    for match in _PHONE_CANDIDATE_RE.finditer(text):
+        digits = re.sub(r"\D", "", match.group())
+        if len(digits) == 10 and digits.startswith("0"):
+            return "+38" + digits
+        if len(digits) == 12 and digits.startswith("380"):
+            return "+" + digits
+    return None
+
+
+def extract_name(text: str) -> str | None:
+    """Name introduced with "мене звати ..." / "я Ім'я Прізвище" """
+    for match in _NAME_RE.finditer(text):
+        candidate = _CAPITALIZED_RE.match(match.group(1) or match.group(2))
+        if candidate:
+            return candidate.group()
+    return None
+
+
+def _address_from(text: str, start: int) -> str | None:
+    fragment = text[start:start + ADDRESS_MAX_LENGTH]
+    end = _ADDRESS_END_RE.search(fragment)
+    if end:
+        fragment = fragment[:end.start()]
+    trimmed = _ADDRESS_TRIM_RE.match(fragment)
+    if trimmed:
+        fragment = trimmed.group()
+    fragment = fragment.strip(" ,;:-—")
+    parsed = parse_address(fragment)
+    return fragment if parsed.street and parsed.house else None
+
+
+def extract_address(text: str) -> str | None:
+    """Address after "за адресою"/"живу на"..., or the first street mention with a house number"""
+    for match in _ADDRESS_MARKER_RE.finditer(text):
+        address = _address_from(text, match.end())
+        if address:
+            return address
+    for match in _STREET_MENTION_RE.finditer(text):
+        address = _address_from(text, match.start())
+        if address:
+            return address
+    return None
+
+
+def extract_contacts(text: str) -> Contacts:
+    if not text:
+        return Contacts()
+    return Contacts(name=extract_name(text), phone=extract_phone(text), address=extract_address(text))
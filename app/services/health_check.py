@@ -1,7 +1,16 @@
 """
 Health check service
+
+Checks run in a background prober (started from the FastAPI lifespan) on
+HEALTH_PROBE_INTERVAL_SECONDS; health endpoints serve its last cached state,
+so polling /health never calls the providers or the database.
 """
+import asyncio
+import time
+from datetime import datetime, timezone
+
 from sqlmodel import Session, text
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.db import engine
 from app.llm.client import get_llm, get_embeddings, get_gemini_client
@@ -47,56 +56,75 @@ class HealthCheckService:
             return {"status": "unhealthy", "error": str(e)}
     
     @staticmethod
-    def check_codemie_api() -> dict:
+    async def check_codemie_api(mode: str = "models") -> dict:
         """
         Check CodeMie API availability (LLM, Embeddings, Transcription)
-        
-        All models use the same CodeMie endpoint, so we check each model separately
-        
+
+        All models use the same CodeMie endpoint. In "models" mode one models.list call
+        checks the endpoint and that the configured models are listed, without spending
+        tokens; "completion" mode sends a max_tokens=1 completion and a one-word embedding.
+
+        Args:
+            mode: "models" or "completion"
+
         Returns:
             dict with overall status and details for each model
         """
         result = {
             "status": "healthy",
+            "mode": mode,
             "models": {}
         }
-        
-        # Check LLM
-        try:
-            llm = get_llm()
-            response = llm.invoke("test")
-            if response and response.content:
-                result["models"]["llm"] = {
-                    "status": "healthy",
-                    "model": llm.model
-                }
+        llm = get_llm()
+        embeddings = get_embeddings(cached=False)
+        # One attempt per probe: retries would only delay the verdict, the next probe comes anyway
+        client = llm.async_client.with_options(max_retries=0, timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+
+        if mode == "models":
+            try:
+                listed = {model.id async for model in client.models.list()}
+                for name, model in (("llm", llm.model), ("embeddings", embeddings.model)):
+                    # Some gateways return an empty list, then reachability is all we know
+                    if listed and model not in listed:
+                        result["models"][name] = {"status": "unhealthy", "model": model, "error": "Model not listed"}
+                    else:
+                        result["models"][name] = {"status": "healthy", "model": model}
+            except Exception as e:
+                logger.error(f"CodeMie models check failed: {str(e)}")
+                for name, model in (("llm", llm.model), ("embeddings", embeddings.model)):
+                    result["models"][name] = {"status": "unhealthy", "model": model, "error": str(e)}
+        else:
+            completion, embedding = await asyncio.gather(
+                client.chat.completions.create(
+                    model=llm.model,
+                    messages=[{"role": "user", "content": "ping"}],
+                    max_tokens=1,
+                    temperature=0.0,
+                ),
+                client.embeddings.create(model=embeddings.model, input="ping"),
+                return_exceptions=True,
+            )
+            if isinstance(completion, Exception):
+                logger.error(f"LLM check failed: {str(completion)}")
+                result["models"]["llm"] = {"status": "unhealthy", "model": llm.model, "error": str(completion)}
+            elif not completion.choices:
+                result["models"]["llm"] = {"status": "unhealthy", "model": llm.model, "error": "Empty response"}
+            else:
+                result["models"]["llm"] = {"status": "healthy", "model": llm.model}
+
+            if isinstance(embedding, Exception):
+                logger.error(f"Embeddings check failed: {str(embedding)}")
+                result["models"]["embeddings"] = {"status": "unhealthy", "model": embeddings.model, "error": str(embedding)}
+            elif not embedding.data or not embedding.data[0].embedding:
+                result["models"]["embeddings"] = {"status": "unhealthy", "model": embeddings.model, "error": "Empty embedding"}
             else:
-                result["models"]["llm"] = {"status": "unhealthy", "error": "Empty response"}
-                result["status"] = "degraded"
-        except Exception as e:
-            logger.error(f"LLM check failed: {str(e)}")
-            result["models"]["llm"] = {"status": "unhealthy", "error": str(e)}
-            result["status"] = "degraded"
-        
-        # Check Embeddings
-        try:
-            embeddings = get_embeddings()
-            emb_result = embeddings.embed_query("test")
-            if emb_result and len(emb_result) > 0:
                 result["models"]["embeddings"] = {
                     "status": "healthy",
                     "model": embeddings.model,
-                    "dimension": len(emb_result)
+                    "dimension": len(embedding.data[0].embedding)
                 }
-            else:
-                result["models"]["embeddings"] = {"status": "unhealthy", "error": "Empty embedding"}
-                result["status"] = "degraded"
-        except Exception as e:
-            logger.error(f"Embeddings check failed: {str(e)}")
-            result["models"]["embeddings"] = {"status": "unhealthy", "error": str(e)}
-            result["status"] = "degraded"
-        
-        # Check Transcription (Gemini)
+
+        # Check Transcription (Gemini): client initialization only, no audio is sent
         try:
             gemini = get_gemini_client()
             if gemini and gemini.client and gemini.model:
@@ -106,12 +134,15 @@ class HealthCheckService:
                 }
             else:
                 result["models"]["transcription"] = {"status": "unhealthy", "error": "Client initialization failed"}
-                result["status"] = "degraded"
         except Exception as e:
             logger.error(f"Transcription check failed: {str(e)}")
             result["models"]["transcription"] = {"status": "unhealthy", "error": str(e)}
+
+        statuses = [model["status"] for model in result["models"].values()]
+        if all(status == "unhealthy" for status in statuses):
+            result["status"] = "unhealthy"
+        elif any(status == "unhealthy" for status in statuses):
             result["status"] = "degraded"
-        
         return result
     
     @staticmethod
@@ -145,3 +176,84 @@ class HealthCheckService:
 def get_health_check_service() -> HealthCheckService:
     """Get health check service instance"""
     return HealthCheckService()
+
+
+class HealthProber:
+    """Runs the database and CodeMie checks concurrently on an interval and keeps the last result"""
+
+    def __init__(self, service: HealthCheckService):
+        self.service = service
+        self.state: dict | None = None
+        self._task: asyncio.Task | None = None
+
+    async def _check(self, name: str, check) -> dict:
+        try:
+            return await asyncio.wait_for(check, timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+        except TimeoutError:
+            logger.error(f"Health check of {name} timed out")
+            return {"status": "unhealthy", "error": f"Timed out after {settings.HEALTH_PROBE_TIMEOUT_SECONDS:g} s"}
+
+    async def probe(self) -> dict:
+        """Run all checks once and cache the result"""
+        started = time.monotonic()
+        db_status, codemie_status = await asyncio.gather(
+            # Blocking driver call: run it in a worker thread
+            self._check("database", asyncio.to_thread(self.service.check_database)),
+            self._check("CodeMie API", self.service.check_codemie_api(settings.HEALTH_PROBE_MODE)),
+        )
+        self.state = {
+            "status": self.service.get_overall_status(db_status, codemie_status),
+            "services": {"database": db_status, "codemie_api": codemie_status},
+            "checked_at": datetime.now(timezone.utc),
+            "checked_monotonic": time.monotonic(),
+            "duration_ms": round((time.monotonic() - started) * 1000),
+        }
+        return self.state
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                # Keep probing, the cached state goes stale and readiness fails
+                logger.error(f"Health probe failed: {str(e)}")
+            await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL_SECONDS)
+
+    def age_seconds(self) -> float | None:
+        if self.state is None:
+            return None
+        return time.monotonic() - self.state["checked_monotonic"]
+
+    def is_stale(self) -> bool:
+        age = self.age_seconds()
+        return age is None or age > settings.HEALTH_PROBE_INTERVAL_SECONDS * settings.HEALTH_PROBE_STALE_INTERVALS
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+_prober = HealthProber(HealthCheckService())
+
+
+def get_health_prober() -> HealthProber:
+    """Process-wide prober whose state the health endpoints serve"""
+    return _prober
+
+
+def start_health_prober() -> None:
+    """Start background probing (FastAPI lifespan)"""
+    _prober.start()
+    logger.info(
+        f"Health prober started (every {settings.HEALTH_PROBE_INTERVAL_SECONDS:g} s, mode: {settings.HEALTH_PROBE_MODE})"
+    )
+
+
+async def stop_health_prober() -> None:
+    await _prober.stop()
@@ -2,26 +2,33 @@
 Orchestrator service that coordinates the flow:
 1. Classify problem -> get category
 2. Resolve service -> get responsible service based on category and address
-3. Generate appeal -> create letter text
+3. Generate appeal -> create letter text (runs concurrently with 1-2)
 4. Return complete solution
 """
-import re
-from typing import Dict
+import asyncio
+from typing import AsyncIterator, BinaryIO, Dict, Tuple
 
 from sqlmodel import Session
-from app.schemas.orchestration import OrchestrationRequest, OrchestrationResponse
+from app.core.logging import get_logger
+from app.schemas.orchestration import OrchestrationEvent, OrchestrationRequest, OrchestrationResponse
 from app.schemas.base import PersonalInfo
 from app.schemas.problems_schemas import ProblemClassificationResponse
 from app.schemas.appeal import AppealRequest
+from app.schemas.services import ServiceResponse
 from app.services.classifier.classifier_factory import get_classifier
+from app.services.address.parser import parse_address
+from app.services.contacts import extract_contacts
 from app.services.service_resolver import ServiceRouter
-from app.services.appeal import generate_appeal_text
+from app.services.appeal import generate_appeal_text, stream_appeal_text
+from app.services.voice import get_voice_service
+
+logger = get_logger(__name__)
 
 
 class OrchestrationService:
     """
     Coordinates the complete workflow for problem resolution.
-    Orchestrates: classification -> service resolution -> appeal generation
+    Orchestrates: (classification -> service resolution) || appeal generation
     """
     
     def __init__(self, session: Session):
@@ -36,6 +43,9 @@ class OrchestrationService:
         2. Find responsible service
         3. Generate appeal text
         4. Return orchestrated response
+
+        Appeal generation only needs the problem text and address, so it runs
+        concurrently with classification + service resolution.
         
         Args:
             request: OrchestrationRequest with user info and problem text
@@ -44,34 +54,182 @@ class OrchestrationService:
             OrchestrationResponse with all processed information
             
         Raises:
-            Exception: If any step in the flow fails
+            Exception: If any step in the flow fails (the other branch is cancelled)
         """
+        try:
+            async with asyncio.TaskGroup() as tg:
+                routing_task = tg.create_task(self._classify_and_route(request))
+                appeal_task = tg.create_task(self._generate_appeal(request))
+        except ExceptionGroup as eg:
+            # TaskGroup cancels the sibling branch; surface the first real error to the caller
+            raise eg.exceptions[0]
+
+        classification, service_response = routing_task.result()
+        appeal_text = appeal_task.result()
         
-        # Step 1: Classify the problem
-        classification_result = self.classifier.classify_with_category(request.problem_text)
-        classification = ProblemClassificationResponse(**classification_result)
-        
+        # Step 4: Construct and return orchestrated response
+        return self._build_response(request, classification, service_response, appeal_text)
+
+    async def stream_complete_flow(self, request: OrchestrationRequest) -> AsyncIterator[OrchestrationEvent]:
+        """
+        Streaming version of process_complete_flow.
+
+        Yields stage results as soon as they are ready: `classification`, `service` and
+        `appeal_delta` chunks (the two branches run concurrently, so appeal chunks may
+        arrive before or between them), then `done` with the full OrchestrationResponse.
+        On failure yields a single `error` event for the failed stage and cancels the
+        other branch.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def routing_branch() -> Tuple[ProblemClassificationResponse, ServiceResponse]:
+            classification = await self._classify(request)
+            queue.put_nowait(OrchestrationEvent(event="classification", data=classification.model_dump(mode="json")))
+            service_response = self._route(request, classification)
+            queue.put_nowait(OrchestrationEvent(event="service", data=service_response.model_dump(mode="json")))
+            return classification, service_response
+
+        async def appeal_branch() -> str:
+            chunks = []
+            async for chunk in stream_appeal_text(self._appeal_request(request)):
+                chunks.append(chunk)
+                queue.put_nowait(OrchestrationEvent(event="appeal_delta", data={"delta": chunk}))
+            appeal_text = "".join(chunks).strip()
+            if not appeal_text:
+                raise ValueError("LLM returned empty response")
+            return appeal_text
+
+        branches = {
+            "routing": asyncio.create_task(routing_branch()),
+            "appeal": asyncio.create_task(appeal_branch()),
+        }
+        for stage, task in branches.items():
+            # Completion marker goes through the same queue, after the branch's own events
+            task.add_done_callback(lambda _, stage=stage: queue.put_nowait(stage))
+
+        try:
+            pending = len(branches)
+            while pending:
+                item = await queue.get()
+                if isinstance(item, OrchestrationEvent):
+                    yield item
+                    continue
+
+                pending -= 1
+                error = branches[item].exception()
+                if error is not None:
+                    logger.error(f"Solve stream failed at {item} stage: {str(error)}")
+                    yield OrchestrationEvent(
+                        event="error",
+                        data={
+                            "stage": item,
+                            "status_code": 400 if isinstance(error, ValueError) else 500,
+                            "detail": str(error),
+                        },
+                    )
+                    return
+
+            classification, service_response = branches["routing"].result()
+            yield OrchestrationEvent(
+                event="done",
+                data=self._build_response(
+                    request, classification, service_response, branches["appeal"].result()
+                ).model_dump(mode="json"),
+            )
+        finally:
+            # Client disconnect or failure: do not leave the other branch running
+            for task in branches.values():
+                task.cancel()
+            await asyncio.gather(*branches.values(), return_exceptions=True)
+
+    async def stream_voice_flow(
+        self,
+        audio_file: BinaryIO,
+        mime_type: str,
+        content_sha256: str | None = None,
+    ) -> AsyncIterator[OrchestrationEvent]:
+        """
+        Voice version of stream_complete_flow: transcribes the recording (`transcription`),
+        extracts name, address and phone from the transcript locally (`user_info`), then
+        yields the stream_complete_flow events for the transcript as the problem text.
+        """
+        try:
+            transcript = await get_voice_service().atranscribe_audio(audio_file, mime_type, content_sha256)
+        except Exception as e:
+            timed_out = isinstance(e, TimeoutError)
+            detail = "Transcription timed out" if timed_out else str(e)
+            logger.error(f"Voice solve failed at transcription stage: {detail}")
+            yield OrchestrationEvent(
+                event="error",
+                data={"stage": "transcription", "status_code": 504 if timed_out else 500, "detail": detail},
+            )
+            return
+
+        yield OrchestrationEvent(event="transcription", data={"transcription": transcript})
+
+        contacts = extract_contacts(transcript)
+        user_info = PersonalInfo(name=contacts.name, address=contacts.address, phone=contacts.phone)
+        yield OrchestrationEvent(event="user_info", data=user_info.model_dump(mode="json"))
+
+        if len(transcript.strip()) < 5:
+            yield OrchestrationEvent(
+                event="error",
+                data={"stage": "transcription", "status_code": 400, "detail": "No problem description recognized in the recording"},
+            )
+            return
+
+        request = OrchestrationRequest(user_info=user_info, problem_text=transcript)
+        async for event in self.stream_complete_flow(request):
+            yield event
+
+    async def _classify_and_route(
+        self, request: OrchestrationRequest
+    ) -> Tuple[ProblemClassificationResponse, ServiceResponse]:
+        """Steps 1-2: classification and service resolution (routing depends on the category)"""
+        classification = await self._classify(request)
+        return classification, self._route(request, classification)
+
+    async def _classify(self, request: OrchestrationRequest) -> ProblemClassificationResponse:
+        """Step 1: Classify the problem"""
+        classification_result = await self.classifier.aclassify_with_category(request.problem_text)
+        return ProblemClassificationResponse(**classification_result)
+
+    def _route(
+        self, request: OrchestrationRequest, classification: ProblemClassificationResponse
+    ) -> ServiceResponse:
+        """Step 2: Find responsible service based on classification and location"""
         # Parse address - extract street name and building number
         street_info = self._parse_address(request.user_info.address)
         street_name = street_info["street"]
         building_number = street_info["building"]
         
-        # Step 2: Find responsible service based on classification and location
-        service_response = self.service_router.find_responsible_service(
+        return self.service_router.find_responsible_service(
             category_id=classification.category_id,
             is_urgent=classification.is_urgent,
             street_name=street_name,
             house_number=building_number
         )
-        
-        # Step 3: Generate appeal text
-        appeal_request = AppealRequest(
+
+    @staticmethod
+    def _appeal_request(request: OrchestrationRequest) -> AppealRequest:
+        # The address is optional (e.g. not dictated in a voice note), the appeal is written without it
+        return AppealRequest(
             problem_text=request.problem_text,
-            address=request.user_info.address
+            address=request.user_info.address or ""
         )
-        appeal_text = await generate_appeal_text(appeal_request)
-        
-        # Step 4: Construct and return orchestrated response
+
+    @staticmethod
+    async def _generate_appeal(request: OrchestrationRequest) -> str:
+        """Step 3: appeal text, independent of classification"""
+        return await generate_appeal_text(OrchestrationService._appeal_request(request))
+
+    @staticmethod
+    def _build_response(
+        request: OrchestrationRequest,
+        classification: ProblemClassificationResponse,
+        service_response: ServiceResponse,
+        appeal_text: str,
+    ) -> OrchestrationResponse:
         user_info = PersonalInfo(
             name=request.user_info.name,
             address=request.user_info.address,
@@ -87,88 +245,9 @@ class OrchestrationService:
     
     @staticmethod
     def _parse_address(address: str) -> Dict[str, str]:
-        """
-        Parse a free-form Ukrainian address and extract street & house number.
-        
-        Handles inputs like:
-        - "Україна, область Львівська, місто Львів, вулиця Володимира Великого 10б, кв 54"
-        - "Львів, проспект Червоної Калини 36"
-        - "Стрийська, 45"
-        """
-        if not address:
-            return {"street": "", "building": ""}
-
-        cleaned = address.replace("\n", " ")
-        parts = [p.strip() for p in re.split(r"[;,]", cleaned) if p.strip()]
-
-        street_segment = ""
-        house_number = ""
-
-        street_keywords = [
-            "вулиця",
-            "вул",
-            "улица",
-            "проспект",
-            "просп",
-            "площа",
-            "пл",
-            "бульвар",
-            "бул",
-            "провулок",
-            "пров",
-            "въезд",
-            "street",
-        ]
-        house_pattern = re.compile(r"\b(\d+\s*[а-яА-Яa-zA-Z]?)\b")
-
-        apartment_tokens = {"кв", "квартира", "apt", "apartment"}
-
-        for idx in range(len(parts) - 1, -1, -1):
-            segment = parts[idx]
-            lower_segment = segment.lower()
-            if any(token in lower_segment.split() for token in apartment_tokens):
-                continue
-
-            match = house_pattern.search(segment)
-            if match:
-                house_number = match.group(1).replace(" ", "")
-                prefix = segment[: match.start()].strip()
-                if prefix:
-                    street_segment = prefix
-                elif idx > 0:
-                    street_segment = parts[idx - 1]
-                else:
-                    street_segment = segment
-                break
-
-        if not street_segment and parts:
-            street_segment = parts[-1]
-
-        street = OrchestrationService._cleanup_street_name(street_segment, street_keywords)
-
+        """Street & house number of a free-form address (see app.services.address.parser)"""
+        parsed = parse_address(address)
         return {
-            "street": street,
-            "building": house_number,
+            "street": parsed.street,
+            "building": parsed.house,
         }
-
-    @staticmethod
-    def _cleanup_street_name(segment: str, keywords: list[str]) -> str:
-        """Remove country/city prefixes and street keywords."""
-        if not segment:
-            return ""
-
-        lowered = segment.lower()
-        removal_tokens = ["україна", "область", "район", "місто", "м.", "обл.", "р-н"]
-        for token in removal_tokens:
-            if lowered.startswith(token):
-                segment = segment[len(token) :].strip(", .")
-                lowered = segment.lower()
-
-        for keyword in keywords:
-            pattern = re.compile(rf"\b{keyword}\.?\b", re.IGNORECASE)
-            if pattern.search(segment):
-                segment = pattern.sub("", segment).strip()
-                break
-
-        segment = re.sub(r"\s+", " ", segment)
-        return segment.strip()
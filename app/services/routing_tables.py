@@ -0,0 +1,264 @@
+"""
+Compiled in-memory routing tables for ServiceRouter.
+
+`services` and `service_assignments` are loaded (at startup or on first use)
+into dict lookups for every level of the routing hierarchy, so resolving a
+service does not query the database except for the building lookup. The tables
+are recompiled when the version stamp of services, assignments and buildings
+changes (checked every ROUTING_DATA_VERSION_CHECK_SECONDS); call
+reload_routing_tables() to pick up a change in this process immediately.
+"""
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, Mapping
+
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.core.logging import get_logger
+from app.db_models import Building, Service, ServiceAssignment
+from app.services.table_version import TableVersion
+
+logger = get_logger(__name__)
+
+HOTLINE_NAME = "Міська гаряча лінія 1580"
+
+# TODO: Move category definitions out
+# Definition of categories we consider "district-level"
+RA_CATEGORIES = ["roads", "trees", "yard", "parking"]
+
+# Definition of categories handled by "citywide monopolists"
+CITYWIDE_MONOPOLISTS_CATEGORIES = ["water_supply", "heating", "gas", "lighting", "animals"]
+
+# This is not used, but for display what other categories exist
+BUILDING_LEVEL_CATEGORIES = ["sewage", "elevator", "cleaning", "roof", "entrance_doors", "noise"]
+
+# Service types that own building-level responsibility
+BUILDING_SERVICE_TYPES = ["ОСББ", "ЛКП/УК"]
+
+# Names of district administrations for validation, since they are tied to citywide
+RA_SERVICE_TYPES = ["РА"]
+
+# Citywide monopolists are communal enterprises
+CITYWIDE_SERVICE_TYPE = "КП"
+
+
+@dataclass(frozen=True)
+class RoutingService:
+    """Detached, read-only copy of a Service row (same attribute names as the model)"""
+    service_id: int
+    name_ua: str
+    type: str
+    phone_main: str | None
+    email_main: str | None
+    address_legal: str | None
+    website: str | None
+    is_emergency: bool
+
+
+def district_search_name(district: str) -> str:
+    """District as it appears in RA names: "Залізничний" -> "Залізнична" (районна адміністрація)"""
+    if district.endswith("ий"):
+        return district[:-2] + "а"
+    return district
+
+
+@dataclass
+class RoutingTables:
+    """Lookup tables for each routing hierarchy level, keyed by service id"""
+    services: Mapping[int, RoutingService]
+    emergency_by_category: Mapping[str, int]
+    # First primary ОСББ/ЛКП assignment of a building, and per (building, category) when assigned explicitly
+    building_services: Mapping[int, int]
+    building_category_services: Mapping[tuple[int, str], int]
+    ra_services_by_category: Mapping[str, tuple[int, ...]]
+    citywide_by_category: Mapping[str, int]
+    hotline: RoutingService | None
+    district_categories: frozenset[str]
+    citywide_categories: frozenset[str]
+    assignments_count: int
+    loaded_at: datetime
+    # Version stamp of the data the tables were compiled from
+    version: str | None = None
+    # (district, category) -> RA service id, precomputed for known districts, filled lazily for others
+    _district_category: dict[tuple[str, str], int | None] = field(default_factory=dict)
+
+    def emergency_service(self, category_id: str) -> RoutingService | None:
+        return self._service(self.emergency_by_category.get(category_id))
+
+    def building_service(self, building_id: int, category_id: str) -> RoutingService | None:
+        service_id = self.building_category_services.get((building_id, category_id))
+        if service_id is None:
+            service_id = self.building_services.get(building_id)
+        return self._service(service_id)
+
+    def district_service(self, district: str, category_id: str) -> RoutingService | None:
+        key = (district, category_id)
+        if key not in self._district_category:
+            search_name = district_search_name(district)
+            self._district_category[key] = next(
+                (
+                    service_id
+                    for service_id in self.ra_services_by_category.get(category_id, ())
+                    if search_name in self.services[service_id].name_ua
+                ),
+                None,
+            )
+        return self._service(self._district_category[key])
+
+    def citywide_service(self, category_id: str) -> RoutingService | None:
+        return self._service(self.citywide_by_category.get(category_id))
+
+    def _service(self, service_id: int | None) -> RoutingService | None:
+        return self.services.get(service_id) if service_id is not None else None
+
+    @classmethod
+    def compile(
+        cls,
+        services: Iterable[RoutingService],
+        assignments: Iterable[tuple[int, str, int | None, str, bool]],
+        districts: Iterable[str],
+        district_categories: Iterable[str],
+        citywide_categories: Iterable[str],
+    ) -> "RoutingTables":
+        """
+        Build the tables from services and (service_id, category_id, building_id, coverage_level, is_primary)
+        assignment tuples in assignment_id order; the first match wins, like the former SQL .first().
+        The routing level of a category comes from the configured category lists only, not from the assignments.
+        """
+        services_by_id = {service.service_id: service for service in services}
+        emergency_by_category: dict[str, int] = {}
+        building_services: dict[int, int] = {}
+        building_category_services: dict[tuple[int, str], int] = {}
+        ra_services: dict[str, list[int]] = {}
+        citywide_by_category: dict[str, int] = {}
+
+        count = 0
+        for service_id, category_id, building_id, coverage_level, is_primary in assignments:
+            count += 1
+            service = services_by_id.get(service_id)
+            if service is None:
+                continue
+
+            if service.is_emergency:
+                emergency_by_category.setdefault(category_id, service_id)
+
+            if building_id is not None and is_primary and service.type in BUILDING_SERVICE_TYPES:
+                building_services.setdefault(building_id, service_id)
+                building_category_services.setdefault((building_id, category_id), service_id)
+
+            if service.type in RA_SERVICE_TYPES:
+                category_services = ra_services.setdefault(category_id, [])
+                if service_id not in category_services:
+                    category_services.append(service_id)
+
+            if coverage_level == "citywide" and service.type == CITYWIDE_SERVICE_TYPE:
+                citywide_by_category.setdefault(category_id, service_id)
+
+        hotline = next((service for service in services_by_id.values() if service.name_ua == HOTLINE_NAME), None)
+
+        tables = cls(
+            services=services_by_id,
+            emergency_by_category=emergency_by_category,
+            building_services=building_services,
+            building_category_services=building_category_services,
+            ra_services_by_category={category: tuple(ids) for category, ids in ra_services.items()},
+            citywide_by_category=citywide_by_category,
+            hotline=hotline,
+            district_categories=frozenset(district_categories),
+            citywide_categories=frozenset(citywide_categories),
+            assignments_count=count,
+            loaded_at=datetime.now(timezone.utc),
+        )
+
+        for district in districts:
+            for category_id in tables.ra_services_by_category:
+                tables.district_service(district, category_id)
+        return tables
+
+    @classmethod
+    def load(cls, session: Session) -> "RoutingTables":
+        services = [
+            RoutingService(
+                service_id=row.service_id,
+                name_ua=row.name_ua,
+                type=row.type,
+                phone_main=row.phone_main,
+                email_main=row.email_main,
+                address_legal=row.address_legal,
+                website=row.website,
+                is_emergency=bool(row.is_emergency),
+            )
+            for row in session.exec(select(Service).order_by(Service.service_id)).all()
+        ]
+        assignments = session.exec(
+            select(
+                ServiceAssignment.service_id,
+                ServiceAssignment.category_id,
+                ServiceAssignment.building_id,
+                ServiceAssignment.coverage_level,
+                ServiceAssignment.is_primary,
+            ).order_by(ServiceAssignment.assignment_id)
+        )
+        districts = session.exec(
+            select(Building.district).where(Building.district.is_not(None)).distinct()
+        ).all()
+
+        return cls.compile(
+            services=services,
+            assignments=((row[0], row[1], row[2], row[3], bool(row[4])) for row in assignments),
+            districts=districts,
+            district_categories=RA_CATEGORIES,
+            citywide_categories=CITYWIDE_MONOPOLISTS_CATEGORIES,
+        )
+
+
+_tables: RoutingTables | None = None
+_tables_lock = threading.Lock()
+# Districts are read from buildings
+_routing_version = TableVersion({
+    "services": "service_id",
+    "service_assignments": "assignment_id",
+    "buildings": "building_id",
+})
+
+
+def reload_routing_tables(session: Session | None = None) -> RoutingTables:
+    """Compile fresh tables and swap them in atomically"""
+    global _tables
+    if session is None:
+        with Session(engine) as own_session:
+            return reload_routing_tables(own_session)
+
+    # Stamp first: a change made while compiling gets a new stamp and is compiled on the next check
+    version = _routing_version.refresh(session)
+    tables = RoutingTables.load(session)
+    tables.version = version
+
+    with _tables_lock:
+        _tables = tables
+    logger.info(
+        f"Routing tables compiled: {len(tables.services)} services, {tables.assignments_count} assignments"
+    )
+    return tables
+
+
+def get_routing_tables(session: Session | None = None) -> RoutingTables:
+    """Current tables, compiled on first use and again after the data changed"""
+    if session is None:
+        with Session(engine) as own_session:
+            return get_routing_tables(own_session)
+
+    tables = _tables
+    if tables is not None and tables.version == _routing_version.get(session):
+        return tables
+    return reload_routing_tables(session)
+
+
+def invalidate_routing_tables() -> None:
+    """Drop the tables, the next access recompiles them"""
+    global _tables
+    with _tables_lock:
+        _tables = None
+    _routing_version.reset()
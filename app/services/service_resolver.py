@@ -4,22 +4,19 @@ from typing import Optional, List
 from sqlalchemy import func, or_
 from sqlmodel import Session, select
 
-from app.db_models import Category
-from app.db_models import Service, Building, ServiceAssignment
+from app.core.config import settings
+from app.db_models import Building
 from app.schemas.services import ServiceResponse, ServiceInfo
+from app.services.address.gazetteer import (
+    BUILDING_HOUSE_MATCHES,
+    GazetteerBuilding,
+    get_gazetteer,
+    normalize_house_number,
+    street_key,
+)
+from app.services.category_registry import get_category_registry
+from app.services.routing_tables import RoutingService, get_routing_tables
 
-# TODO: Move category definitions out
-# Definition of categories we consider "district-level"
-RA_CATEGORIES = ["roads", "trees", "yard", "parking"]
-
-# Definition of categories handled by "citywide monopolists" (global responsibility)
-CITYWIDE_MONOPOLISTS_CATEGORIES = ["water_supply", "heating", "gas", "lighting", "animals"]
-
-# This is not used, but for display what other categories exist
-BUILDING_LEVEL_CATEGORIES = ["sewage", "elevator", "cleaning", "roof", "entrance_doors", "noise"]
-
-# Names of district administrations for validation, since they are tied to citywide
-RA_SERVICE_TYPES = ["РА"]
 
 # TODO: extract hardcoded strings and magic confidence numbers
 class ServiceRouter:
@@ -53,8 +50,72 @@ class ServiceRouter:
         words = [w for w in ServiceRouter._normalize_street(name).split() if w not in stopwords]
         return [w for w in words if len(w) > 2]
 
-    def _find_building(self, street_name: str, house_number: str, city: str = "Львів") -> Optional[Building]:
+    def _find_building(
+        self, street_name: str, house_number: str, city: str = "Львів"
+    ) -> Building | GazetteerBuilding | None:
         """Fuzzy search for building by address."""
+        if settings.BUILDING_LOOKUP_MODE == "gazetteer":
+            match = get_gazetteer(self.session).match(
+                street_name, house_number, city=city, min_score=settings.BUILDING_MATCH_MIN_SCORE
+            )
+            # Nearest house / any house of the street is another building, not routed to its service
+            if match is None or match.house_match not in BUILDING_HOUSE_MATCHES:
+                return None
+            return match.building
+
+        if settings.BUILDING_LOOKUP_MODE == "trigram":
+            return self._find_building_trigram(street_name, house_number, city)
+
+        return self._find_building_like(street_name, house_number, city)
+
+    def _find_building_trigram(self, street_name: str, house_number: str, city: str = "Львів") -> Optional[Building]:
+        """Trigram lookup: one similarity-ranked, limited query over the normalized columns."""
+        stmt = self.building_trigram_query(street_name, house_number, city)
+        if stmt is None:
+            return None
+        return self.session.exec(stmt).first()
+
+    @staticmethod
+    def building_trigram_query(street_name: str, house_number: str, city: str = "Львів", limit: int = 1):
+        """
+        Query over the generated street_name_norm/house_number_norm columns: `%` / `%>` are
+        answered by the pg_trgm GIN index, only the requested house or the same number with
+        another letter qualifies, the best street wins, then the exact house.
+        None when the street name or the house number is empty.
+        """
+        key = street_key(street_name)
+        house = normalize_house_number(house_number)
+        if not key or not house:
+            return None
+        digits = re.match(r"\d*", house).group()
+
+        # Whole-name similarity, or a query matching part of the name ("Шевченка" ~ "тараса шевченка")
+        score = func.greatest(
+            func.similarity(Building.street_name_norm, key),
+            0.95 * func.word_similarity(key, Building.street_name_norm),
+        )
+        # Another house of the street is another building (and possibly another ОСББ/ЛКП)
+        house_matches = Building.house_number_norm == house
+        if digits:
+            house_matches = or_(house_matches, func.substring(Building.house_number_norm, r"^\d+") == digits)
+        return (
+            select(Building)
+            .where(
+                Building.city == city,
+                or_(Building.street_name_norm.op("%")(key), Building.street_name_norm.op("%>")(key)),
+                score >= settings.BUILDING_MATCH_MIN_SCORE,
+                house_matches,
+            )
+            .order_by(
+                score.desc(),
+                (Building.house_number_norm == house).desc(),
+                Building.building_id,
+            )
+            .limit(limit)
+        )
+
+    def _find_building_like(self, street_name: str, house_number: str, city: str = "Львів") -> Optional[Building]:
+        """Legacy lookup: LIKE over street tokens, then house number match."""
         street_tokens = self._street_tokens(street_name)
         normalized_house = self._normalize_house_number(house_number)
         house_variants = {normalized_house} if normalized_house else set()
@@ -91,7 +152,7 @@ class ServiceRouter:
         return candidates[0]
 
     def _format_response(
-        self, service: Service, confidence: float, reasoning: str,
+        self, service: RoutingService, confidence: float, reasoning: str,
         category_id: str = "", category_name: str = "", is_urgent: bool = False
     ) -> ServiceResponse:
         """Formats the response for the API."""
@@ -113,9 +174,7 @@ class ServiceRouter:
         
     def _get_hotline_fallback(self, category_id: str, category_name: str, is_urgent: bool) -> ServiceResponse:
         """Returns the City Hotline 1580 as a fallback."""
-        hotline = self.session.exec(
-            select(Service).where(Service.name_ua == "Міська гаряча лінія 1580")
-        ).first()
+        hotline = get_routing_tables(self.session).hotline
         
         if hotline:
             if is_urgent:
@@ -158,124 +217,85 @@ class ServiceRouter:
         3. District level (district administrations)
         4. City level (citywide monopolists)
         5. Fallback (1580)
+
+        All levels are lookups in the compiled routing tables; the building is only
+        fetched when the building or district level needs it.
         """
         
-        # 0. Determine Building ID and District (if possible)
-        building = self._find_building(street_name, house_number)
-        building_id = building.building_id if building else None
-        district = building.district if building else None
+        categories = get_category_registry(self.session)
+        tables = get_routing_tables(self.session)
+        category_name = categories.name_of(category_id)
 
         # --- 1. URGENCY (Emergency Check) ---
         if is_urgent:
             # Search only for emergency services by category
-            emergency_stmt = (
-                select(Service, ServiceAssignment, Category)
-                .join(ServiceAssignment, Service.service_id == ServiceAssignment.service_id)
-                .join(Category, Category.id == ServiceAssignment.category_id)
-                .where(Service.is_emergency.is_(True))
-                .where(ServiceAssignment.category_id == category_id)
-            )
-            emergency_result = self.session.exec(emergency_stmt).first()
-            
-            if emergency_result:
-                service, assignment, category = emergency_result
+            service = tables.emergency_service(category_id)
+            if service:
                 return self._format_response(
                     service,
                     confidence=0.95,
                     reasoning=f"Пріоритет: Знайдено аварійну службу {service.name_ua} для термінової проблеми '{category_id}'.",
                     category_id=category_id,
-                    category_name=category.name,
+                    category_name=category_name,
                     is_urgent=True
                 )
 
             # If no specific emergency service, return the general hotline as an urgent fallback
-            category_obj = self.session.exec(select(Category).where(Category.id == category_id)).first()
-            category_name = category_obj.name if category_obj else ""
-
             return self._get_hotline_fallback(category_id=category_id, category_name=category_name, is_urgent=True)
 
+        is_district_level = category_id in tables.district_categories
+        is_citywide_level = category_id in tables.citywide_categories
+
+        # 0. Determine Building ID and District (only the building and district levels need them)
+        building = None
+        if not is_citywide_level or is_district_level:
+            building = self._find_building(street_name, house_number)
+        building_id = building.building_id if building else None
+        district = building.district if building else None
+
         # --- 2. BUILDING-LEVEL RESPONSIBILITY (OSBB/LKP) ---
-        if category_id not in RA_CATEGORIES and category_id not in CITYWIDE_MONOPOLISTS_CATEGORIES and building_id is not None:
+        if not is_district_level and not is_citywide_level and building_id is not None:
             
-            # Search for assignment by specific building (highest specificity)
-            specific_stmt = (
-                select(Service, ServiceAssignment, Category)
-                .join(ServiceAssignment, Service.service_id == ServiceAssignment.service_id)
-                .join(Category, Category.id == ServiceAssignment.category_id)
-                .where(ServiceAssignment.building_id == building_id)
-                .where(ServiceAssignment.is_primary)
-                .where(Service.type.in_(['ОСББ', 'ЛКП/УК']))
-            )
-            specific_result = self.session.exec(specific_stmt).first()
-
-            if specific_result:
-                service, assignment, category = specific_result
+            # Assignment by specific building (highest specificity)
+            service = tables.building_service(building_id, category_id)
+            if service:
                 return self._format_response(
                     service,
                     confidence=0.9,
                     reasoning=f"Адресна прив'язка: Будинок {house_number} на вул. {street_name} обслуговується {service.name_ua}.",
                     category_id=category_id,
-                    category_name=category.name,
+                    category_name=category_name,
                     is_urgent=is_urgent
                 )
             
             # Fallback at street/district level (LKP covering the street if no OSBB)
 
         # --- 3. DISTRICT RESPONSIBILITY ---
-        if category_id in RA_CATEGORIES and district and district != "Невідомий":
-            search_district = district
-            if district.endswith("ий"):
-                search_district = district[:-2] + "а"
-            
-            # Search for service of type "РА" (District Administration)
-            like_pattern = f"%{search_district}%"
-            ra_stmt = (
-                select(Service, ServiceAssignment, Category)
-                .join(ServiceAssignment, Service.service_id == ServiceAssignment.service_id)
-                .join(Category, Category.id == ServiceAssignment.category_id)
-                .where(ServiceAssignment.category_id == category_id)
-                .where(Service.type.in_(RA_SERVICE_TYPES))
-                .where(Service.name_ua.like(like_pattern)) # Search RA by district name
-            )
-            ra_result = self.session.exec(ra_stmt).first()
-            
-            if ra_result:
-                service, assignment, category = ra_result
+        if is_district_level and district and district != "Невідомий":
+            # District administration ("РА") whose name contains the district
+            service = tables.district_service(district, category_id)
+            if service:
                 return self._format_response(
                     service,
                     confidence=0.85,
                     reasoning=f"Районний рівень: Проблема '{category_id}' на вулиці {street_name} належить до юрисдикції {service.name_ua}.",
                     category_id=category_id,
-                    category_name=category.name,
+                    category_name=category_name,
                     is_urgent=is_urgent
                 )
 
         # --- 4. Citywide Monopolists ---
-        if category_id in CITYWIDE_MONOPOLISTS_CATEGORIES:
-            
-            citywide_stmt = (
-                select(Service, ServiceAssignment, Category)
-                .join(ServiceAssignment, Service.service_id == ServiceAssignment.service_id)
-                .join(Category, Category.id == ServiceAssignment.category_id)
-                .where(ServiceAssignment.category_id == category_id)
-                .where(ServiceAssignment.coverage_level == 'citywide')
-                .where(Service.type == 'КП')
-            )
-            citywide_result = self.session.exec(citywide_stmt).first()
-            
-            if citywide_result:
-                service, assignment, category = citywide_result
+        if is_citywide_level:
+            service = tables.citywide_service(category_id)
+            if service:
                 return self._format_response(
                     service,
                     confidence=0.7,
                     reasoning=f"Міський монополіст: Проблема '{category_id}' є загальноміською та обслуговується {service.name_ua}.",
                     category_id=category_id,
-                    category_name=category.name,
+                    category_name=category_name,
                     is_urgent=is_urgent
                 )
 
         # --- 5. HOTLINE FALLBACK ---
-        category_obj = self.session.exec(select(Category).where(Category.id == category_id)).first()
-        category_name = category_obj.name if category_obj else ""
-
         return self._get_hotline_fallback(category_id=category_id, category_name=category_name, is_urgent=is_urgent)
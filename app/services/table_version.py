@@ -0,0 +1,60 @@
+"""
+Version stamps of database tables behind process-wide snapshots.
+
+A stamp is max(primary key) of every table plus their cumulative insert/update/delete
+counters from pg_stat_user_tables (like the examples/categories stamp of the
+classification cache), so checking it scans no table. A snapshot keeps the stamp it
+was built at and is rebuilt when the current stamp differs, which picks up changes
+made by seeding, admin scripts or other workers without a restart.
+"""
+import threading
+import time
+from typing import Mapping
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.config import settings
+
+
+class TableVersion:
+    """Rate-limited version stamp of a few tables, rechecked at most every ROUTING_DATA_VERSION_CHECK_SECONDS"""
+
+    def __init__(self, primary_keys: Mapping[str, str]):
+        """primary_keys: table name -> integer primary key column"""
+        tables = ", ".join(f"'{table}'" for table in primary_keys)
+        max_ids = ",\n                ".join(
+            f"(SELECT coalesce(max({column}), 0) FROM {table})" for table, column in primary_keys.items()
+        )
+        self.query = text(f"""
+            SELECT concat_ws(':',
+                {max_ids},
+                (SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0)
+                 FROM pg_stat_user_tables WHERE relname IN ({tables})))
+        """)
+        self._lock = threading.Lock()
+        self._version: str | None = None
+        self._checked_at = 0.0
+
+    def get(self, session: Session) -> str:
+        """Current stamp, queried again once the last check is older than the interval"""
+        with self._lock:
+            if (
+                self._version is not None
+                and time.monotonic() - self._checked_at < settings.ROUTING_DATA_VERSION_CHECK_SECONDS
+            ):
+                return self._version
+        return self.refresh(session)
+
+    def refresh(self, session: Session) -> str:
+        """Query the stamp now"""
+        version = session.execute(self.query).scalar_one()
+        with self._lock:
+            self._version = version
+            self._checked_at = time.monotonic()
+        return version
+
+    def reset(self) -> None:
+        """Forget the stamp, the next get() queries the database"""
+        with self._lock:
+            self._version = None
@@ -0,0 +1,113 @@
+"""
+Content-addressed store of audio transcripts.
+
+Keyed by (transcription model, SHA-256 of the audio bytes), so a client retrying
+the same upload gets the stored transcript instead of a new provider call.
+Concurrent requests for the same key share one in-flight transcription
+(single-flight): it runs as its own task and is only cancelled when every
+waiting request has gone away.
+"""
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def transcript_key(model: str, audio_sha256: str) -> str:
+    return f"{model}:{audio_sha256}"
+
+
+class TranscriptStore:
+    """TTL/LRU transcript cache with per-key in-flight de-duplication (one event loop)"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float | None):
+        self.cache = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.coalesced = 0
+
+    async def get_or_transcribe(
+        self,
+        key: str,
+        read_audio: Callable[[], Awaitable[T]],
+        transcribe: Callable[[T], Awaitable[str]],
+    ) -> str:
+        """
+        Stored transcript, the result of the in-flight call for the key, or a new call.
+
+        The shared call can outlive the request that started it (and its upload file),
+        so on a miss the audio is read by that request first and the call gets its own copy.
+        `transcribe` returns the call as a coroutine or an already created task.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            audio = await read_audio()
+            # Another request for the same audio may have started the call meanwhile
+            task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(transcribe(audio))
+            self._inflight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            logger.info("Transcription of identical audio already in flight, waiting for it")
+
+        self._waiters[task] += 1
+        try:
+            # shield: one caller going away must not cancel the call the others wait for
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self._waiters.pop(task, None)
+        if task.cancelled() or task.exception() is not None:
+            # Failures are not stored, the next retry calls the provider again
+            return
+        if task.result():
+            self.cache.set(key, task.result())
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.TRANSCRIPT_CACHE_ENABLED,
+            **self.cache.stats(),
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+_transcript_store = TranscriptStore(
+    maxsize=settings.TRANSCRIPT_CACHE_MAX_ITEMS,
+    ttl_seconds=settings.TRANSCRIPT_CACHE_TTL_SECONDS,
+)
+
+
+def get_transcript_store() -> TranscriptStore | None:
+    """Shared store, or None when TRANSCRIPT_CACHE_ENABLED is off"""
+    return _transcript_store if settings.TRANSCRIPT_CACHE_ENABLED else None
+
+
+def get_transcript_store_stats() -> dict:
+    """Hit/miss/coalescing counters for health endpoints"""
+    return _transcript_store.stats()
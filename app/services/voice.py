@@ -1,33 +1,283 @@
 """
 Voice processing service
 """
-from typing import BinaryIO
+import asyncio
+import io
+from typing import Awaitable, BinaryIO, Callable
+
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.llm.client import get_gemini_client
-from app.llm.prompts import AUDIO_TRANSCRIPTION_PROMPT
+from app.llm.prompts import AUDIO_CHUNK_TRANSCRIPTION_PROMPT, AUDIO_TRANSCRIPTION_PROMPT
+from app.schemas.voice import VoiceStreamEvent
+from app.services.transcript_store import get_transcript_store, transcript_key
+from app.utils.audio import PCMAudio, PCMSegmenter, read_wav, split_on_silence
 
 logger = get_logger(__name__)
 
+# Each running transcription holds its audio in memory, bound how many run at once per process
+_transcription_slots = asyncio.Semaphore(settings.VOICE_MAX_CONCURRENT_TRANSCRIPTIONS)
+
+WAV_MIME_TYPES = {"audio/wav", "audio/x-wav", "audio/wave"}
+
+
+class _TranscriptionSlot:
+    """
+    One of the process-wide transcription slots, taken before the audio is loaded into memory.
+    Released once, by whichever step is done with it first.
+    """
+
+    def __init__(self):
+        self.held = False
+
+    async def acquire(self) -> None:
+        if not self.held:
+            await _transcription_slots.acquire()
+            self.held = True
+
+    def release(self) -> None:
+        if self.held:
+            self.held = False
+            _transcription_slots.release()
+
 
 class VoiceService:
     """Service for voice input processing"""
-    
+
     def __init__(self):
         self.gemini = get_gemini_client()
-    
+
+    def _generate(self, prompt: str, audio_data: bytes, mime_type: str) -> str:
+        response = self.gemini.model.generate_content(
+            [
+                prompt,
+                {"mime_type": mime_type, "data": audio_data}
+            ],
+            request_options={"timeout": settings.VOICE_TRANSCRIPTION_TIMEOUT_SECONDS},
+        )
+        return response.text.strip()
+
     def transcribe_audio(self, audio_file: BinaryIO, mime_type: str = "audio/webm") -> str:
-        """Transcribe audio to Ukrainian text"""
+        """Transcribe audio to Ukrainian text in one call (blocking, use atranscribe_audio in request handlers)"""
         logger.info(f"Starting audio transcription with mime_type: {mime_type}")
+        audio_file.seek(0)
         audio_data = audio_file.read()
         audio_file.seek(0)
-        
-        response = self.gemini.model.generate_content([
-            AUDIO_TRANSCRIPTION_PROMPT,
-            {"mime_type": mime_type, "data": audio_data}
-        ])
-        
+
+        transcription = self._generate(AUDIO_TRANSCRIPTION_PROMPT, audio_data, mime_type)
         logger.info("Audio transcription completed successfully")
-        return response.text.strip()
+        return transcription
+
+    async def _run_transcription(self, func, *args) -> str:
+        """Run a blocking provider call in a worker thread under the process-wide slots and timeout"""
+        async with _transcription_slots:
+            return await self._call_provider(func, *args)
+
+    @staticmethod
+    async def _call_provider(func, *args) -> str:
+        return await asyncio.wait_for(
+            asyncio.to_thread(func, *args),
+            timeout=settings.VOICE_TRANSCRIPTION_TIMEOUT_SECONDS,
+        )
+
+    async def atranscribe_audio(
+        self,
+        audio_file: BinaryIO,
+        mime_type: str = "audio/webm",
+        content_sha256: str | None = None,
+    ) -> str:
+        """
+        Transcribe in a worker thread (the Gemini client is blocking) with at most
+        VOICE_MAX_CONCURRENT_TRANSCRIPTIONS calls in flight. Raises TimeoutError after
+        VOICE_TRANSCRIPTION_TIMEOUT_SECONDS.
+
+        16-bit WAV recordings longer than VOICE_LONG_AUDIO_MIN_SECONDS are split at pauses
+        and the chunks transcribed concurrently; other input keeps the single call.
+
+        With `content_sha256` (hex SHA-256 of the file) the transcript store is used:
+        identical audio is transcribed once per model and TRANSCRIPT_CACHE_TTL_SECONDS.
+        """
+        store = get_transcript_store()
+        if store is None or content_sha256 is None:
+            return await self._atranscribe_file(audio_file, mime_type)
+
+        slot = _TranscriptionSlot()
+        started = False
+
+        def read_audio() -> bytes:
+            audio_file.seek(0)
+            data = audio_file.read()
+            audio_file.seek(0)
+            return data
+
+        async def load_audio() -> bytes:
+            # Copy the upload only once a slot is free: queued requests keep their audio in the
+            # spool file, and the call started with the copy runs in that slot
+            await slot.acquire()
+            return await asyncio.to_thread(read_audio)
+
+        def transcribe(data: bytes) -> asyncio.Task:
+            nonlocal started
+            started = True
+            task = asyncio.create_task(self._atranscribe_file(io.BytesIO(data), mime_type, slot))
+            # Also when the call is cancelled before it starts running
+            task.add_done_callback(lambda _: slot.release())
+            return task
+
+        try:
+            return await store.get_or_transcribe(
+                transcript_key(settings.CODEMIE_TRANSCRIPTION_MODEL, content_sha256),
+                load_audio,
+                transcribe,
+            )
+        finally:
+            if not started:
+                # Stored or coalesced transcript, or a failed read: the slot was not handed over
+                slot.release()
+
+    async def _atranscribe_file(
+        self, audio_file: BinaryIO, mime_type: str, slot: _TranscriptionSlot | None = None
+    ) -> str:
+        """Transcribe in one slot (taken here unless the caller holds it); long WAV chunks take their own"""
+        slot = slot or _TranscriptionSlot()
+        try:
+            await slot.acquire()
+            if settings.VOICE_LONG_AUDIO_ENABLED and mime_type in WAV_MIME_TYPES:
+                audio = await asyncio.to_thread(read_wav, audio_file)
+                if audio is not None and audio.duration_seconds > settings.VOICE_LONG_AUDIO_MIN_SECONDS:
+                    slot.release()
+                    return await self.atranscribe_pcm(audio)
+
+            return await self._call_provider(self.transcribe_audio, audio_file, mime_type)
+        finally:
+            slot.release()
+
+    async def atranscribe_pcm(self, audio: PCMAudio) -> str:
+        """Split PCM audio at pauses, transcribe the chunks with bounded parallelism and join them in order"""
+        bounds = split_on_silence(audio, settings.VOICE_CHUNK_MIN_SECONDS, settings.VOICE_CHUNK_MAX_SECONDS)
+        if not bounds:
+            return ""
+        if len(bounds) == 1:
+            return await self._run_transcription(self._generate, AUDIO_TRANSCRIPTION_PROMPT, audio.to_wav(), "audio/wav")
+
+        logger.info(f"Long audio transcription: {audio.duration_seconds:.1f}s in {len(bounds)} chunks")
+
+        # Per recording, on top of the process-wide slots: with VOICE_CHUNK_CONCURRENCY below
+        # VOICE_MAX_CONCURRENT_TRANSCRIPTIONS one long note does not take them all
+        chunk_slots = asyncio.Semaphore(settings.VOICE_CHUNK_CONCURRENCY)
+
+        async def transcribe_chunk(index: int, start: int, end: int) -> str:
+            prompt = AUDIO_CHUNK_TRANSCRIPTION_PROMPT.format(part=index + 1, total=len(bounds))
+            async with chunk_slots:
+                wav = audio.slice(start, end).to_wav()
+                for attempt in range(settings.VOICE_CHUNK_RETRIES + 1):
+                    try:
+                        return await self._run_transcription(self._generate, prompt, wav, "audio/wav")
+                    except Exception as e:
+                        if attempt == settings.VOICE_CHUNK_RETRIES:
+                            raise
+                        logger.warning(f"Chunk {index + 1}/{len(bounds)} transcription failed, retrying: {str(e)}")
+
+        texts = await asyncio.gather(*(transcribe_chunk(i, start, end) for i, (start, end) in enumerate(bounds)))
+        logger.info("Long audio transcription completed successfully")
+        return " ".join(text for text in texts if text)
+
+
+class VoiceStreamSession:
+    """
+    Live transcription of a PCM16 stream: speech segments closed at pauses are
+    transcribed in the background while the user keeps speaking, and every
+    finished segment is pushed through `send` together with the ordered transcript so far.
+    """
+
+    def __init__(
+        self,
+        voice_service: VoiceService,
+        sample_rate: int,
+        channels: int,
+        send: Callable[[VoiceStreamEvent], Awaitable[None]],
+    ):
+        self.voice_service = voice_service
+        self.segmenter = PCMSegmenter(
+            sample_rate=sample_rate,
+            channels=channels,
+            min_segment_seconds=settings.VOICE_STREAM_MIN_SEGMENT_SECONDS,
+            max_segment_seconds=settings.VOICE_CHUNK_MAX_SECONDS,
+            pause_seconds=settings.VOICE_STREAM_PAUSE_SECONDS,
+            silence_rms=settings.VOICE_STREAM_SILENCE_RMS,
+        )
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self._texts: list[str | None] = []
+        self._tasks: set[asyncio.Task] = set()
+        # First failed send of a segment event (client gone), re-raised by finish()
+        self._send_error: BaseException | None = None
+
+    def transcript(self) -> str:
+        """Completed segments in speaking order, up to the first one still in flight"""
+        texts = []
+        for text in self._texts:
+            if text is None:
+                break
+            if text:
+                texts.append(text)
+        return " ".join(texts)
+
+    async def send(self, event: VoiceStreamEvent) -> None:
+        async with self._send_lock:
+            await self._send(event)
+
+    async def _transcribe_segment(self, index: int, segment: PCMAudio) -> None:
+        try:
+            text = await self.voice_service.atranscribe_pcm(segment)
+        except Exception as e:
+            logger.error(f"Stream segment {index} transcription failed: {str(e) or type(e).__name__}")
+            self._texts[index] = ""
+            await self.send(VoiceStreamEvent(
+                event="error", segment=index, transcript=self.transcript(),
+                detail=f"Segment transcription failed: {str(e) or type(e).__name__}",
+            ))
+            return
+
+        self._texts[index] = text
+        await self.send(VoiceStreamEvent(event="segment", segment=index, text=text, transcript=self.transcript()))
+
+    def _start(self, segment: PCMAudio) -> None:
+        index = len(self._texts)
+        self._texts.append(None)
+        task = asyncio.create_task(self._transcribe_segment(index, segment))
+        self._tasks.add(task)
+        task.add_done_callback(self._segment_done)
+
+    def _segment_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None and self._send_error is None:
+            self._send_error = task.exception()
+
+    def feed(self, data: bytes) -> None:
+        """Add PCM16 frames; closed segments start transcribing in the background"""
+        for segment in self.segmenter.feed(data):
+            self._start(segment)
+        if self.segmenter.received_seconds > settings.VOICE_STREAM_MAX_SECONDS:
+            raise ValueError(f"Voice stream is longer than {settings.VOICE_STREAM_MAX_SECONDS:.0f} seconds")
+
+    async def finish(self) -> str:
+        """Transcribe the rest of the audio, wait for all segments and return the full transcript"""
+        segment = self.segmenter.flush()
+        if segment is not None:
+            self._start(segment)
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        if self._send_error is not None:
+            raise self._send_error
+        return self.transcript()
+
+    async def aclose(self) -> None:
+        """Cancel segments still in flight (client went away)"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
 
 def get_voice_service() -> VoiceService:
@@ -0,0 +1,182 @@
+"""
+PCM audio helpers for chunked transcription.
+
+Long recordings are cut at the quietest point (smoothed short-time energy) inside
+a [min, max] chunk length window, so chunks end at pauses between words rather
+than mid-word. Only 16-bit PCM (WAV or raw frames) is handled here.
+"""
+import io
+import wave
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import numpy as np
+
+# Energy is measured over 20 ms windows and smoothed over 200 ms (a short pause)
+ENERGY_WINDOW_SECONDS = 0.02
+SMOOTHING_WINDOWS = 10
+
+
+@dataclass(frozen=True)
+class PCMAudio:
+    """16-bit little-endian interleaved PCM"""
+    frames: bytes
+    sample_rate: int
+    channels: int
+
+    @property
+    def frame_size(self) -> int:
+        return 2 * self.channels
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames) // self.frame_size
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.frame_count / self.sample_rate if self.sample_rate else 0.0
+
+    def slice(self, start_frame: int, end_frame: int) -> "PCMAudio":
+        return PCMAudio(
+            frames=self.frames[start_frame * self.frame_size:end_frame * self.frame_size],
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+        )
+
+    def to_wav(self) -> bytes:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(self.frames)
+        return buffer.getvalue()
+
+
+def read_wav(audio_file: BinaryIO) -> PCMAudio | None:
+    """PCM of a 16-bit WAV file, None for other encodings (e.g. 8/24-bit, float, compressed)"""
+    audio_file.seek(0)
+    try:
+        with wave.open(audio_file, "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getcomptype() != "NONE":
+                return None
+            audio = PCMAudio(
+                frames=wav.readframes(wav.getnframes()),
+                sample_rate=wav.getframerate(),
+                channels=wav.getnchannels(),
+            )
+    except (wave.Error, EOFError):
+        return None
+    finally:
+        audio_file.seek(0)
+    return audio
+
+
+def _smoothed_energy(audio: PCMAudio, window: int) -> np.ndarray:
+    samples = np.frombuffer(audio.frames[:audio.frame_count * audio.frame_size], dtype="<i2")
+    samples = samples.reshape(-1, audio.channels).astype(np.float32).mean(axis=1)
+    windows = len(samples) // window
+    energy = np.square(samples[:windows * window].reshape(windows, window)).mean(axis=1)
+    if windows >= SMOOTHING_WINDOWS:
+        energy = np.convolve(energy, np.ones(SMOOTHING_WINDOWS) / SMOOTHING_WINDOWS, mode="same")
+    return energy
+
+
+def split_on_silence(audio: PCMAudio, min_chunk_seconds: float, max_chunk_seconds: float) -> list[tuple[int, int]]:
+    """
+    (start_frame, end_frame) chunks of at most max_chunk_seconds, each cut at the
+    quietest point after min_chunk_seconds. Audio no longer than the maximum is one chunk.
+    """
+    total = audio.frame_count
+    if total == 0:
+        return []
+
+    window = max(1, int(audio.sample_rate * ENERGY_WINDOW_SECONDS))
+    min_windows = max(1, int(min_chunk_seconds / ENERGY_WINDOW_SECONDS))
+    max_windows = max(min_windows + 1, int(max_chunk_seconds / ENERGY_WINDOW_SECONDS))
+    if total <= max_windows * window:
+        return [(0, total)]
+
+    energy = _smoothed_energy(audio, window)
+    cuts = []
+    start = 0
+    while len(energy) - start > max_windows:
+        low, high = start + min_windows, start + max_windows
+        cut = low + int(np.argmin(energy[low:high]))
+        cuts.append(cut * window)
+        start = cut
+
+    bounds = [0, *cuts, total]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class PCMSegmenter:
+    """
+    Cuts a live PCM stream into closed segments: at a pause (pause_seconds below
+    silence_rms) once a segment is at least min_segment_seconds long, or at the
+    quietest point when it reaches max_segment_seconds. Silent segments are dropped.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int,
+        min_segment_seconds: float,
+        max_segment_seconds: float,
+        pause_seconds: float,
+        silence_rms: float,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.min_segment_seconds = min_segment_seconds
+        self.max_segment_seconds = max_segment_seconds
+        self.pause_seconds = pause_seconds
+        self.silence_rms = silence_rms
+        self.received_bytes = 0
+        self._buffer = bytearray()
+        self._frame_size = 2 * channels
+
+    @property
+    def received_seconds(self) -> float:
+        return self.received_bytes / self._frame_size / self.sample_rate
+
+    def _audio(self, frames: bytes) -> PCMAudio:
+        return PCMAudio(frames=bytes(frames), sample_rate=self.sample_rate, channels=self.channels)
+
+    def _is_silent(self, frames: bytes) -> bool:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32)
+        return samples.size == 0 or float(np.mean(np.square(samples))) < self.silence_rms ** 2
+
+    def _take(self, frame_count: int) -> PCMAudio | None:
+        size = frame_count * self._frame_size
+        frames = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return None if self._is_silent(frames) else self._audio(frames)
+
+    def feed(self, data: bytes) -> list[PCMAudio]:
+        """Add frames, return the segments closed by them"""
+        self._buffer.extend(data)
+        self.received_bytes += len(data)
+        segments = []
+
+        max_frames = int(self.max_segment_seconds * self.sample_rate)
+        while len(self._buffer) // self._frame_size > max_frames:
+            audio = self._audio(self._buffer[:len(self._buffer) - len(self._buffer) % self._frame_size])
+            _, end = split_on_silence(audio, self.min_segment_seconds, self.max_segment_seconds)[0]
+            segment = self._take(end)
+            if segment is not None:
+                segments.append(segment)
+
+        buffered_frames = len(self._buffer) // self._frame_size
+        pause_frames = int(self.pause_seconds * self.sample_rate)
+        if buffered_frames >= self.min_segment_seconds * self.sample_rate and buffered_frames > pause_frames:
+            tail = self._buffer[(buffered_frames - pause_frames) * self._frame_size:buffered_frames * self._frame_size]
+            if self._is_silent(bytes(tail)):
+                segment = self._take(buffered_frames)
+                if segment is not None:
+                    segments.append(segment)
+        return segments
+
+    def flush(self) -> PCMAudio | None:
+        """Remaining audio as the last segment (None if silent or empty)"""
+        return self._take(len(self._buffer) // self._frame_size)
@@ -0,0 +1,252 @@
+"""
+Streaming, size-limited audio uploads.
+
+The request body is consumed chunk by chunk from the ASGI stream into a
+SpooledTemporaryFile (kept in memory up to VOICE_UPLOAD_SPOOL_MAX_MEMORY, then
+rolled over to disk). The audio format is checked from the first bytes of the
+file and the upload is rejected as soon as it exceeds the size limit, without
+reading the rest of the body.
+"""
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import Iterable
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import parse_options_header
+from starlette.requests import Request
+
+from app.core.config import settings
+
+# Enough bytes to recognize every supported container
+MAGIC_BYTES = 12
+
+# Multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class AudioUploadError(ValueError):
+    """Upload rejected before transcription; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _too_large(max_bytes: int) -> AudioUploadError:
+    return AudioUploadError(f"Audio file is too large (limit {max_bytes / (1024 * 1024):.1f} MB)", status_code=413)
+
+
+def detect_audio_mime_type(head: bytes) -> str | None:
+    """Container format from the leading bytes of a file, None if not a supported audio format"""
+    if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head.startswith(b"OggS"):
+        return "audio/ogg"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        # EBML header: WebM / Matroska
+        return "audio/webm"
+    if head[4:8] == b"ftyp":
+        # ISO base media: m4a / mp4
+        return "audio/mp4"
+    if head.startswith(b"ID3") or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        # ID3 tag or MPEG audio frame sync
+        return "audio/mpeg"
+    return None
+
+
+@dataclass
+class AudioUpload:
+    """Received audio file; close() when done"""
+    file: SpooledTemporaryFile
+    # Detected from the file content, not the declared Content-Type
+    mime_type: str
+    declared_type: str | None
+    filename: str
+    size: int
+    # Hex SHA-256 of the file content, computed while receiving
+    sha256: str
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _AudioSink:
+    """Size and format checks on incoming file bytes, buffered between awaits"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.file = SpooledTemporaryFile(max_size=settings.VOICE_UPLOAD_SPOOL_MAX_MEMORY)
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.mime_type: str | None = None
+        self._head = b""
+        self._pending: list[bytes] = []
+
+    def feed(self, data: bytes) -> None:
+        if not data:
+            return
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self.sha256.update(data)
+        if self.mime_type is None and len(self._head) < MAGIC_BYTES:
+            self._head += data[:MAGIC_BYTES - len(self._head)]
+            if len(self._head) >= MAGIC_BYTES:
+                self._detect()
+        self._pending.append(data)
+
+    def finish(self) -> None:
+        if self.mime_type is None and self._head:
+            self._detect()
+
+    def _detect(self) -> None:
+        self.mime_type = detect_audio_mime_type(self._head)
+        if self.mime_type is None:
+            raise AudioUploadError("File content is not a supported audio format")
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        if getattr(self.file, "_rolled", True):
+            # Spilled to disk: do not block the event loop on file I/O
+            await asyncio.to_thread(self.file.write, data)
+        else:
+            self.file.write(data)
+
+
+class _MultipartAudioPart:
+    """python-multipart callbacks that forward one named file field to an _AudioSink"""
+
+    def __init__(self, sink: _AudioSink, field_name: str, allowed_types: Iterable[str] | None):
+        self.sink = sink
+        self.field_name = field_name
+        self.allowed_types = set(allowed_types) if allowed_types is not None else None
+        self.filename: str | None = None
+        self.declared_type: str | None = None
+        self.done = False
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._active = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+        self._active = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if name != self.field_name or b"filename" not in options or self.filename is not None:
+            return
+
+        self.filename = options[b"filename"].decode("utf-8", errors="replace")
+        content_type = self._headers.get(b"content-type")
+        self.declared_type = content_type.decode("latin-1").strip() if content_type else None
+        if self.allowed_types is not None and self.declared_type not in self.allowed_types:
+            raise AudioUploadError(f"Unsupported format: {self.declared_type}")
+        self._active = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._active:
+            self.sink.feed(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._active:
+            self.sink.finish()
+            self._active = False
+            self.done = True
+
+
+async def receive_audio_upload(
+    request: Request,
+    field_name: str = "audio",
+    allowed_types: Iterable[str] | None = None,
+    max_bytes: int | None = None,
+) -> AudioUpload:
+    """
+    Stream an audio upload from a multipart/form-data field (or a raw audio/* body)
+    into a spooled temporary file. Raises AudioUploadError on a missing, oversized,
+    mislabeled or unrecognized file, as early as the body allows.
+    """
+    max_bytes = max_bytes or settings.VOICE_UPLOAD_MAX_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise _too_large(max_bytes)
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    content_type = content_type.decode("latin-1").lower()
+    sink = _AudioSink(max_bytes)
+    try:
+        if content_type == "multipart/form-data":
+            boundary = options.get(b"boundary")
+            if not boundary:
+                raise AudioUploadError("Missing boundary in multipart body")
+
+            part = _MultipartAudioPart(sink, field_name, allowed_types)
+            parser = MultipartParser(boundary, part.callbacks())
+            async for chunk in request.stream():
+                parser.write(chunk)
+                await sink.flush()
+                if part.done:
+                    # The rest of the body is the closing boundary (or fields we do not use)
+                    break
+            if part.filename is None:
+                raise AudioUploadError(f"No audio file in form field '{field_name}'")
+            filename, declared_type = part.filename, part.declared_type
+        elif content_type.startswith("audio/"):
+            if allowed_types is not None and content_type not in set(allowed_types):
+                raise AudioUploadError(f"Unsupported format: {content_type}")
+            async for chunk in request.stream():
+                sink.feed(chunk)
+                await sink.flush()
+            sink.finish()
+            filename, declared_type = "upload", content_type
+        else:
+            raise AudioUploadError(f"Unsupported request content type: {content_type or 'none'}")
+    except FormParserError as e:
+        sink.file.close()
+        raise AudioUploadError(f"Invalid multipart body: {str(e)}") from e
+    except BaseException:
+        sink.file.close()
+        raise
+
+    if sink.size == 0 or sink.mime_type is None:
+        sink.file.close()
+        raise AudioUploadError("Audio file is empty")
+
+    sink.file.seek(0)
+    return AudioUpload(
+        file=sink.file,
+        mime_type=sink.mime_type,
+        declared_type=declared_type,
+        filename=filename,
+        size=sink.size,
+        sha256=sink.sha256.hexdigest(),
+    )
@@ -0,0 +1,130 @@
+"""
+In-memory stand-ins for the OpenAI-compatible CodeMie clients, shared by unit tests.
+
+Completions answer with `reply` (a string, or a callable taking the prompt),
+embeddings are derived from the text length, every call is recorded in `calls`.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+
+def _prompt(messages: list[dict]) -> str:
+    return messages[-1]["content"]
+
+
+def _completion(content: str | None) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _embedding_response(texts) -> SimpleNamespace:
+    texts = [texts] if isinstance(texts, str) else list(texts)
+    return SimpleNamespace(data=[
+        SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(texts)
+    ])
+
+
+class FakeStream:
+    """Async iterator of completion chunks, like the provider's stream=True response"""
+
+    def __init__(self, deltas: list[str | None]):
+        self.deltas = deltas
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for delta in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeCompletions:
+    def __init__(self, client: "FakeAsyncOpenAI"):
+        self.client = client
+
+    def respond(self, model, messages, temperature=None, stream=False, **kwargs):
+        prompt = _prompt(messages)
+        self.client.calls.append({"model": model, "prompt": prompt, "temperature": temperature, "stream": stream, **kwargs})
+        if self.client.error is not None:
+            raise self.client.error
+        reply = self.client.reply(prompt) if callable(self.client.reply) else self.client.reply
+        if stream:
+            self.client.stream = FakeStream(list(reply) if isinstance(reply, str) else reply)
+            return self.client.stream
+        return _completion(reply)
+
+    async def create(self, **kwargs):
+        if self.client.delay:
+            await asyncio.sleep(self.client.delay)
+        return self.respond(**kwargs)
+
+
+class FakeEmbeddingsAPI:
+    def __init__(self, client: "FakeAsyncOpenAI"):
+        self.client = client
+
+    def respond(self, model, input):
+        self.client.calls.append({"model": model, "input": input})
+        if self.client.error is not None:
+            raise self.client.error
+        return _embedding_response(input)
+
+    async def create(self, **kwargs):
+        return self.respond(**kwargs)
+
+
+class FakeModels:
+    def __init__(self, client: "FakeAsyncOpenAI"):
+        self.client = client
+
+    def list(self):
+        return self._models()
+
+    async def _models(self):
+        self.client.calls.append({"models": "list"})
+        if self.client.error is not None:
+            raise self.client.error
+        for model_id in self.client.models_listed:
+            yield SimpleNamespace(id=model_id)
+
+
+class FakeAsyncOpenAI:
+    """AsyncOpenAI stand-in"""
+
+    def __init__(self, reply="ok", delay: float = 0.0, error: Exception | None = None, models_listed=()):
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.models_listed = list(models_listed)
+        self.calls: list[dict] = []
+        self.stream: FakeStream | None = None
+        self.chat = SimpleNamespace(completions=FakeCompletions(self))
+        self.embeddings = FakeEmbeddingsAPI(self)
+        self.models = FakeModels(self)
+
+    def with_options(self, **options):
+        return self
+
+
+class FakeOpenAI:
+    """Blocking OpenAI stand-in sharing the async fake's replies and call log"""
+
+    def __init__(self, async_client: FakeAsyncOpenAI):
+        self.async_client = async_client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=async_client.chat.completions.respond))
+        self.embeddings = SimpleNamespace(create=async_client.embeddings.respond)
+
+
+def fake_llm(reply="ok", **options):
+    """SimpleLLM wired to fake clients (no provider registry involved)"""
+    from app.llm.client import SimpleLLM
+
+    llm = SimpleLLM.__new__(SimpleLLM)
+    llm.async_client = FakeAsyncOpenAI(reply, **options)
+    llm.client = FakeOpenAI(llm.async_client)
+    llm.model = "fake-llm"
+    return llm
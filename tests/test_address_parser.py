@@ -0,0 +1,70 @@
+"""
+Unit tests for the free-form address parser.
+
+To run tests:
+    uv run pytest tests/test_address_parser.py -v
+"""
+
+import pytest
+
+from app.services.address.parser import EMPTY_ADDRESS, ParsedAddress, parse_address
+from app.services.orchestrator import OrchestrationService
+
+
+class TestParseAddress:
+    """Street, house and apartment extraction"""
+
+    @pytest.mark.parametrize(
+        "address, expected",
+        [
+            (
+                "Україна, область Львівська, місто Львів, вулиця Володимира Великого 10б, кв 54",
+                ParsedAddress(city="Львів", street_type="вулиця", street="Володимира Великого", house="10б", apartment="54"),
+            ),
+            (
+                "Львів, проспект Червоної Калини 36",
+                ParsedAddress(street_type="проспект", street="Червоної Калини", house="36"),
+            ),
+            ("Стрийська, 45", ParsedAddress(street="Стрийська", house="45")),
+            ("м. Львів вул. Зелена 5", ParsedAddress(city="Львів", street_type="вулиця", street="Зелена", house="5")),
+            (
+                "Франківський район, вул. Городоцька, буд. 15, кв. 3",
+                ParsedAddress(district="Франківський", street_type="вулиця", street="Городоцька", house="15", apartment="3"),
+            ),
+            ("Сихівський р-н, Зелена 7", ParsedAddress(district="Сихівський", street="Зелена", house="7")),
+            ("пр-т Свободи 1", ParsedAddress(street_type="проспект", street="Свободи", house="1")),
+            ("вул. Городоцька, 15 А", ParsedAddress(street_type="вулиця", street="Городоцька", house="15А")),
+        ],
+    )
+    def test_structured_parts(self, address, expected):
+        assert parse_address(address) == expected
+
+    def test_russian_address(self):
+        parsed = parse_address("город Львов, ул. Городоцкая 5")
+        assert (parsed.city, parsed.street_type, parsed.street, parsed.house) == ("Львов", "вулиця", "Городоцкая", "5")
+
+    @pytest.mark.parametrize(
+        "address", ["г. Львов, ул. Зеленая 10", "г. Львов ул. Зеленая 10", "город Львов ул. Зеленая 10"]
+    )
+    def test_russian_city_prefix(self, address):
+        """"г." / "город" in front of the street is a city prefix, not part of the street name"""
+        assert parse_address(address) == ParsedAddress(city="Львов", street_type="вулиця", street="Зеленая", house="10")
+
+    def test_street_starting_with_city_word(self):
+        """"Городоцька" is a street, not "город" + city name"""
+        assert parse_address("Городоцька") == ParsedAddress(street="Городоцька")
+        assert parse_address("Містечкова 3") == ParsedAddress(street="Містечкова", house="3")
+
+    @pytest.mark.parametrize("address", ["", None, " , ; "])
+    def test_empty(self, address):
+        assert parse_address(address) == EMPTY_ADDRESS
+
+
+class TestOrchestratorAddress:
+    """Street and house passed to the service router"""
+
+    def test_street_and_building(self):
+        assert OrchestrationService._parse_address("вул. Городоцька, 15") == {"street": "Городоцька", "building": "15"}
+
+    def test_missing_address(self):
+        assert OrchestrationService._parse_address(None) == {"street": "", "building": ""}
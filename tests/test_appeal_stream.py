@@ -0,0 +1,96 @@
+"""
+Unit tests for streaming appeal generation (service and SSE endpoint).
+
+No LLM: SimpleLLM is replaced by the fake client from tests/fakes.py.
+
+To run tests:
+    uv run pytest tests/test_appeal_stream.py -v
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api.routes import appeal as appeal_route
+from app.schemas.appeal import AppealRequest
+from app.services import appeal
+from tests.fakes import fake_llm
+
+
+def use_llm(monkeypatch, reply):
+    monkeypatch.setattr(appeal, "SimpleLLM", lambda: fake_llm(reply))
+
+
+def parse_sse(body: str) -> list[tuple[str | None, dict]]:
+    """(event name, data) of every server-sent event"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        event = None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        events.append((event, data))
+    return events
+
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    app.include_router(appeal_route.router)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+class TestStreamAppealText:
+    """Appeal chunks from the LLM stream"""
+
+    async def test_leading_whitespace_skipped(self, monkeypatch):
+        """Whitespace before the first word is dropped, later chunks are kept as is"""
+        use_llm(monkeypatch, ["\n", "  Прошу", " усунути"])
+        request = AppealRequest(problem_text="Немає води", address="вул. Городоцька, 15")
+        assert [chunk async for chunk in appeal.stream_appeal_text(request)] == ["Прошу", " усунути"]
+
+    async def test_generate_joins_chunks(self, monkeypatch):
+        use_llm(monkeypatch, ["Прошу", " усунути ", "\n"])
+        request = AppealRequest(problem_text="Немає води", address="вул. Городоцька, 15")
+        assert await appeal.generate_appeal_text(request) == "Прошу усунути"
+
+    async def test_generate_rejects_empty_stream(self, monkeypatch):
+        use_llm(monkeypatch, [" ", None])
+        with pytest.raises(ValueError):
+            await appeal.generate_appeal_text(AppealRequest(problem_text="Немає води", address=""))
+
+
+class TestAppealStreamEndpoint:
+    """POST /appeal/generate/stream"""
+
+    async def test_deltas_then_done(self, client, monkeypatch):
+        """Each chunk is a data event, the full letter comes in the done event"""
+        use_llm(monkeypatch, ["Прошу", " усунути"])
+        response = await client.post(
+            "/appeal/generate/stream", json={"problem_text": "Немає води", "address": "вул. Городоцька, 15"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["x-accel-buffering"] == "no"
+        assert parse_sse(response.text) == [
+            (None, {"delta": "Прошу"}),
+            (None, {"delta": " усунути"}),
+            ("done", {"letter_text": "Прошу усунути"}),
+        ]
+
+    async def test_llm_failure_is_error_event(self, client, monkeypatch):
+        """Errors after the response has started are reported in-band"""
+        monkeypatch.setattr(appeal, "SimpleLLM", lambda: fake_llm(error=RuntimeError("provider down")))
+        response = await client.post(
+            "/appeal/generate/stream", json={"problem_text": "Немає води", "address": "вул. Городоцька, 15"}
+        )
+
+        (event, data), = parse_sse(response.text)
+        assert event == "error"
+        assert "provider down" in data["detail"]
@@ -0,0 +1,147 @@
+"""
+Unit tests for PCM helpers and chunked transcription of long recordings.
+
+No provider calls: the transcription step is replaced by an async stub,
+audio is synthesized with NumPy.
+
+To run tests:
+    uv run pytest tests/test_audio.py -v
+"""
+
+import asyncio
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from app.core.config import Settings
+from app.services import voice
+from app.services.voice import VoiceService
+from app.utils.audio import PCMAudio, read_wav, split_on_silence
+
+RATE = 8000
+
+
+def tone(seconds: float, amplitude: int = 8000) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype("<i2")
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * RATE), dtype="<i2")
+
+
+def pcm(*parts: np.ndarray) -> PCMAudio:
+    return PCMAudio(frames=np.concatenate(parts).tobytes(), sample_rate=RATE, channels=1)
+
+
+def wav_file(audio: PCMAudio, sample_width: int = 2) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(audio.channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(audio.sample_rate)
+        wav.writeframes(audio.frames if sample_width == 2 else b"\x80" * audio.frame_count)
+    buffer.seek(0)
+    return buffer
+
+
+class TestReadWav:
+    """16-bit WAV decoding"""
+
+    def test_round_trip(self):
+        audio = pcm(tone(1.0))
+        file = wav_file(audio)
+        file.seek(5)
+
+        assert read_wav(file) == audio
+        assert file.tell() == 0
+
+    def test_other_sample_width(self):
+        assert read_wav(wav_file(pcm(tone(0.1)), sample_width=1)) is None
+
+    def test_not_a_wav(self):
+        assert read_wav(io.BytesIO(b"OggS" + b"\x00" * 100)) is None
+
+
+class TestSplitOnSilence:
+    """Chunk boundaries at pauses"""
+
+    def test_short_audio_is_one_chunk(self):
+        audio = pcm(tone(3.0))
+        assert split_on_silence(audio, 1.0, 4.0) == [(0, audio.frame_count)]
+
+    def test_empty_audio(self):
+        assert split_on_silence(pcm(silence(0)), 1.0, 4.0) == []
+
+    def test_cut_at_pause(self):
+        """Speech - pause - speech is cut inside the pause"""
+        audio = pcm(tone(2.5), silence(0.5), tone(2.5))
+        (start, cut), (cut_again, end) = split_on_silence(audio, 1.0, 4.0)
+
+        assert (start, cut, end) == (0, cut_again, audio.frame_count)
+        assert 2.5 * RATE <= cut <= 3.0 * RATE
+
+    def test_chunks_cover_audio_within_limits(self):
+        audio = pcm(*[part for _ in range(6) for part in (tone(1.7), silence(0.3))])
+        bounds = split_on_silence(audio, 1.0, 3.0)
+
+        assert bounds[0][0] == 0 and bounds[-1][1] == audio.frame_count
+        assert all(previous[1] == following[0] for previous, following in zip(bounds, bounds[1:]))
+        assert all((end - start) / RATE <= 3.0 for start, end in bounds[:-1])
+        assert all((end - start) / RATE >= 1.0 for start, end in bounds[:-1])
+
+
+class TestChunkedTranscription:
+    """Long recordings transcribed chunk by chunk"""
+
+    @pytest.fixture
+    def service(self, monkeypatch) -> VoiceService:
+        monkeypatch.setattr(voice.settings, "VOICE_CHUNK_MIN_SECONDS", 1.0)
+        monkeypatch.setattr(voice.settings, "VOICE_CHUNK_MAX_SECONDS", 2.0)
+        monkeypatch.setattr(voice.settings, "VOICE_CHUNK_CONCURRENCY", 2)
+        monkeypatch.setattr(voice.settings, "VOICE_CHUNK_RETRIES", 1)
+
+        service = VoiceService.__new__(VoiceService)
+        service.in_flight = service.max_in_flight = 0
+        service.calls = []
+        service.failures = set()
+
+        async def run_transcription(func, prompt, wav, mime_type):
+            part = len(service.calls)
+            service.calls.append(prompt)
+            service.in_flight += 1
+            service.max_in_flight = max(service.max_in_flight, service.in_flight)
+            try:
+                # Later chunks answer first, the transcript must still be in order
+                await asyncio.sleep(0.01 * (10 - part))
+                if part in service.failures:
+                    raise RuntimeError("provider error")
+                return prompt.split()[0] if prompt else ""
+            finally:
+                service.in_flight -= 1
+
+        monkeypatch.setattr(service, "_run_transcription", run_transcription)
+        monkeypatch.setattr(voice, "AUDIO_CHUNK_TRANSCRIPTION_PROMPT", "{part}/{total}")
+        return service
+
+    def test_chunk_concurrency_below_process_slots(self):
+        """A single recording cannot occupy every process-wide transcription slot"""
+        defaults = Settings.model_fields
+        assert defaults["VOICE_CHUNK_CONCURRENCY"].default < defaults["VOICE_MAX_CONCURRENT_TRANSCRIPTIONS"].default
+
+    async def test_chunks_joined_in_order(self, service):
+        audio = pcm(*[part for _ in range(4) for part in (tone(1.2), silence(0.3))])
+        transcript = await service.atranscribe_pcm(audio)
+
+        total = len(service.calls)
+        assert total >= 3
+        assert transcript == " ".join(f"{part}/{total}" for part in range(1, total + 1))
+        assert service.max_in_flight == 2
+
+    async def test_failed_chunk_retried(self, service):
+        service.failures = {0}
+        transcript = await service.atranscribe_pcm(pcm(tone(1.2), silence(0.3), tone(1.2)))
+        assert transcript.startswith("1/2")
+        assert len(service.calls) == 3
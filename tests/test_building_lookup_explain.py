@@ -0,0 +1,88 @@
+"""
+Query-plan test for the trigram building lookup.
+
+Inserts 100k synthetic buildings into a separate city inside a transaction that is
+rolled back, and checks with EXPLAIN that the similarity-ranked lookup is answered
+by the pg_trgm index on buildings.street_name_norm instead of a sequential scan.
+
+REQUIREMENTS:
+1. PostgreSQL is running: docker-compose up -d db
+2. Database is migrated: alembic upgrade head (pg_trgm + normalized columns)
+
+To run tests:
+    uv run pytest tests/test_building_lookup_explain.py -v
+"""
+
+import hashlib
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.services.service_resolver import ServiceRouter
+
+BUILDINGS_COUNT = 100_000
+HOUSES_PER_STREET = 20
+TEST_CITY = "Тестове"
+
+TRIGRAM_INDEX = "ix_buildings_street_name_norm_trgm"
+
+
+def _street_name(street_no: int) -> str:
+    # Same expression as the INSERT below: distinct, trigram-diverse street names
+    return "вулиця " + hashlib.md5(str(street_no).encode()).hexdigest()[:12]
+
+
+@pytest.fixture
+def buildings_100k(test_db: Session):
+    """100k buildings in TEST_CITY, rolled back after the test"""
+    has_column = test_db.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = 'buildings' AND column_name = 'street_name_norm'"
+    )).first()
+    if has_column is None:
+        pytest.skip("buildings.street_name_norm missing, run alembic upgrade head")
+
+    test_db.execute(
+        text("""
+            INSERT INTO buildings (city, district, street_name, house_number)
+            SELECT :city, NULL,
+                   'вулиця ' || substr(md5((i / :per_street)::text), 1, 12),
+                   (i % :per_street + 1)::text
+            FROM generate_series(0, :count - 1) AS i
+        """),
+        {"city": TEST_CITY, "per_street": HOUSES_PER_STREET, "count": BUILDINGS_COUNT},
+    )
+    test_db.execute(text("ANALYZE buildings"))
+    yield test_db
+    test_db.rollback()
+
+
+def _explain(session: Session, street_name: str, house_number: str) -> str:
+    stmt = ServiceRouter.building_trigram_query(street_name, house_number, city=TEST_CITY)
+    compiled = stmt.compile(session.get_bind())
+    rows = session.connection().exec_driver_sql("EXPLAIN " + str(compiled), compiled.params).all()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+def test_trigram_lookup_uses_index(buildings_100k: Session):
+    # One character typo in the street name
+    street = _street_name(1234)
+    plan = _explain(buildings_100k, street[:-1] + "x", "7")
+
+    assert TRIGRAM_INDEX in plan, plan
+    assert "Seq Scan on buildings" not in plan, plan
+    assert "Limit" in plan, plan
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+def test_trigram_lookup_finds_building(buildings_100k: Session):
+    street = _street_name(1234)
+    building = ServiceRouter(buildings_100k)._find_building_trigram("вул. " + street[len("вулиця "):], "7", TEST_CITY)
+
+    assert building is not None
+    assert building.street_name == street
+    assert building.house_number == "7"
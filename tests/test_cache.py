@@ -0,0 +1,191 @@
+"""
+Unit tests for the in-process TTL/LRU cache and the embedding cache.
+
+No database or LLM: the persistent embedding tier is disabled and the
+provider is replaced by a fake that counts calls.
+
+To run tests:
+    uv run pytest tests/test_cache.py -v
+"""
+
+import pytest
+
+from app.llm import client as llm_client
+from app.llm.client import CachedEmbeddings, embedding_cache_key
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache, normalized_text_hash
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+class TestTTLCache:
+    """LRU eviction, TTL expiry and counters"""
+
+    def test_hit_and_miss(self):
+        """Stored values are returned, missing keys give the default"""
+        cache = TTLCache(maxsize=10)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("b", "default") == "default"
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        """A read refreshes the entry, the oldest untouched entry goes first"""
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_entries_expire(self, clock):
+        """An entry is served until its TTL, then dropped"""
+        cache = TTLCache(maxsize=10, ttl_seconds=60)
+        cache.set("a", 1)
+
+        clock.now += 59
+        assert cache.get("a") == 1
+        clock.now += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.evictions == 1
+
+    def test_no_ttl_never_expires(self, clock):
+        """Without a TTL only LRU eviction removes entries"""
+        cache = TTLCache(maxsize=10, ttl_seconds=None)
+        cache.set("a", 1)
+        clock.now += 10 ** 9
+        assert cache.get("a") == 1
+
+    def test_zero_size_stores_nothing(self):
+        """maxsize=0 disables the cache"""
+        cache = TTLCache(maxsize=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+    def test_delete_and_clear(self):
+        """Entries can be dropped one by one or all at once"""
+        cache = TTLCache(maxsize=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_stats(self):
+        """Counters for the health endpoint"""
+        cache = TTLCache(maxsize=5)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+        assert cache.stats() == {"size": 1, "maxsize": 5, "hits": 1, "misses": 1, "evictions": 0, "hit_rate": 0.5}
+
+
+class TestNormalizedTextHash:
+    """Cache key normalization"""
+
+    def test_case_and_whitespace_insensitive(self):
+        """Case and whitespace differences share a key"""
+        assert normalized_text_hash("  Немає   ГАРЯЧОЇ води ") == normalized_text_hash("немає гарячої води")
+
+    def test_unicode_normalized(self):
+        """Composed and decomposed forms of the same letter share a key"""
+        assert normalized_text_hash("\u0457") == normalized_text_hash("\u0456\u0308")
+
+    def test_different_texts_differ(self):
+        """Different texts get different keys"""
+        assert normalized_text_hash("немає води") != normalized_text_hash("немає світла")
+
+
+class FakeEmbeddings:
+    """SimpleEmbeddings stand-in: one vector per text, records every provider call"""
+
+    model = "fake-embedding-model"
+    client = None
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+
+@pytest.fixture
+def embeddings(monkeypatch) -> FakeEmbeddings:
+    """Fresh in-process tier, persistent tier off"""
+    monkeypatch.setattr(llm_client.settings, "EMBEDDING_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(llm_client, "_embedding_memory_cache", TTLCache(maxsize=100))
+    return FakeEmbeddings()
+
+
+class TestCachedEmbeddings:
+    """In-process tier of the embedding cache"""
+
+    def test_repeated_text_is_embedded_once(self, embeddings):
+        """The second request for the same (normalized) text is served from memory"""
+        cached = CachedEmbeddings(embeddings)
+        first = cached.embed_query("Немає води")
+        second = cached.embed_query("  немає   води ")
+
+        assert first == second
+        assert embeddings.calls == [["Немає води"]]
+
+    def test_batch_embeds_only_misses_once_each(self, embeddings):
+        """Cached texts are skipped and duplicates inside the batch share one call"""
+        cached = CachedEmbeddings(embeddings)
+        cached.embed_query("a")
+
+        results = cached.embed_documents(["a", "bb", "bb", "ccc"])
+
+        assert embeddings.calls == [["a"], ["bb", "ccc"]]
+        assert results == [[1.0, 1.0], [2.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+
+    async def test_async_path_shares_the_cache(self, embeddings):
+        """Sync and async calls use the same in-process tier"""
+        cached = CachedEmbeddings(embeddings)
+        cached.embed_query("a")
+        assert await cached.aembed_query("a") == [1.0, 1.0]
+        assert embeddings.calls == [["a"]]
+
+    def test_key_includes_model(self, embeddings):
+        """Another embedding model does not get this model's vectors"""
+        CachedEmbeddings(embeddings).embed_query("a")
+        other = FakeEmbeddings()
+        other.model = "other-model"
+        CachedEmbeddings(other).embed_query("a")
+        assert other.calls == [["a"]]
+
+    def test_returned_vectors_are_copies(self, embeddings):
+        """Mutating a result does not change the cached vector"""
+        cached = CachedEmbeddings(embeddings)
+        cached.embed_query("a")
+        cached.embed_query("a").append(99.0)
+        assert cached.embed_query("a") == [1.0, 1.0]
+
+    def test_cache_key_is_normalized_hash(self):
+        """Embedding keys use the shared text normalization"""
+        assert embedding_cache_key("Текст") == normalized_text_hash("текст")
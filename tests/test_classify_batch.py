@@ -0,0 +1,145 @@
+"""
+Unit tests for batch classification.
+
+No database or LLM: a stub classifier returns fixed results and counts the
+texts it was asked to classify; the batch neighbor query is answered by a fake session.
+
+To run tests:
+    uv run pytest tests/test_classify_batch.py -v
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.problems_schemas import BatchProblemRequest
+from app.services.category_registry import CategoryInfo
+from app.services.classifier import base_classifier, result_cache, retrieval
+from app.services.classifier.base_classifier import BaseClassifier
+
+CATEGORIES = {"water": CategoryInfo(id="water", name="Водопостачання", description="Вода")}
+
+
+class StubClassifier(BaseClassifier):
+    """Classifies every text as water, urgent when it mentions 'терміново'"""
+
+    def __init__(self):
+        super().__init__(session=None)
+        self.classified: list[str] = []
+
+    def classify(self, problem_text):
+        self.classified.append(problem_text)
+        return "water", 0.9, f"stub: {problem_text}", "терміново" in problem_text
+
+    def get_category_info(self, category_id):
+        return CATEGORIES.get(category_id)
+
+
+@pytest.fixture
+def cache_version(monkeypatch):
+    """Result cache on, with a fixed data version and an empty cache"""
+    monkeypatch.setattr(base_classifier.settings, "CLASSIFICATION_CACHE_ENABLED", True)
+    monkeypatch.setattr(base_classifier, "get_data_version", lambda session: "v-test")
+
+    async def aget_data_version(session):
+        return "v-test"
+
+    monkeypatch.setattr(base_classifier, "aget_data_version", aget_data_version)
+    result_cache._result_cache.clear()
+    yield
+    result_cache._result_cache.clear()
+
+
+class TestClassifyWithCategoryBatch:
+    """Formatting, ordering, de-duplication and caching of batch results"""
+
+    def test_results_in_input_order(self, cache_version):
+        """Each text gets its own formatted result, in request order"""
+        classifier = StubClassifier()
+        results = classifier.classify_with_category_batch(["Немає води вдома", "Терміново: прорив труби терміново"])
+
+        assert [result["reasoning"] for result in results] == [
+            "stub: Немає води вдома",
+            "stub: Терміново: прорив труби терміново",
+        ]
+        assert results[0]["category_name"] == "Водопостачання"
+        assert [result["is_urgent"] for result in results] == [False, True]
+
+    def test_duplicates_classified_once(self, cache_version):
+        """Repeated (normalized) texts in one batch share one classification"""
+        classifier = StubClassifier()
+        results = classifier.classify_with_category_batch(["Немає води", "немає  води", "Немає води"])
+
+        assert classifier.classified == ["Немає води"]
+        assert len(results) == 3
+        assert results[0] == results[1] == results[2]
+        assert results[0] is not results[1]
+
+    def test_cached_texts_skipped(self, cache_version):
+        """Only texts missing from the result cache reach the classifier"""
+        classifier = StubClassifier()
+        classifier.classify_with_category("Немає води")
+        classifier.classified.clear()
+
+        classifier.classify_with_category_batch(["Немає води", "Немає світла"])
+        assert classifier.classified == ["Немає світла"]
+
+    def test_cache_disabled_classifies_everything(self, monkeypatch):
+        """Without the result cache every text is classified"""
+        monkeypatch.setattr(base_classifier.settings, "CLASSIFICATION_CACHE_ENABLED", False)
+        classifier = StubClassifier()
+        classifier.classify_with_category_batch(["Немає води", "Немає води"])
+        assert classifier.classified == ["Немає води", "Немає води"]
+
+    async def test_async_batch(self, cache_version):
+        """The async batch uses the same cache and de-duplication"""
+        classifier = StubClassifier()
+        results = await classifier.aclassify_with_category_batch(["Немає води", "немає води", "Немає світла"])
+
+        assert sorted(classifier.classified) == ["Немає води", "Немає світла"]
+        assert [result["reasoning"] for result in results] == ["stub: Немає води"] * 2 + ["stub: Немає світла"]
+
+
+class TestBatchNeighborQuery:
+    """One round trip for several queries"""
+
+    def test_rows_grouped_by_query(self, monkeypatch):
+        """Rows come back ordered by query position and are split per query"""
+        monkeypatch.setattr(retrieval.settings, "VECTOR_INDEX_TYPE", "none")
+        rows = [
+            SimpleNamespace(ord=1, id=10, category_id="water", is_urgent=False, text="a", distance=0.1),
+            SimpleNamespace(ord=1, id=11, category_id="water", is_urgent=False, text="b", distance=0.2),
+            SimpleNamespace(ord=3, id=12, category_id="heat", is_urgent=True, text="c", distance=0.3),
+        ]
+        session = SimpleNamespace(exec=lambda statement: SimpleNamespace(all=lambda: rows))
+
+        grouped = retrieval.find_nearest_examples_batch(session, [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]], k=2)
+
+        assert [list(neighbors.ids) for neighbors in grouped] == [[10, 11], [], [12]]
+
+    def test_empty_batch(self):
+        """No queries, no round trip"""
+        assert retrieval.find_nearest_examples_batch(None, [], k=3) == []
+
+    def test_vector_literal(self):
+        """Query vectors are sent as pgvector text literals"""
+        assert retrieval._vector_literal([1, 0.5]) == "[1.0,0.5]"
+
+
+class TestBatchRequest:
+    """/classify/batch request validation"""
+
+    def test_limits(self):
+        """At least one text, at most CLASSIFY_BATCH_MAX_SIZE"""
+        assert BatchProblemRequest(problem_texts=["Немає води в будинку"]).problem_texts == ["Немає води в будинку"]
+        with pytest.raises(ValidationError):
+            BatchProblemRequest(problem_texts=[])
+        with pytest.raises(ValidationError):
+            BatchProblemRequest(problem_texts=["Немає води в будинку"] * (settings.CLASSIFY_BATCH_MAX_SIZE + 1))
+
+    def test_short_texts_rejected(self):
+        """Every text is validated like a single /classify request"""
+        with pytest.raises(ValidationError):
+            BatchProblemRequest(problem_texts=["Немає води в будинку", "ой"])
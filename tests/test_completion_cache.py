@@ -0,0 +1,108 @@
+"""
+Unit tests for the SimpleLLM completion cache (memory LRU + SQLite store).
+
+No network: SimpleLLM talks to the fake client from tests/fakes.py, the
+SQLite file lives in a pytest temporary directory.
+
+To run tests:
+    uv run pytest tests/test_completion_cache.py -v
+"""
+
+import pytest
+
+from app.llm import client as llm_client
+from app.llm.completion_cache import CompletionCache, SQLiteCompletionStore, completion_cache_key
+from tests.fakes import fake_llm
+
+
+class TestCompletionCacheKey:
+    """Key of one completion request"""
+
+    def test_stable(self):
+        assert completion_cache_key("m", 0.0, "prompt") == completion_cache_key("m", 0.0, "prompt")
+
+    def test_model_temperature_and_prompt_matter(self):
+        keys = {
+            completion_cache_key("m", 0.0, "prompt"),
+            completion_cache_key("other", 0.0, "prompt"),
+            completion_cache_key("m", 0.7, "prompt"),
+            completion_cache_key("m", 0.0, "prompt "),
+        }
+        assert len(keys) == 4
+
+
+class TestCompletionCache:
+    """Memory tier in front of the SQLite store"""
+
+    def test_memory_only(self):
+        cache = CompletionCache(maxsize=10, ttl_seconds=None)
+        cache.set("k", "text")
+        assert cache.get("k") == "text"
+        assert cache.get("missing") is None
+        assert cache.stats()["sqlite"] == {"enabled": False, "hits": 0}
+
+    def test_sqlite_survives_restart(self, tmp_path):
+        """A new process (new cache object) reads completions from the file and promotes them to memory"""
+        path = str(tmp_path / "cache" / "completions.sqlite")
+        CompletionCache(maxsize=10, ttl_seconds=None, sqlite_path=path).set("k", "text")
+
+        restarted = CompletionCache(maxsize=10, ttl_seconds=None, sqlite_path=path)
+        assert restarted.get("k") == "text"
+        assert restarted.store_hits == 1
+        assert restarted.memory.get("k") == "text"
+
+    def test_sqlite_ttl(self, tmp_path, monkeypatch):
+        """Expired rows are deleted on read"""
+        store = SQLiteCompletionStore(str(tmp_path / "completions.sqlite"), ttl_seconds=60)
+        store.set("k", "text")
+
+        monkeypatch.setattr("app.llm.completion_cache.time.time", lambda: 10**10)
+        assert store.get("k") is None
+
+    def test_clear(self, tmp_path):
+        cache = CompletionCache(maxsize=10, ttl_seconds=None, sqlite_path=str(tmp_path / "completions.sqlite"))
+        cache.set("k", "text")
+        cache.clear()
+        assert cache.get("k") is None
+
+
+class TestSimpleLLMCaching:
+    """SimpleLLM served from the completion cache"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch) -> CompletionCache:
+        cache = CompletionCache(maxsize=10, ttl_seconds=None)
+        monkeypatch.setattr(llm_client, "get_completion_cache", lambda: cache)
+        return cache
+
+    async def test_repeated_prompt_served_from_cache(self, cache):
+        llm = fake_llm("відповідь")
+        assert (await llm.ainvoke("питання")).content == "відповідь"
+        assert llm.invoke("питання").content == "відповідь"
+        assert len(llm.async_client.calls) == 1
+
+    async def test_temperature_is_part_of_key(self, cache):
+        llm = fake_llm("текст")
+        await llm.generate_text("prompt", temperature=0.7)
+        await llm.generate_text("prompt", temperature=0.2)
+        assert len(llm.async_client.calls) == 2
+
+    async def test_use_cache_false_bypasses(self, cache):
+        llm = fake_llm("текст")
+        await llm.generate_text("prompt")
+        await llm.generate_text("prompt", use_cache=False)
+        assert len(llm.async_client.calls) == 2
+
+    async def test_empty_completion_not_cached(self, cache):
+        """Provider errors returned as empty content are retried on the next call"""
+        llm = fake_llm("")
+        await llm.ainvoke("питання")
+        await llm.ainvoke("питання")
+        assert len(llm.async_client.calls) == 2
+
+    def test_disabled_cache(self, monkeypatch):
+        monkeypatch.setattr(llm_client, "get_completion_cache", lambda: None)
+        llm = fake_llm("відповідь")
+        llm.invoke("питання")
+        llm.invoke("питання")
+        assert len(llm.async_client.calls) == 2
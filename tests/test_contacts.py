@@ -0,0 +1,52 @@
+"""
+Unit tests for local contact extraction from dictated text.
+
+To run tests:
+    uv run pytest tests/test_contacts.py -v
+"""
+
+import pytest
+
+from app.services.contacts import Contacts, extract_address, extract_contacts, extract_name, extract_phone
+
+
+class TestExtractContacts:
+    """Name, phone and address in one transcript"""
+
+    def test_full_transcript(self):
+        contacts = extract_contacts(
+            "Мене звати Іван Петренко, живу на вулиці Городоцькій 15, кв 3. "
+            "Мій телефон 067 123 45 67. Третій день немає води."
+        )
+        assert contacts == Contacts(name="Іван Петренко", phone="+380671234567", address="вулиці Городоцькій 15, кв 3")
+
+    def test_problem_only(self):
+        """Nothing found is None, not an empty string"""
+        assert extract_contacts("Третій день немає гарячої води") == Contacts()
+        assert extract_contacts("") == Contacts()
+
+
+class TestExtractParts:
+    """Single fields"""
+
+    @pytest.mark.parametrize(
+        "text, phone",
+        [
+            ("тел +38 (050) 111-22-33", "+380501112233"),
+            ("номер 0671234567", "+380671234567"),
+            ("380671234567", "+380671234567"),
+            ("будинок 15, квартира 3", None),
+        ],
+    )
+    def test_phone(self, text, phone):
+        assert extract_phone(text) == phone
+
+    def test_name_needs_capitalized_words(self):
+        assert extract_name("я Олена Коваль, пишу щодо ліфта") == "Олена Коваль"
+        assert extract_name("я дуже прошу допомогти") is None
+
+    def test_address_after_marker_stops_at_sentence_end(self):
+        assert extract_address("Проблема за адресою вул. Зелена 7а. Тече дах.") == "вул. Зелена 7а"
+
+    def test_street_without_house_is_not_an_address(self):
+        assert extract_address("На вулиці Городоцькій не світять ліхтарі") is None
@@ -0,0 +1,244 @@
+"""
+Unit tests for the in-memory street gazetteer and the building lookup modes.
+
+No database: the gazetteer is built from in-memory buildings, the trigram
+lookup is checked on the compiled SQL.
+
+To run tests:
+    uv run pytest tests/test_gazetteer.py -v
+"""
+
+import re
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db_models.services import HOUSE_NUMBER_NORM_SQL, STREET_NAME_NORM_SQL
+from app.services import service_resolver, table_version
+from app.services.address import gazetteer as gazetteer_module
+from app.services.address.gazetteer import (
+    GazetteerBuilding,
+    StreetGazetteer,
+    normalize_house_number,
+    street_key,
+)
+from app.services.service_resolver import ServiceRouter
+from app.services.table_version import TableVersion
+
+BUILDINGS = [
+    GazetteerBuilding(1, "Львів", "Залізничний", "вулиця Городоцька", "15"),
+    GazetteerBuilding(2, "Львів", "Залізничний", "вулиця Городоцька", "17а"),
+    GazetteerBuilding(3, "Львів", "Личаківський", "вулиця Личаківська", "8"),
+    GazetteerBuilding(4, "Львів", "Шевченківський", "проспект Тараса Шевченка", "10"),
+    GazetteerBuilding(5, "Київ", "Печерський", "вулиця Городоцька", "15"),
+]
+
+
+@pytest.fixture
+def gazetteer() -> StreetGazetteer:
+    return StreetGazetteer(BUILDINGS)
+
+
+class TestNormalization:
+    """Street keys and house numbers"""
+
+    def test_street_type_and_place_words_dropped(self):
+        assert street_key("м. Львів, вул. Городоцька") == street_key("Городоцька вулиця")
+
+    def test_russian_spelling_folded(self):
+        assert street_key("ул. Зелёная") == street_key("вулиця Зелена")
+
+    @pytest.mark.parametrize("raw", ["10 Б", "10-б", "10б", "10B"])
+    def test_house_number(self, raw):
+        """Spaces, dashes, case and Latin look-alike letters are normalized"""
+        assert normalize_house_number(raw) == "10б"
+
+    def test_empty_house_number(self):
+        assert normalize_house_number(None) == ""
+
+
+# Street names as users and seed data write them, normalized by both street_key() and STREET_NAME_NORM_SQL
+STREET_NAMES = [
+    "вулиця Городоцька",
+    "вул.Городоцька",
+    "м. Львів, вул. Городоцька",
+    "Львівська обл., м. Львів, просп. Тараса Шевченка",
+    "г. Львов, ул. Зелёная",
+    "улица Лычаковская",
+    "площадь Рынок",
+    "пл. Ринок",
+    "б-р Лесі Українки",
+    "- Личаківська -",
+    "пр-т Червоної Калини",
+    "Кос'ти Левицького",
+    "вул. ' Городоцька",
+    "Коперника (центр)",
+    "«Героїв УПА»",
+    "узвіз Крутий",
+    "Городоцька",
+    "місто Львів",
+]
+
+_SQL_TOKEN_RE = re.compile(r"\s*(?:'((?:[^']|'')*)'|(\w+)|([(),]))")
+
+_SQL_FUNCTIONS = {
+    "lower": str.lower,
+    "btrim": lambda value: value.strip(" "),
+    # Characters of `source` without a counterpart in `target` are deleted, like Postgres translate()
+    "translate": lambda value, source, target: value.translate(
+        str.maketrans(source[:len(target)], target, source[len(target):])
+    ),
+    "regexp_replace": lambda value, pattern, replacement, flags: re.sub(pattern, replacement, value),
+}
+
+
+def evaluate_sql(expression: str, **columns) -> str:
+    """Evaluate a generated-column expression made of the functions above on one row"""
+    tokens = list(_SQL_TOKEN_RE.finditer(expression))
+    assert "".join(token.group() for token in tokens) == expression.rstrip()
+    position = 0
+
+    def node():
+        nonlocal position
+        literal, name, _ = tokens[position].groups()
+        position += 1
+        if literal is not None:
+            return literal.replace("''", "'")
+        if name in columns:
+            return columns[name]
+        assert tokens[position].group(3) == "("
+        position += 1
+        args = []
+        while True:
+            args.append(node())
+            separator = tokens[position].group(3)
+            position += 1
+            if separator == ")":
+                return _SQL_FUNCTIONS[name](*args)
+
+    return node()
+
+
+class TestStreetNameNormParity:
+    """buildings.street_name_norm / house_number_norm (Postgres) and the gazetteer keys (Python) agree"""
+
+    @pytest.mark.parametrize("street_name", STREET_NAMES)
+    def test_street_name(self, street_name):
+        assert evaluate_sql(STREET_NAME_NORM_SQL, street_name=street_name) == street_key(street_name)
+
+    @pytest.mark.parametrize("house_number", ["10", "10 Б", "10-б", "10b", " 17А "])
+    def test_house_number(self, house_number):
+        assert evaluate_sql(HOUSE_NUMBER_NORM_SQL, house_number=house_number) == normalize_house_number(house_number)
+
+    def test_place_words_dropped(self):
+        assert street_key("м. Львів, вул. Городоцька") == street_key("Городоцька") == "городоцка"
+
+
+class TestStreetGazetteer:
+    """Street and house matching"""
+
+    def test_exact_house(self, gazetteer):
+        match = gazetteer.match("вул. Городоцька", "15")
+        assert (match.building.building_id, match.house_match, match.score) == (1, "exact", 1.0)
+
+    def test_same_number_other_letter(self, gazetteer):
+        match = gazetteer.match("Городоцька", "17")
+        assert (match.building.building_id, match.house_match) == (2, "number")
+
+    def test_nearest_house(self, gazetteer):
+        """An unknown number matches the closest house, with a lower score"""
+        match = gazetteer.match("Городоцька", "21")
+        assert (match.building.building_id, match.house_match) == (2, "nearest")
+        assert match.score < match.street_score
+
+    def test_misspelled_street(self, gazetteer):
+        match = gazetteer.match("Гародоцька", "15")
+        assert match.building.building_id == 1
+        assert 0.8 < match.street_score < 1.0
+
+    def test_russian_name_matches_fuzzily(self, gazetteer):
+        assert gazetteer.match("ул. Лычаковская", "8").building.building_id == 3
+
+    def test_partial_name(self, gazetteer):
+        """"Шевченка" finds "Тараса Шевченка" """
+        assert gazetteer.match("Шевченка", "10").building.building_id == 4
+
+    def test_city_scoped(self, gazetteer):
+        assert gazetteer.match("Городоцька", "15", city="Київ").building.building_id == 5
+        assert gazetteer.match("Городоцька", "15", city="Одеса") is None
+
+    def test_min_score(self, gazetteer):
+        assert gazetteer.match("Зелена", "1", min_score=0.6) is None
+
+
+class TestGazetteerRefresh:
+    """Process-wide gazetteer rebuilt when buildings change"""
+
+    @pytest.fixture
+    def buildings(self, monkeypatch) -> list:
+        buildings = []
+        monkeypatch.setattr(StreetGazetteer, "load", classmethod(lambda cls, session: cls(list(buildings))))
+        monkeypatch.setattr(gazetteer_module, "_gazetteer", None)
+        monkeypatch.setattr(gazetteer_module, "_buildings_version", TableVersion({"buildings": "building_id"}))
+        monkeypatch.setattr(table_version.settings, "ROUTING_DATA_VERSION_CHECK_SECONDS", 0)
+        return buildings
+
+    def test_empty_build_not_kept_after_seeding(self, buildings):
+        """A gazetteer built before the buildings were loaded is replaced on the next lookup"""
+        session = SimpleNamespace(version="v1")
+        session.execute = lambda statement: SimpleNamespace(scalar_one=lambda: session.version)
+        assert gazetteer_module.get_gazetteer(session).match("Городоцька", "15") is None
+
+        buildings.extend(BUILDINGS)
+        session.version = "v2"
+        assert gazetteer_module.get_gazetteer(session).match("Городоцька", "15").building.building_id == 1
+
+    def test_unchanged_buildings_reuse_gazetteer(self, buildings):
+        session = SimpleNamespace(execute=lambda statement: SimpleNamespace(scalar_one=lambda: "v1"))
+        first = gazetteer_module.get_gazetteer(session)
+        assert gazetteer_module.get_gazetteer(session) is first
+
+
+class TestGazetteerLookup:
+    """ServiceRouter building lookup in gazetteer mode"""
+
+    @pytest.fixture
+    def router(self, monkeypatch, gazetteer) -> ServiceRouter:
+        monkeypatch.setattr(service_resolver.settings, "BUILDING_LOOKUP_MODE", "gazetteer")
+        monkeypatch.setattr(service_resolver, "get_gazetteer", lambda session=None: gazetteer)
+        return ServiceRouter(session=None)
+
+    def test_house_match_returns_building(self, router):
+        assert router._find_building("Городоцька", "15").building_id == 1
+        assert router._find_building("Городоцька", "17").building_id == 2
+
+    def test_house_number_mismatch_returns_no_building(self, router):
+        """The nearest house belongs to another building, its ОСББ/ЛКП must not be routed to"""
+        assert router._find_building("Городоцька", "21") is None
+        assert router._find_building("Городоцька", "") is None
+
+
+class TestTrigramLookup:
+    """ServiceRouter building query in trigram mode"""
+
+    @staticmethod
+    def compiled(statement):
+        return statement.compile(dialect=postgresql.dialect())
+
+    def test_house_number_filtered_in_sql(self):
+        """Only the requested house or the same number with another letter can be returned"""
+        compiled = self.compiled(ServiceRouter.building_trigram_query("вул. Городоцька", "17 А"))
+        where = str(compiled).split("WHERE", 1)[1].split("ORDER BY", 1)[0]
+
+        assert "buildings.house_number_norm = " in where
+        assert "SUBSTRING(buildings.house_number_norm" in where
+        assert {street_key("Городоцька"), "17а", "17"} <= set(compiled.params.values())
+
+    def test_house_without_number_needs_exact_match(self):
+        where = str(self.compiled(ServiceRouter.building_trigram_query("Городоцька", "б"))).split("WHERE", 1)[1]
+        assert "SUBSTRING" not in where.split("ORDER BY", 1)[0]
+
+    def test_empty_street_or_house(self):
+        assert ServiceRouter.building_trigram_query("вулиця", "15") is None
+        assert ServiceRouter.building_trigram_query("Городоцька", "") is None
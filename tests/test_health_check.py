@@ -0,0 +1,209 @@
+"""
+Unit tests for the background health prober and the readiness endpoint.
+
+No database or providers: checks are stubs, the CodeMie client is the fake
+from tests/fakes.py.
+
+To run tests:
+    uv run pytest tests/test_health_check.py -v
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api.routes import health as health_route
+from app.services import health_check
+from app.services.health_check import HealthCheckService, HealthProber
+from tests.fakes import fake_llm
+
+HEALTHY_CODEMIE = {"status": "healthy", "models": {}}
+
+
+class StubService(HealthCheckService):
+    """Answers the checks with prepared statuses, counting calls"""
+
+    def __init__(self, database=None, codemie=None, delay: float = 0.0, error: Exception | None = None):
+        self.database = database or {"status": "healthy"}
+        self.codemie = codemie or HEALTHY_CODEMIE
+        self.delay = delay
+        self.error = error
+        self.probes = 0
+
+    def check_database(self) -> dict:
+        return self.database
+
+    async def check_codemie_api(self, mode: str = "models") -> dict:
+        self.probes += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.codemie
+
+
+@pytest.fixture
+def probe_settings(monkeypatch):
+    monkeypatch.setattr(health_check.settings, "HEALTH_PROBE_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(health_check.settings, "HEALTH_PROBE_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(health_check.settings, "HEALTH_PROBE_STALE_INTERVALS", 3)
+
+
+class TestHealthProber:
+    """Concurrent checks, cached state and staleness"""
+
+    async def test_probe_caches_state(self, probe_settings):
+        prober = HealthProber(StubService())
+        assert prober.state is None and prober.is_stale()
+
+        state = await prober.probe()
+
+        assert prober.state is state
+        assert state["status"] == "healthy"
+        assert state["services"] == {"database": {"status": "healthy"}, "codemie_api": HEALTHY_CODEMIE}
+        assert not prober.is_stale()
+
+    async def test_database_down_is_unhealthy(self, probe_settings):
+        prober = HealthProber(StubService(database={"status": "unhealthy", "error": "refused"}))
+        assert (await prober.probe())["status"] == "unhealthy"
+
+    async def test_degraded_codemie(self, probe_settings):
+        prober = HealthProber(StubService(codemie={"status": "degraded", "models": {}}))
+        assert (await prober.probe())["status"] == "degraded"
+
+    async def test_slow_check_times_out(self, probe_settings, monkeypatch):
+        """A hanging check becomes unhealthy after HEALTH_PROBE_TIMEOUT_SECONDS instead of blocking the probe"""
+        monkeypatch.setattr(health_check.settings, "HEALTH_PROBE_TIMEOUT_SECONDS", 0.05)
+        prober = HealthProber(StubService(delay=10))
+
+        state = await asyncio.wait_for(prober.probe(), timeout=1)
+
+        assert state["services"]["codemie_api"]["status"] == "unhealthy"
+        assert "Timed out" in state["services"]["codemie_api"]["error"]
+        assert state["status"] == "unhealthy"
+
+    async def test_old_state_is_stale(self, probe_settings):
+        """A state older than HEALTH_PROBE_STALE_INTERVALS intervals is stale"""
+        prober = HealthProber(StubService())
+        await prober.probe()
+        prober.state["checked_monotonic"] = time.monotonic() - 1
+
+        assert prober.age_seconds() >= 1
+        assert prober.is_stale()
+
+    async def test_run_keeps_probing_after_failure(self, probe_settings):
+        """A failing probe is logged and the loop goes on, start is idempotent"""
+        service = StubService(error=RuntimeError("provider error"))
+        prober = HealthProber(service)
+        prober.start()
+        task = prober._task
+        prober.start()
+        assert prober._task is task
+
+        await asyncio.sleep(0.05)
+        assert service.probes > 1
+        assert prober.state is None
+
+        await prober.stop()
+        assert task.cancelled()
+
+
+class TestCodeMieModelsCheck:
+    """models.list probe"""
+
+    @pytest.fixture
+    def clients(self, monkeypatch):
+        def use(models_listed=(), error=None):
+            llm = fake_llm(models_listed=models_listed, error=error)
+            monkeypatch.setattr(health_check, "get_llm", lambda: llm)
+            monkeypatch.setattr(health_check, "get_embeddings", lambda cached: SimpleNamespace(model="fake-embeddings"))
+            monkeypatch.setattr(
+                health_check,
+                "get_gemini_client",
+                lambda: SimpleNamespace(client=object(), model=SimpleNamespace(model_name="gemini")),
+            )
+            return llm
+
+        return use
+
+    async def test_listed_models_are_healthy(self, clients):
+        llm = clients(models_listed=["fake-llm", "fake-embeddings"])
+        result = await HealthCheckService.check_codemie_api("models")
+
+        assert result["status"] == "healthy"
+        assert {name: model["status"] for name, model in result["models"].items()} == {
+            "llm": "healthy", "embeddings": "healthy", "transcription": "healthy",
+        }
+        assert llm.async_client.calls == [{"models": "list"}]
+
+    async def test_missing_model_is_degraded(self, clients):
+        clients(models_listed=["fake-llm"])
+        result = await HealthCheckService.check_codemie_api("models")
+
+        assert result["status"] == "degraded"
+        assert result["models"]["embeddings"]["error"] == "Model not listed"
+
+    async def test_empty_list_means_reachable(self, clients):
+        """Gateways returning no models are judged by reachability only"""
+        clients(models_listed=[])
+        assert (await HealthCheckService.check_codemie_api("models"))["status"] == "healthy"
+
+    async def test_unreachable_endpoint(self, clients):
+        """Both CodeMie models fail together, the transcription client keeps the status degraded"""
+        clients(error=RuntimeError("connection refused"))
+        result = await HealthCheckService.check_codemie_api("models")
+
+        assert result["models"]["llm"]["status"] == result["models"]["embeddings"]["status"] == "unhealthy"
+        assert result["status"] == "degraded"
+
+
+class TestReadiness:
+    """/health/ready served from the prober state"""
+
+    @pytest.fixture
+    def prober(self, monkeypatch, probe_settings) -> HealthProber:
+        prober = HealthProber(StubService())
+        monkeypatch.setattr(health_route, "get_health_prober", lambda: prober)
+        return prober
+
+    @pytest.fixture
+    async def client(self):
+        app = FastAPI()
+        app.include_router(health_route.router)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+    async def test_not_ready_before_first_probe(self, prober, client):
+        response = await client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "not_ready", "stale": True}
+
+    async def test_ready_after_healthy_probe(self, prober, client):
+        await prober.probe()
+        response = await client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "healthy", "stale": False}
+
+    async def test_degraded_is_ready(self, prober, client):
+        """CodeMie partly down still serves traffic"""
+        prober.service.codemie = {"status": "degraded", "models": {}}
+        await prober.probe()
+        assert (await client.get("/health/ready")).status_code == 200
+
+    async def test_unhealthy_is_not_ready(self, prober, client):
+        prober.service.database = {"status": "unhealthy", "error": "refused"}
+        await prober.probe()
+        response = await client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "unhealthy"
+
+    async def test_stale_state_is_not_ready(self, prober, client):
+        """A stuck prober fails readiness even with a healthy last result"""
+        await prober.probe()
+        prober.state["checked_monotonic"] = time.monotonic() - 1
+        response = await client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "healthy", "stale": True}
@@ -0,0 +1,159 @@
+"""
+Unit tests for the hybrid classifier (k-NN vote with LLM fallback).
+
+No database or LLM: both strategies are replaced by in-memory stubs.
+
+To run tests:
+    uv run pytest tests/test_hybrid_classifier.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import Settings
+from app.services.classifier import hybrid_classifier
+from app.services.classifier.hybrid_classifier import HybridClassifier
+
+
+class StubKNN:
+    """Returns one retrieval context per text and votes with a fixed confidence"""
+
+    def __init__(self, confidence: float):
+        self.confidence = confidence
+        self.retrievals = []
+
+    def retrieve(self, problem_text, k):
+        self.retrievals.append((problem_text, k))
+        return {"text": problem_text, "k": k}
+
+    def retrieve_batch(self, problem_texts, k):
+        return [self.retrieve(problem_text, k) for problem_text in problem_texts]
+
+    async def aretrieve(self, problem_text, k):
+        return self.retrieve(problem_text, k)
+
+    async def aretrieve_batch(self, problem_texts, k):
+        return self.retrieve_batch(problem_texts, k)
+
+    def classify_context(self, context):
+        return "water", self.confidence, "knn", False
+
+
+class StubLLM:
+    """Records the context of every call; async calls answer after `delays` (one per call)"""
+
+    def __init__(self, delays=(0.0,), errors=()):
+        self.delays = list(delays)
+        self.errors = list(errors)
+        self.contexts = []
+        self.cancelled = 0
+
+    def classify(self, problem_text, context=None):
+        self.contexts.append(context)
+        return "heating", 0.7, "llm", True
+
+    async def aclassify(self, problem_text, context=None):
+        call = len(self.contexts)
+        self.contexts.append(context)
+        try:
+            await asyncio.sleep(self.delays[min(call, len(self.delays) - 1)])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if call < len(self.errors) and self.errors[call] is not None:
+            raise self.errors[call]
+        return "heating", 0.7, f"llm call {call}", True
+
+
+def make_classifier(knn_confidence: float, llm: StubLLM | None = None) -> HybridClassifier:
+    classifier = HybridClassifier.__new__(HybridClassifier)
+    classifier.session = None
+    classifier.threshold = 0.5
+    classifier.retrieval_k = 5
+    classifier.knn_strategy = StubKNN(knn_confidence)
+    classifier.llm_strategy = llm or StubLLM()
+    return classifier
+
+
+class TestSharedRetrieval:
+    """One retrieval per text, reused by the LLM fallback"""
+
+    def test_confident_knn_skips_llm(self):
+        classifier = make_classifier(0.9)
+        category, _, reasoning, _ = classifier.classify("Немає води")
+
+        assert category == "water"
+        assert reasoning.startswith("[Hybrid-Fast]")
+        assert classifier.llm_strategy.contexts == []
+
+    def test_fallback_reuses_context(self):
+        """The LLM gets the neighbors retrieved for the vote, nothing is retrieved twice"""
+        classifier = make_classifier(0.2)
+        category, _, reasoning, _ = classifier.classify("Немає води")
+
+        assert category == "heating"
+        assert reasoning.startswith("[Hybrid-Deep]")
+        assert classifier.llm_strategy.contexts == [{"text": "Немає води", "k": 5}]
+        assert classifier.knn_strategy.retrievals == [("Немає води", 5)]
+
+    async def test_async_batch_reuses_contexts(self):
+        classifier = make_classifier(0.2)
+        results = await classifier.aclassify_batch(["перший", "другий"])
+
+        assert [result[0] for result in results] == ["heating", "heating"]
+        assert classifier.llm_strategy.contexts == [{"text": "перший", "k": 5}, {"text": "другий", "k": 5}]
+
+
+class TestHedgedFallback:
+    """Second LLM call when the first one is slow (async path)"""
+
+    @pytest.fixture(autouse=True)
+    def hedging(self, monkeypatch):
+        monkeypatch.setattr(hybrid_classifier.settings, "HYBRID_HEDGE_ENABLED", True)
+        monkeypatch.setattr(hybrid_classifier.settings, "HYBRID_HEDGE_DELAY_SECONDS", 0.05)
+        monkeypatch.setattr(hybrid_classifier, "_hedge_stats", hybrid_classifier._HedgeStats())
+
+    def test_off_by_default(self):
+        """Hedging may double LLM cost, it has to be enabled explicitly"""
+        assert Settings.model_fields["HYBRID_HEDGE_ENABLED"].default is False
+
+    async def test_disabled_makes_one_call(self, monkeypatch):
+        monkeypatch.setattr(hybrid_classifier.settings, "HYBRID_HEDGE_ENABLED", False)
+        llm = StubLLM(delays=[0.1])
+        await make_classifier(0.2, llm).aclassify("Немає води")
+        assert len(llm.contexts) == 1
+
+    async def test_fast_answer_is_not_hedged(self):
+        llm = StubLLM(delays=[0.0])
+        await make_classifier(0.2, llm).aclassify("Немає води")
+
+        assert len(llm.contexts) == 1
+        assert hybrid_classifier.get_hedging_stats()["hedged"] == 0
+
+    async def test_slow_call_is_hedged_and_loser_cancelled(self):
+        """The second call answers first, the first one is cancelled and counted as wasted"""
+        llm = StubLLM(delays=[10.0, 0.0])
+        _, _, reasoning, _ = await make_classifier(0.2, llm).aclassify("Немає води")
+
+        assert "llm call 1" in reasoning
+        await asyncio.sleep(0)  # let the cancelled call unwind
+        assert llm.cancelled == 1
+        stats = hybrid_classifier.get_hedging_stats()
+        assert (stats["fallbacks"], stats["hedged"], stats["hedge_wins"], stats["wasted"]) == (1, 1, 1, 1)
+
+    async def test_failed_call_falls_back_to_other(self):
+        llm = StubLLM(delays=[0.1, 0.2], errors=[RuntimeError("timeout"), None])
+        _, _, reasoning, _ = await make_classifier(0.2, llm).aclassify("Немає води")
+        assert "llm call 1" in reasoning
+
+    async def test_both_failures_raise(self):
+        llm = StubLLM(delays=[0.1, 0.2], errors=[RuntimeError("first"), RuntimeError("second")])
+        with pytest.raises(RuntimeError, match="second"):
+            await make_classifier(0.2, llm).aclassify("Немає води")
+
+    async def test_confident_knn_makes_no_call(self):
+        llm = StubLLM()
+        await make_classifier(0.9, llm).aclassify("Немає води")
+        assert llm.contexts == []
+        assert hybrid_classifier.get_hedging_stats()["fallbacks"] == 0
@@ -0,0 +1,170 @@
+"""
+Unit tests for the in-process k-NN index and the KNN classifier vote.
+
+No database or LLM: the index is built from in-memory arrays and the
+classifier votes over neighbors searched in it.
+
+To run tests:
+    uv run pytest tests/test_knn_index.py -v
+"""
+
+import numpy as np
+import pytest
+
+from app.services.classifier import knn_index, result_cache
+from app.services.classifier.knn_classifier import KNNClassifier
+from app.services.classifier.knn_index import KNNIndex
+from app.services.classifier.retrieval import MAX_COSINE_DISTANCE
+
+
+def make_index(vectors, categories=None, urgent=None) -> KNNIndex:
+    count = len(vectors)
+    return KNNIndex(
+        ids=np.arange(1, count + 1, dtype=np.int64),
+        category_ids=np.array(categories or ["water"] * count, dtype=object),
+        is_urgent=np.array(urgent or [False] * count, dtype=bool),
+        texts=np.array([f"example {i}" for i in range(count)], dtype=object),
+        matrix=np.array(vectors, dtype=np.float32),
+    )
+
+
+class TestKNNIndexSearch:
+    """Cosine search over the normalized matrix"""
+
+    def test_neighbors_sorted_by_cosine_distance(self):
+        """Direction matters, length does not"""
+        index = make_index([[1, 0], [0, 1], [10, 1], [-1, 0]], ["a", "b", "c", "d"])
+        neighbors = index.search([2, 0], k=3)
+
+        assert list(neighbors.category_ids) == ["a", "c", "b"]
+        assert neighbors.distances[0] == pytest.approx(0.0, abs=1e-6)
+        assert np.all(np.diff(neighbors.distances) >= 0)
+
+    def test_k_larger_than_index(self):
+        """All examples are returned when K exceeds the index size"""
+        index = make_index([[1, 0], [0, 1]])
+        assert len(index.search([1, 1], k=10)) == 2
+
+    def test_empty_index(self):
+        """An index without examples returns no neighbors"""
+        index = make_index(np.zeros((0, 0)))
+        assert len(index) == 0
+        assert len(index.search([1, 0], k=3)) == 0
+
+    def test_zero_vectors_are_farthest(self):
+        """Zero stored vectors and zero queries get the maximum distance"""
+        index = make_index([[0, 0], [1, 0]], ["zero", "x"])
+        neighbors = index.search([0, 1], k=2)
+        assert list(neighbors.category_ids) == ["x", "zero"]
+        assert neighbors.distances[1] == MAX_COSINE_DISTANCE
+
+        assert np.all(index.search([0, 0], k=2).distances == MAX_COSINE_DISTANCE)
+
+    def test_batch_matches_single_search(self):
+        """search_batch returns the same neighbors as one search per query"""
+        rng = np.random.default_rng(7)
+        index = make_index(rng.normal(size=(50, 8)).tolist(), [f"c{i % 5}" for i in range(50)])
+        queries = rng.normal(size=(4, 8))
+
+        for query, batch_neighbors in zip(queries, index.search_batch(queries, k=5)):
+            single = index.search(query, k=5)
+            assert list(batch_neighbors.ids) == list(single.ids)
+            np.testing.assert_allclose(batch_neighbors.distances, single.distances, atol=1e-6)
+
+    def test_batch_of_nothing(self):
+        """An empty batch returns an empty list"""
+        assert make_index([[1, 0]]).search_batch(np.zeros((0, 2)), k=3) == []
+
+
+class TestKNNIndexLifecycle:
+    """Process-wide index: lazy build, invalidation and rebuild"""
+
+    @pytest.fixture(autouse=True)
+    def fake_build(self, monkeypatch):
+        builds = []
+
+        def build(session):
+            builds.append(session)
+            return make_index([[1.0, 0.0]] * len(builds))
+
+        monkeypatch.setattr(KNNIndex, "build", staticmethod(build))
+        monkeypatch.setattr(knn_index, "_index", None)
+        return builds
+
+    def test_built_once(self, fake_build):
+        """The index is built on first use and then reused"""
+        first = knn_index.get_knn_index("session")
+        assert knn_index.get_knn_index("session") is first
+        assert len(fake_build) == 1
+
+    def test_invalidate_rebuilds_on_next_use(self, fake_build):
+        """After invalidation the next request sees the new examples"""
+        knn_index.get_knn_index("session")
+        knn_index.invalidate_knn_index()
+
+        assert len(knn_index.get_knn_index("session")) == 2
+        assert len(fake_build) == 2
+
+    def test_rebuild_swaps_index(self, fake_build):
+        """rebuild_knn_index replaces the index in place"""
+        old = knn_index.get_knn_index("session")
+        new = knn_index.rebuild_knn_index("session")
+        assert new is not old
+        assert knn_index.get_knn_index("session") is new
+
+    def test_data_change_reaches_classifier(self, fake_build, monkeypatch):
+        """A new examples/categories version stamp makes the classifier use a rebuilt index"""
+        class VersionSession:
+            version = "v1"
+
+            def execute(self, statement):
+                return type("Result", (), {"scalar_one": lambda _: self.version})()
+
+        monkeypatch.setattr(result_cache, "_data_version", None)
+        monkeypatch.setattr(result_cache, "invalidate_category_registry", lambda: None)
+        monkeypatch.setattr(result_cache.settings, "CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS", 0)
+        classifier = KNNClassifier.__new__(KNNClassifier)
+        classifier.session = VersionSession()
+
+        first = classifier._knn_index()
+        assert classifier._knn_index() is first
+
+        classifier.session.version = "v2"
+        assert classifier._knn_index() is not first
+        assert len(fake_build) == 2
+
+
+class TestKNNVote:
+    """Category and urgency vote over the retrieved neighbors"""
+
+    @pytest.fixture
+    def classifier(self, monkeypatch) -> KNNClassifier:
+        classifier = KNNClassifier.__new__(KNNClassifier)
+        classifier.session = None
+        monkeypatch.setattr(classifier, "get_category_info", lambda category_id: None)
+        return classifier
+
+    def test_majority_wins(self, classifier):
+        """The most frequent category wins, urgency follows the majority"""
+        index = make_index(
+            [[1, 0], [0.9, 0.1], [0.8, 0.2], [0, 1]],
+            ["water", "water", "heating", "heating"],
+            [True, True, False, False],
+        )
+        category, confidence, reasoning, is_urgent = classifier._classify_neighbors(index.search([1, 0], k=3))
+
+        assert category == "water"
+        assert 0.0 < confidence <= 1.0
+        assert is_urgent is True
+        assert "2/3 votes" in reasoning
+
+    def test_tie_goes_to_closest(self, classifier):
+        """On a tie, the label of the closest neighbor wins"""
+        index = make_index([[0.9, 0.1], [1, 0]], ["heating", "water"])
+        category, *_ = classifier._classify_neighbors(index.search([1, 0], k=2))
+        assert category == "water"
+
+    def test_no_neighbors(self, classifier):
+        """Without examples the result is 'other'"""
+        category, confidence, _, is_urgent = classifier._classify_neighbors(make_index(np.zeros((0, 0))).search([1, 0], 3))
+        assert (category, confidence, is_urgent) == ("other", 0.0, False)
@@ -0,0 +1,187 @@
+"""
+Unit tests for the few-shot LLM classifier and the category registry it reads.
+
+No database or LLM: categories come from an in-memory registry snapshot,
+neighbors from a retrieval context, completions from tests/fakes.py.
+
+To run tests:
+    uv run pytest tests/test_llm_classifier.py -v
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+import numpy as np
+import pytest
+
+from app.services import category_registry
+from app.services.category_registry import CategoryInfo, CategorySnapshot
+from app.llm import client as llm_client
+from app.services.classifier import llm_classifier
+from app.services.classifier.llm_classifier import FEW_SHOT_K, LLMClassifier
+from app.services.classifier.retrieval import Neighbors, RetrievalContext
+from tests.fakes import fake_llm
+
+CATEGORIES = {
+    "water": CategoryInfo(id="water", name="Водопостачання", description="Проблеми з водою"),
+    "other": CategoryInfo(id="other", name="Інше", description="Інші проблеми"),
+}
+
+
+def make_context(texts=("Немає води", "Тече кран"), categories=("water", "water")) -> RetrievalContext:
+    count = len(texts)
+    neighbors = Neighbors(
+        ids=np.arange(1, count + 1, dtype=np.int64),
+        category_ids=np.array(categories, dtype=object),
+        is_urgent=np.zeros(count, dtype=bool),
+        texts=np.array(texts, dtype=object),
+        distances=np.linspace(0.1, 0.2, count),
+    )
+    # Retrieved with the few-shot K: a table smaller than K returns fewer rows
+    return RetrievalContext(query_embedding=[1.0, 0.0], neighbors=neighbors, k=FEW_SHOT_K)
+
+
+def llm_answer(category_id="water", confidence=0.8, is_urgent=True) -> str:
+    return json.dumps({
+        "category_id": category_id, "confidence": confidence, "reasoning": "схоже", "is_urgent": is_urgent,
+    })
+
+
+@pytest.fixture(autouse=True)
+def no_completion_cache(monkeypatch):
+    monkeypatch.setattr(llm_client, "get_completion_cache", lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch) -> CategorySnapshot:
+    snapshot = CategorySnapshot(
+        categories=MappingProxyType(CATEGORIES),
+        categories_list="\n".join(f"- {c.id}: {c.name} - {c.description}" for c in CATEGORIES.values()),
+        loaded_at=datetime.now(timezone.utc),
+    )
+    monkeypatch.setattr(category_registry, "_snapshot", snapshot)
+    return snapshot
+
+
+@pytest.fixture
+def classifier() -> LLMClassifier:
+    classifier = LLMClassifier(session=None)
+    classifier.llm = fake_llm(llm_answer())
+    return classifier
+
+
+class TestLLMClassifier:
+    """Few-shot classification with the category registry"""
+
+    def test_classify(self, classifier):
+        """The prompt lists the registry categories and the neighbor examples"""
+        category, confidence, reasoning, is_urgent = classifier.classify("Немає води третій день", context=make_context())
+
+        assert (category, confidence, reasoning, is_urgent) == ("water", 0.8, "схоже", True)
+        prompt = classifier.llm.async_client.calls[0]["prompt"]
+        assert "- water: Водопостачання - Проблеми з водою" in prompt
+        assert 'Text: "Немає води"' in prompt and 'Text: "Тече кран"' in prompt
+
+    async def test_aclassify(self, classifier):
+        category, *_ = await classifier.aclassify("Немає води третій день", context=make_context())
+        assert category == "water"
+
+    def test_unknown_category_becomes_other(self, classifier):
+        classifier.llm = fake_llm(llm_answer("gas"))
+        category, confidence, _, is_urgent = classifier.classify("Пахне газом", context=make_context())
+        assert (category, confidence, is_urgent) == ("other", 0.5, False)
+
+    def test_markdown_wrapped_answer(self, classifier):
+        classifier.llm = fake_llm(f"```json\n{llm_answer()}\n```")
+        category, *_ = classifier.classify("Немає води", context=make_context())
+        assert category == "water"
+
+    def test_unparsable_answer(self, classifier):
+        classifier.llm = fake_llm("не JSON")
+        category, _, reasoning, _ = classifier.classify("Немає води", context=make_context())
+        assert category == "other"
+        assert "parsing error" in reasoning
+
+    def test_format_result_uses_registry(self, classifier):
+        result = classifier._format_result("water", 0.8, "схоже", True)
+        assert result["category_name"] == "Водопостачання"
+        with pytest.raises(ValueError):
+            classifier._format_result("gas", 0.8, "", False)
+
+
+class TestLLMClassifierBatch:
+    """Batch classification: shared embedding call and neighbor search, concurrent LLM calls"""
+
+    @pytest.fixture
+    def retrieval(self, monkeypatch) -> dict:
+        calls = {"embed": [], "search": []}
+
+        class FakeEmbeddings:
+            def embed_documents(self, texts):
+                calls["embed"].append(list(texts))
+                return [[float(i), 1.0] for i in range(len(texts))]
+
+            async def aembed_documents(self, texts):
+                return self.embed_documents(texts)
+
+        def find_batch(session, query_embeddings, k):
+            calls["search"].append((len(query_embeddings), k))
+            return [make_context().neighbors for _ in query_embeddings]
+
+        monkeypatch.setattr(llm_classifier, "get_embeddings", lambda: FakeEmbeddings())
+        monkeypatch.setattr(llm_classifier, "find_nearest_examples_batch", find_batch)
+        return calls
+
+    def test_one_embedding_call_for_batch(self, classifier, retrieval):
+        texts = ["Немає води", "Тече кран", "Немає гарячої води"]
+        results = classifier.classify_batch(texts)
+
+        assert [result[0] for result in results] == ["water"] * 3
+        assert retrieval["embed"] == [texts]
+        assert retrieval["search"] == [(3, FEW_SHOT_K)]
+        assert len(classifier.llm.async_client.calls) == 3
+
+    async def test_async_batch_bounds_llm_calls(self, classifier, retrieval, monkeypatch):
+        """One embedding call, LLM calls in flight together up to CLASSIFY_BATCH_LLM_CONCURRENCY"""
+        monkeypatch.setattr(llm_classifier.settings, "CLASSIFY_BATCH_LLM_CONCURRENCY", 2)
+        classifier.llm = fake_llm(llm_answer(), delay=0.02)
+        in_flight, peak = 0, 0
+        aclassify = classifier.aclassify
+
+        async def tracked(problem_text, context=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await aclassify(problem_text, context=context)
+            finally:
+                in_flight -= 1
+
+        monkeypatch.setattr(classifier, "aclassify", tracked)
+        texts = [f"Немає води {i}" for i in range(5)]
+        results = await classifier.aclassify_batch(texts)
+
+        assert [result[0] for result in results] == ["water"] * 5
+        assert len(retrieval["embed"]) == 1
+        assert len(classifier.llm.async_client.calls) == 5
+        assert peak == 2
+
+
+class TestCategoryRegistry:
+    """Process-wide category snapshot"""
+
+    def test_snapshot_served_without_queries(self, registry):
+        assert category_registry.get_category_registry(session=None) is registry
+        assert registry.name_of("water") == "Водопостачання"
+        assert registry.name_of("gas") == ""
+
+    def test_invalidate_reloads(self, monkeypatch, registry):
+        """After invalidation the next access loads a new snapshot"""
+        loads = []
+        monkeypatch.setattr(CategorySnapshot, "load", classmethod(lambda cls, session: loads.append(session) or registry))
+
+        category_registry.invalidate_category_registry()
+        category_registry.get_category_registry("session")
+        assert loads == ["session"]
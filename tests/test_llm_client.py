@@ -0,0 +1,101 @@
+"""
+Unit tests for the LLM and embeddings wrappers (sync and native async paths).
+
+No network: the OpenAI-compatible clients are replaced by tests/fakes.py.
+
+To run tests:
+    uv run pytest tests/test_llm_client.py -v
+"""
+
+import threading
+
+import pytest
+
+from app.llm import client as llm_client
+from app.llm.client import SimpleEmbeddings
+from app.services.classifier.base_classifier import BaseClassifier
+from tests.fakes import FakeAsyncOpenAI, FakeOpenAI, fake_llm
+
+
+@pytest.fixture(autouse=True)
+def no_completion_cache(monkeypatch):
+    monkeypatch.setattr(llm_client, "get_completion_cache", lambda: None)
+
+
+class TestSimpleLLM:
+    """Completion calls"""
+
+    def test_invoke(self):
+        """Blocking call with temperature 0"""
+        llm = fake_llm("відповідь")
+        assert llm.invoke("питання").content == "відповідь"
+        assert llm.async_client.calls[0]["temperature"] == 0.0
+
+    async def test_ainvoke_uses_async_client(self):
+        """The async path awaits the async client, nothing runs in a thread"""
+        llm = fake_llm("відповідь")
+        llm.client = None
+        assert (await llm.ainvoke("питання")).content == "відповідь"
+
+    async def test_generate_text_passes_temperature(self):
+        llm = fake_llm("текст")
+        assert await llm.generate_text("prompt", temperature=0.3) == "текст"
+        assert llm.async_client.calls[0]["temperature"] == 0.3
+
+    async def test_generate_text_rejects_empty_response(self):
+        """A missing completion is an error, not an empty appeal"""
+        with pytest.raises(ValueError):
+            await fake_llm(None).generate_text("prompt")
+
+    async def test_astream_yields_non_empty_deltas(self):
+        """Empty and missing deltas are skipped, the stream is closed at the end"""
+        llm = fake_llm(["Шановний", None, "", " пане"])
+        assert [delta async for delta in llm.astream("prompt")] == ["Шановний", " пане"]
+        assert llm.async_client.stream.closed
+
+    async def test_astream_closed_when_consumer_stops(self):
+        """A client disconnect releases the provider stream"""
+        llm = fake_llm(["a", "b", "c"])
+        stream = llm.astream("prompt")
+        assert await anext(stream) == "a"
+        await stream.aclose()
+        assert llm.async_client.stream.closed
+
+
+class TestSimpleEmbeddings:
+    """Embedding calls"""
+
+    @pytest.fixture
+    def embeddings(self) -> SimpleEmbeddings:
+        embeddings = SimpleEmbeddings.__new__(SimpleEmbeddings)
+        embeddings.async_client = FakeAsyncOpenAI()
+        embeddings.client = FakeOpenAI(embeddings.async_client)
+        embeddings.model = "fake-embedding"
+        return embeddings
+
+    def test_embed_documents_one_call(self, embeddings):
+        """Several texts share one API call, results keep the input order"""
+        assert embeddings.embed_documents(["a", "bbb"]) == [[1.0, 1.0], [3.0, 1.0]]
+        assert len(embeddings.async_client.calls) == 1
+
+    async def test_async_embed(self, embeddings):
+        assert await embeddings.aembed_query("ab") == [2.0, 1.0]
+        assert await embeddings.aembed_documents(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+
+    async def test_empty_batch_makes_no_call(self, embeddings):
+        assert embeddings.embed_documents([]) == []
+        assert await embeddings.aembed_documents([]) == []
+        assert embeddings.async_client.calls == []
+
+
+class TestDefaultAsyncClassify:
+    """Strategies without a native async path"""
+
+    async def test_sync_classify_runs_in_worker_thread(self):
+        """The default aclassify keeps blocking work off the event loop thread"""
+        class BlockingClassifier(BaseClassifier):
+            def classify(self, problem_text):
+                return "water", 1.0, threading.current_thread().name, False
+
+        _, _, thread_name, _ = await BlockingClassifier(session=None).aclassify("Немає води")
+        assert thread_name != threading.current_thread().name
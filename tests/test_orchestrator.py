@@ -0,0 +1,248 @@
+"""
+Unit tests for the end-to-end orchestration flow.
+
+No database or LLM: the classifier, the service router and the appeal
+generator are replaced by in-memory stubs.
+
+To run tests:
+    uv run pytest tests/test_orchestrator.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from app.schemas.base import PersonalInfo
+from app.schemas.orchestration import OrchestrationRequest
+from app.schemas.services import ServiceInfo, ServiceResponse
+from app.services import orchestrator
+from app.services.orchestrator import OrchestrationService
+
+CLASSIFICATION = {
+    "category_id": "water",
+    "category_name": "Водопостачання",
+    "category_description": "Проблеми з водою",
+    "confidence": 0.9,
+    "is_urgent": True,
+    "reasoning": "k-NN",
+}
+
+
+class StubClassifier:
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+
+    async def aclassify_with_category(self, problem_text: str) -> dict:
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return dict(CLASSIFICATION)
+
+
+class StubRouter:
+    """Records routing arguments, answers with one fixed service"""
+
+    def __init__(self):
+        self.calls = []
+
+    def find_responsible_service(self, category_id, is_urgent, street_name, house_number):
+        self.calls.append((category_id, is_urgent, street_name, house_number))
+        return ServiceResponse(
+            category_id=category_id,
+            category_name="Водопостачання",
+            confidence=1.0,
+            is_urgent=is_urgent,
+            service_info=ServiceInfo(service_type="emergency", service_name="Львівводоканал"),
+            reasoning="stub",
+        )
+
+
+def make_service(classifier: StubClassifier | None = None) -> OrchestrationService:
+    service = OrchestrationService.__new__(OrchestrationService)
+    service.session = None
+    service.classifier = classifier or StubClassifier()
+    service.service_router = StubRouter()
+    return service
+
+
+def make_request(address: str | None = "вул. Городоцька, 15") -> OrchestrationRequest:
+    return OrchestrationRequest(
+        user_info=PersonalInfo(name="Іван", address=address, phone="+380671234567"),
+        problem_text="Немає холодної води у квартирі",
+    )
+
+
+class TestProcessCompleteFlow:
+    """Classification + routing run concurrently with appeal generation"""
+
+    async def test_branches_run_concurrently(self, monkeypatch):
+        """Total time is the slower branch, not the sum of both"""
+        async def generate_appeal_text(request):
+            await asyncio.sleep(0.2)
+            return "Звернення"
+
+        monkeypatch.setattr(orchestrator, "generate_appeal_text", generate_appeal_text)
+        service = make_service(StubClassifier(delay=0.2))
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await service.process_complete_flow(make_request())
+
+        assert loop.time() - started < 0.35
+        assert response.appeal_text == "Звернення"
+        assert response.classification.category_id == "water"
+        assert response.service.service_info.service_name == "Львівводоканал"
+
+    async def test_routing_uses_parsed_address(self, monkeypatch):
+        """The service is resolved from the category and the parsed street / house"""
+        async def generate_appeal_text(request):
+            return "Звернення"
+
+        monkeypatch.setattr(orchestrator, "generate_appeal_text", generate_appeal_text)
+        service = make_service()
+
+        await service.process_complete_flow(make_request())
+
+        (category_id, is_urgent, street, house), = service.service_router.calls
+        assert (category_id, is_urgent, house) == ("water", True, "15")
+        assert "Городоцька" in street
+
+    async def test_failure_cancels_other_branch(self, monkeypatch):
+        """A classification error is raised as is and the appeal generation is cancelled"""
+        cancelled = asyncio.Event()
+
+        async def generate_appeal_text(request):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        monkeypatch.setattr(orchestrator, "generate_appeal_text", generate_appeal_text)
+        service = make_service(StubClassifier(error=ValueError("bad input")))
+
+        with pytest.raises(ValueError, match="bad input"):
+            await service.process_complete_flow(make_request())
+        assert cancelled.is_set()
+
+
+def stream_appeal(chunks, delay: float = 0.0, error: Exception | None = None):
+    async def stream_appeal_text(request):
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+        if error is not None:
+            raise error
+
+    return stream_appeal_text
+
+
+async def collect(events) -> list:
+    return [event async for event in events]
+
+
+class TestStreamCompleteFlow:
+    """Stage events of the streaming /solve"""
+
+    async def test_events_then_done(self, monkeypatch):
+        """Classification, service and appeal chunks are all streamed, done carries the full response"""
+        monkeypatch.setattr(orchestrator, "stream_appeal_text", stream_appeal(["Прошу", " усунути"]))
+        events = await collect(make_service().stream_complete_flow(make_request()))
+
+        names = [event.event for event in events]
+        assert names[-1] == "done"
+        assert names.index("classification") < names.index("service")
+        assert [event.data["delta"] for event in events if event.event == "appeal_delta"] == ["Прошу", " усунути"]
+        assert events[-1].data["appeal_text"] == "Прошу усунути"
+        assert events[-1].data["classification"]["category_id"] == "water"
+
+    async def test_classification_does_not_wait_for_appeal(self, monkeypatch):
+        """A fast stage is sent before a slow one finishes"""
+        monkeypatch.setattr(orchestrator, "stream_appeal_text", stream_appeal(["a", "b", "c"], delay=0.05))
+        events = await collect(make_service().stream_complete_flow(make_request()))
+
+        names = [event.event for event in events]
+        assert names.index("service") < len(names) - 2
+        assert names[-2] == "appeal_delta"
+
+    async def test_stage_error_is_last_event(self, monkeypatch):
+        """A failed stage ends the stream with an error event and cancels the other branch"""
+        monkeypatch.setattr(orchestrator, "stream_appeal_text", stream_appeal(["a"] * 100, delay=0.05))
+        service = make_service(StubClassifier(error=ValueError("bad input")))
+
+        events = await collect(service.stream_complete_flow(make_request()))
+
+        assert events[-1].event == "error"
+        assert events[-1].data == {"stage": "routing", "status_code": 400, "detail": "bad input"}
+        assert len(events) < 10
+
+    async def test_empty_appeal_is_error(self, monkeypatch):
+        """An appeal stream without text is reported as an appeal stage error"""
+        monkeypatch.setattr(orchestrator, "stream_appeal_text", stream_appeal([]))
+        events = await collect(make_service(StubClassifier(delay=0.05)).stream_complete_flow(make_request()))
+
+        assert events[-1].event == "error"
+        assert events[-1].data["stage"] == "appeal"
+
+
+class StubVoiceService:
+    def __init__(self, transcript: str = "", error: Exception | None = None):
+        self.transcript = transcript
+        self.error = error
+
+    async def atranscribe_audio(self, audio_file, mime_type, content_sha256=None):
+        if self.error is not None:
+            raise self.error
+        return self.transcript
+
+
+class TestStreamVoiceFlow:
+    """Voice note -> transcript -> contacts -> streamed solve"""
+
+    async def test_transcript_without_address(self, monkeypatch):
+        """A voice note without an address is solved, the appeal is written without one"""
+        appeal_requests = []
+
+        async def stream_appeal_text(request):
+            appeal_requests.append(request)
+            yield "Звернення"
+
+        monkeypatch.setattr(orchestrator, "stream_appeal_text", stream_appeal_text)
+        monkeypatch.setattr(
+            orchestrator, "get_voice_service", lambda: StubVoiceService("Мене звати Іван Петренко. Третій день немає води.")
+        )
+
+        events = await collect(make_service().stream_voice_flow(None, "audio/webm"))
+
+        names = [event.event for event in events]
+        assert names[:2] == ["transcription", "user_info"]
+        assert events[1].data == {"name": "Іван Петренко", "address": None, "phone": None}
+        assert names[-1] == "done"
+        assert appeal_requests[0].address == ""
+
+    async def test_solve_without_address(self, monkeypatch):
+        """The same holds for /solve requests without an address"""
+        appeal_requests = []
+
+        async def generate_appeal_text(request):
+            appeal_requests.append(request)
+            return "Звернення"
+
+        monkeypatch.setattr(orchestrator, "generate_appeal_text", generate_appeal_text)
+        await make_service().process_complete_flow(make_request(address=None))
+        assert appeal_requests[0].address == ""
+
+    async def test_transcription_timeout(self, monkeypatch):
+        monkeypatch.setattr(orchestrator, "get_voice_service", lambda: StubVoiceService(error=TimeoutError()))
+        events = await collect(make_service().stream_voice_flow(None, "audio/webm"))
+
+        assert [event.event for event in events] == ["error"]
+        assert events[0].data["status_code"] == 504
+
+    async def test_empty_transcript(self, monkeypatch):
+        monkeypatch.setattr(orchestrator, "get_voice_service", lambda: StubVoiceService(""))
+        events = await collect(make_service().stream_voice_flow(None, "audio/webm"))
+
+        assert [event.event for event in events] == ["transcription", "user_info", "error"]
+        assert events[-1].data["status_code"] == 400
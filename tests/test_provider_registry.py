@@ -0,0 +1,57 @@
+"""
+Unit tests for the shared provider client registry.
+
+No network: clients are created (which opens no connection) and closed.
+
+To run tests:
+    uv run pytest tests/test_provider_registry.py -v
+"""
+
+import pytest
+
+from app.llm import registry
+from app.llm.client import get_embeddings, get_gemini_client, get_llm
+
+
+@pytest.fixture
+async def fresh_registry():
+    """No registry before the test, closed after it"""
+    await registry.close_provider_clients()
+    yield
+    await registry.close_provider_clients()
+
+
+class TestProviderRegistry:
+    """One set of pooled clients per process"""
+
+    async def test_init_is_idempotent(self, fresh_registry):
+        """Repeated init returns the same clients"""
+        assert registry.init_provider_clients() is registry.init_provider_clients()
+
+    async def test_lazy_creation(self, fresh_registry):
+        """Scripts get a registry on first use without the lifespan"""
+        assert registry._clients is None
+        assert registry.get_provider_clients() is registry._clients
+
+    async def test_wrappers_share_clients(self, fresh_registry):
+        """Every LLM / embeddings wrapper reuses the pooled clients"""
+        clients = registry.get_provider_clients()
+        llm, embeddings = get_llm(), get_embeddings(cached=False)
+
+        assert llm.client is clients.openai is embeddings.client
+        assert llm.async_client is clients.async_openai is embeddings.async_client
+        assert get_gemini_client().model is clients.transcription_model
+
+    async def test_pool_limits_from_settings(self, fresh_registry, monkeypatch):
+        """Connection pool limits come from LLM_HTTP_* settings"""
+        monkeypatch.setattr(registry.settings, "LLM_HTTP_MAX_CONNECTIONS", 7)
+        monkeypatch.setattr(registry.settings, "LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", 3)
+        limits = registry._http_limits()
+        assert (limits.max_connections, limits.max_keepalive_connections) == (7, 3)
+
+    async def test_close_drops_registry(self, fresh_registry):
+        """After shutdown the next use creates new clients"""
+        first = registry.get_provider_clients()
+        await registry.close_provider_clients()
+        assert registry._clients is None
+        assert registry.get_provider_clients() is not first
@@ -0,0 +1,159 @@
+"""
+Unit tests for the classification result cache and its data-version stamp.
+
+No database or LLM: the version query is answered by a fake session.
+
+To run tests:
+    uv run pytest tests/test_result_cache.py -v
+"""
+
+import pytest
+
+from app.services.classifier import result_cache
+
+
+class FakeResult:
+    def __init__(self, value: str):
+        self.value = value
+
+    def scalar_one(self) -> str:
+        return self.value
+
+
+class FakeSession:
+    """Answers the version query with `version`, counting queries"""
+
+    def __init__(self, version: str):
+        self.version = version
+        self.queries = 0
+
+    def execute(self, statement):
+        self.queries += 1
+        return FakeResult(self.version)
+
+
+@pytest.fixture(autouse=True)
+def fresh_version_state(monkeypatch):
+    """Start every test without a known version and with an empty cache"""
+    monkeypatch.setattr(result_cache, "_data_version", None)
+    monkeypatch.setattr(result_cache, "_version_checked_at", 0.0)
+    monkeypatch.setattr(result_cache, "_version_refreshing", False)
+    result_cache._result_cache.clear()
+    yield
+    result_cache._result_cache.clear()
+
+
+@pytest.fixture
+def invalidations(monkeypatch) -> list[str]:
+    """Record registry / k-NN index invalidations instead of touching the real ones"""
+    calls = []
+    monkeypatch.setattr(result_cache, "invalidate_category_registry", lambda: calls.append("categories"))
+    monkeypatch.setattr(result_cache, "invalidate_knn_index", lambda: calls.append("knn"))
+    return calls
+
+
+class TestDataVersion:
+    """Version stamp checks and invalidation on data changes"""
+
+    def test_version_is_rate_limited(self, monkeypatch, invalidations):
+        """Within the check interval the database is asked once"""
+        monkeypatch.setattr(result_cache.settings, "CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS", 60)
+        session = FakeSession("v1")
+
+        assert result_cache.get_data_version(session) == "v1"
+        assert result_cache.get_data_version(session) == "v1"
+        assert session.queries == 1
+        assert invalidations == []
+
+    def test_change_clears_results_registry_and_knn_index(self, monkeypatch, invalidations):
+        """A new stamp drops cached results, the category registry and the k-NN index"""
+        monkeypatch.setattr(result_cache.settings, "CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS", 0)
+        session = FakeSession("v1")
+        key = result_cache.classification_cache_key(result_cache.get_data_version(session), "Немає води", ("knn", 3))
+        result_cache.store_result(key, {"category_id": "water", "confidence": 0.9})
+        assert result_cache.get_cached_result(key) is not None
+
+        session.version = "v2"
+        assert result_cache.get_data_version(session) == "v2"
+        assert result_cache.get_cached_result(key) is None
+        assert invalidations == ["categories", "knn"]
+
+    def test_unchanged_version_keeps_results(self, monkeypatch, invalidations):
+        """Re-checking an unchanged stamp invalidates nothing"""
+        monkeypatch.setattr(result_cache.settings, "CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS", 0)
+        session = FakeSession("v1")
+        key = result_cache.classification_cache_key(result_cache.get_data_version(session), "Немає води", ("knn", 3))
+        result_cache.store_result(key, {"category_id": "water"})
+
+        result_cache.get_data_version(session)
+        assert session.queries == 2
+        assert result_cache.get_cached_result(key) == {"category_id": "water"}
+        assert invalidations == []
+
+    def test_refresh_in_progress_serves_previous_version(self, monkeypatch, invalidations):
+        """While one thread queries, the others keep the last stamp instead of queuing on the lock"""
+        monkeypatch.setattr(result_cache, "_data_version", "v1")
+        monkeypatch.setattr(result_cache, "_version_refreshing", True)
+        session = FakeSession("v2")
+
+        assert result_cache.get_data_version(session) == "v1"
+        assert session.queries == 0
+
+    def test_failed_query_does_not_block_next_check(self, monkeypatch, invalidations):
+        """A database error is raised and the next call queries again"""
+        class BrokenSession:
+            def execute(self, statement):
+                raise RuntimeError("connection lost")
+
+        with pytest.raises(RuntimeError):
+            result_cache.get_data_version(BrokenSession())
+        assert result_cache.get_data_version(FakeSession("v1")) == "v1"
+
+    async def test_async_version_skips_worker_thread_when_fresh(self, monkeypatch, invalidations):
+        """A fresh stamp is returned without a database call"""
+        monkeypatch.setattr(result_cache.settings, "CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS", 60)
+        session = FakeSession("v1")
+
+        assert await result_cache.aget_data_version(session) == "v1"
+        assert await result_cache.aget_data_version(session) == "v1"
+        assert session.queries == 1
+
+    def test_version_query_scans_no_table(self):
+        """The stamp reads max(id) and the write counters only, no count(*) over the tables"""
+        query = str(result_cache.DATA_VERSION_QUERY)
+        assert "count(" not in query
+        assert "max(id)" in query and "pg_stat_user_tables" in query
+
+    def test_invalidate_forces_recheck(self, monkeypatch, invalidations):
+        """invalidate_classification_cache drops everything and the next lookup queries again"""
+        monkeypatch.setattr(result_cache.settings, "CLASSIFICATION_CACHE_VERSION_CHECK_SECONDS", 60)
+        session = FakeSession("v1")
+        result_cache.get_data_version(session)
+
+        result_cache.invalidate_classification_cache()
+        result_cache.get_data_version(session)
+        assert session.queries == 2
+        assert invalidations == ["categories", "knn"]
+
+
+class TestResultCache:
+    """Stored results"""
+
+    def test_other_is_not_cached(self):
+        """'other' also covers transient failures and is never pinned"""
+        key = result_cache.classification_cache_key("v1", "текст", ("knn", 3))
+        result_cache.store_result(key, {"category_id": "other"})
+        assert result_cache.get_cached_result(key) is None
+
+    def test_key_uses_normalized_text(self):
+        """Case and whitespace differences map to the same entry"""
+        first = result_cache.classification_cache_key("v1", "Немає  води", ("knn", 3))
+        second = result_cache.classification_cache_key("v1", " немає води ", ("knn", 3))
+        assert first == second
+
+    def test_returned_result_is_a_copy(self):
+        """Callers may mutate the result without changing the cached entry"""
+        key = result_cache.classification_cache_key("v1", "текст", ("knn", 3))
+        result_cache.store_result(key, {"category_id": "water"})
+        result_cache.get_cached_result(key)["category_id"] = "changed"
+        assert result_cache.get_cached_result(key) == {"category_id": "water"}
@@ -0,0 +1,170 @@
+"""
+Unit tests for nearest-neighbor retrieval helpers.
+
+No database: SQL statements are captured by a fake session and answered
+with prepared rows.
+
+To run tests:
+    uv run pytest tests/test_retrieval.py -v
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.scripts.vector_index import index_ops
+from app.services.classifier import retrieval
+from app.services.classifier.retrieval import MAX_COSINE_DISTANCE, Neighbors
+
+
+def row(id, category_id="water", is_urgent=False, text="text", distance=0.1, **extra):
+    return SimpleNamespace(id=id, category_id=category_id, is_urgent=is_urgent, text=text, distance=distance, **extra)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Records executed statements, answers the last one with `rows`"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    def exec(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+
+class TestNeighbors:
+    """Ranked neighbor arrays"""
+
+    def test_rows_to_neighbors(self):
+        """Rows become parallel arrays in the same order"""
+        neighbors = retrieval._to_neighbors([row(1, "water", True, "a", 0.1), row(2, "heating", False, "b", 0.3)])
+
+        assert list(neighbors.ids) == [1, 2]
+        assert list(neighbors.category_ids) == ["water", "heating"]
+        assert list(neighbors.is_urgent) == [True, False]
+        assert list(neighbors.texts) == ["a", "b"]
+        np.testing.assert_allclose(neighbors.distances, [0.1, 0.3])
+
+    def test_missing_distances_are_farthest(self):
+        """NULL (missing embedding) and NaN (zero vector) distances become the maximum distance"""
+        neighbors = retrieval._to_neighbors([row(1, distance=None), row(2, distance=float("nan"))])
+        assert list(neighbors.distances) == [MAX_COSINE_DISTANCE, MAX_COSINE_DISTANCE]
+
+    def test_empty(self):
+        """No rows, no neighbors"""
+        assert len(retrieval._to_neighbors([])) == 0
+
+    def test_head(self):
+        """head keeps the K closest neighbors of every array"""
+        neighbors = retrieval._to_neighbors([row(i, distance=i / 10) for i in range(1, 6)])
+        head = neighbors.head(2)
+
+        assert isinstance(head, Neighbors)
+        assert list(head.ids) == [1, 2]
+        assert len(head.texts) == len(head.category_ids) == len(head.is_urgent) == len(head.distances) == 2
+
+
+class TestFindNearestExamples:
+    """Single-query pgvector search"""
+
+    def test_selects_only_vote_and_prompt_columns(self, monkeypatch):
+        """Embeddings stay in the database: only ids, labels, text and the distance are selected"""
+        monkeypatch.setattr(retrieval.settings, "VECTOR_INDEX_TYPE", "none")
+        session = FakeSession([row(1), row(2)])
+
+        neighbors = retrieval.find_nearest_examples(session, [0.1, 0.2], k=2)
+
+        assert len(neighbors) == 2
+        columns = [column.name for column in session.statements[-1].selected_columns]
+        assert columns == ["id", "category_id", "is_urgent", "text", "distance"]
+        assert session.statements[-1]._limit == 2
+
+
+class TestSearchTuning:
+    """ANN search parameters set before each neighbor query"""
+
+    def test_hnsw_sets_ef_search(self, monkeypatch):
+        """HNSW: hnsw.ef_search, local to the transaction"""
+        monkeypatch.setattr(retrieval.settings, "VECTOR_INDEX_TYPE", "hnsw")
+        monkeypatch.setattr(retrieval.settings, "HNSW_EF_SEARCH", 80)
+        session = FakeSession()
+
+        retrieval.apply_search_tuning(session)
+
+        statement = session.statements[0]
+        assert "set_config('hnsw.ef_search', :value, true)" in str(statement)
+        assert statement.compile().params == {"value": "80"}
+
+    def test_ivfflat_sets_probes(self, monkeypatch):
+        """IVFFlat: ivfflat.probes"""
+        monkeypatch.setattr(retrieval.settings, "VECTOR_INDEX_TYPE", "ivfflat")
+        monkeypatch.setattr(retrieval.settings, "IVFFLAT_PROBES", 12)
+        session = FakeSession()
+
+        retrieval.apply_search_tuning(session)
+
+        assert "ivfflat.probes" in str(session.statements[0])
+        assert session.statements[0].compile().params == {"value": "12"}
+
+    def test_none_skips_tuning(self, monkeypatch):
+        """Without an ANN index no setting is sent"""
+        monkeypatch.setattr(retrieval.settings, "VECTOR_INDEX_TYPE", "none")
+        session = FakeSession()
+        retrieval.apply_search_tuning(session)
+        assert session.statements == []
+
+
+class TestIndexDDL:
+    """CREATE INDEX statements of the vector_index admin command and the init script"""
+
+    def test_hnsw_statement(self):
+        """Cosine-distance HNSW index with the build parameters"""
+        sql = index_ops.build_index_sql("hnsw", "ix_examples_embedding_hnsw", m=16, ef_construction=64)
+        assert sql == (
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_examples_embedding_hnsw "
+            "ON examples USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        )
+
+    def test_ivfflat_statement(self):
+        """Cosine-distance IVFFlat index with the number of lists"""
+        sql = index_ops.build_index_sql("ivfflat", "ix_examples_embedding_ivfflat", lists=30)
+        assert sql.endswith("USING ivfflat (embedding vector_cosine_ops) WITH (lists = 30)")
+
+    def test_unknown_method_rejected(self):
+        """Only hnsw and ivfflat are supported"""
+        with pytest.raises(ValueError):
+            index_ops.build_index_sql("flat", "ix")
+
+    def test_default_ivfflat_lists(self):
+        """rows / 1000 up to 1M rows (at least 1), sqrt(rows) above"""
+        assert index_ops.default_ivfflat_lists(0) == 1
+        assert index_ops.default_ivfflat_lists(50_000) == 50
+        assert index_ops.default_ivfflat_lists(4_000_000) == 2000
+
+
+class TestRetrievalContext:
+    """Neighbors shared between classifier stages"""
+
+    @pytest.fixture
+    def context(self) -> retrieval.RetrievalContext:
+        neighbors = retrieval._to_neighbors([row(i, distance=i / 10) for i in range(1, 6)])
+        return retrieval.RetrievalContext(query_embedding=[0.1, 0.2], neighbors=neighbors, k=5)
+
+    def test_smaller_k_is_served_from_context(self, context):
+        """A stage needing fewer neighbors gets the closest ones"""
+        assert list(context.neighbors_for(3).ids) == [1, 2, 3]
+        assert list(context.neighbors_for(5).ids) == [1, 2, 3, 4, 5]
+
+    def test_larger_k_needs_new_retrieval(self, context):
+        """A context retrieved with a smaller K cannot answer, the caller searches again"""
+        assert context.neighbors_for(6) is None
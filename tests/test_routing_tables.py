@@ -0,0 +1,225 @@
+"""
+Unit tests for the compiled routing tables and the ServiceRouter hierarchy.
+
+No database: tables are compiled from in-memory services and assignments,
+the building lookup is stubbed.
+
+To run tests:
+    uv run pytest tests/test_routing_tables.py -v
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import routing_tables, service_resolver, table_version
+from app.services.routing_tables import (
+    CITYWIDE_MONOPOLISTS_CATEGORIES,
+    HOTLINE_NAME,
+    RA_CATEGORIES,
+    RoutingService,
+    RoutingTables,
+    district_search_name,
+)
+from app.services.service_resolver import ServiceRouter
+from app.services.table_version import TableVersion
+
+
+def service(service_id, name, type, is_emergency=False) -> RoutingService:
+    return RoutingService(
+        service_id=service_id, name_ua=name, type=type, phone_main=None, email_main=None,
+        address_legal=None, website=None, is_emergency=is_emergency,
+    )
+
+
+SERVICES = [
+    service(1, "Аварійна служба Водоканалу", "КП", is_emergency=True),
+    service(2, "ОСББ Городоцька 15", "ОСББ"),
+    service(3, "ЛКП Західне", "ЛКП/УК"),
+    service(4, "Залізнична районна адміністрація", "РА"),
+    service(5, "Франківська районна адміністрація", "РА"),
+    service(6, "Львівводоканал", "КП"),
+    service(7, HOTLINE_NAME, "Гаряча лінія"),
+]
+
+# (service_id, category_id, building_id, coverage_level, is_primary), assignment_id order
+ASSIGNMENTS = [
+    (1, "water_supply", None, "citywide", True),
+    (2, "elevator", 10, "building", True),
+    (3, "roof", 10, "building", True),
+    (3, "roof", 20, "building", False),
+    (4, "roads", None, "district", True),
+    (5, "roads", None, "district", True),
+    (6, "water_supply", None, "citywide", True),
+    (99, "gas", None, "citywide", True),
+    # Building-level categories that also have district / citywide rows
+    (4, "elevator", None, "district", True),
+    (6, "sewage", None, "citywide", True),
+]
+
+
+def compile_tables(services=SERVICES, assignments=ASSIGNMENTS, districts=("Залізничний",)) -> RoutingTables:
+    return RoutingTables.compile(
+        services=services,
+        assignments=assignments,
+        districts=districts,
+        district_categories=RA_CATEGORIES,
+        citywide_categories=CITYWIDE_MONOPOLISTS_CATEGORIES,
+    )
+
+
+class TestRoutingTables:
+    """Lookups compiled from services and assignments"""
+
+    def test_emergency_by_category(self):
+        tables = compile_tables()
+        assert tables.emergency_service("water_supply").service_id == 1
+        assert tables.emergency_service("roads") is None
+
+    def test_building_category_assignment_wins(self):
+        """An explicit (building, category) assignment beats the building's first service"""
+        tables = compile_tables()
+        assert tables.building_service(10, "roof").service_id == 3
+        assert tables.building_service(10, "sewage").service_id == 2
+
+    def test_non_primary_building_assignment_ignored(self):
+        assert compile_tables().building_service(20, "roof") is None
+
+    def test_district_service_by_name(self):
+        """Districts are matched by the feminine form used in administration names, also for unknown districts"""
+        tables = compile_tables()
+        assert district_search_name("Залізничний") == "Залізнична"
+        assert tables.district_service("Залізничний", "roads").service_id == 4
+        assert tables.district_service("Франківський", "roads").service_id == 5
+        assert tables.district_service("Сихівський", "roads") is None
+
+    def test_first_citywide_assignment_wins(self):
+        """Like the former SQL .first(): the lowest assignment id"""
+        assert compile_tables().citywide_service("water_supply").service_id == 1
+
+    def test_category_levels_are_configured_lists(self):
+        """A РА or citywide КП row does not move a category to another routing level"""
+        tables = compile_tables()
+        assert tables.district_categories == set(RA_CATEGORIES)
+        assert tables.citywide_categories == set(CITYWIDE_MONOPOLISTS_CATEGORIES)
+
+    def test_hotline_and_counts(self):
+        tables = compile_tables()
+        assert tables.hotline.service_id == 7
+        assert tables.assignments_count == len(ASSIGNMENTS)
+        # Assignment of an unknown service is skipped
+        assert tables.citywide_service("gas") is None
+
+
+class VersionSession:
+    """Answers the version stamp query with `version`, counting queries"""
+
+    def __init__(self, version: str):
+        self.version = version
+        self.queries = 0
+
+    def execute(self, statement):
+        self.queries += 1
+        return SimpleNamespace(scalar_one=lambda: self.version)
+
+
+class TestRoutingTablesRefresh:
+    """Process-wide tables recompiled when services, assignments or buildings change"""
+
+    @pytest.fixture
+    def data(self, monkeypatch) -> dict:
+        data = {"services": [], "assignments": [], "loads": 0}
+
+        def load(cls, session):
+            data["loads"] += 1
+            return compile_tables(data["services"], data["assignments"])
+
+        monkeypatch.setattr(RoutingTables, "load", classmethod(load))
+        monkeypatch.setattr(routing_tables, "_tables", None)
+        monkeypatch.setattr(routing_tables, "_routing_version", TableVersion({"services": "service_id"}))
+        monkeypatch.setattr(table_version.settings, "ROUTING_DATA_VERSION_CHECK_SECONDS", 0)
+        return data
+
+    def test_unchanged_data_reuses_tables(self, data):
+        session = VersionSession("v1")
+        first = routing_tables.get_routing_tables(session)
+        assert routing_tables.get_routing_tables(session) is first
+        assert data["loads"] == 1
+
+    def test_seeded_data_reaches_next_lookup(self, data):
+        """Tables compiled before seeding are empty, the next lookup after the change sees the services"""
+        session = VersionSession("v1")
+        assert routing_tables.get_routing_tables(session).emergency_service("water_supply") is None
+
+        data["services"], data["assignments"] = SERVICES, ASSIGNMENTS
+        session.version = "v2"
+
+        tables = routing_tables.get_routing_tables(session)
+        assert tables.emergency_service("water_supply").service_id == 1
+        assert tables.version == "v2"
+        assert data["loads"] == 2
+
+    def test_version_check_is_rate_limited(self, data, monkeypatch):
+        """Within the check interval the stamp is not queried and the tables stay"""
+        monkeypatch.setattr(table_version.settings, "ROUTING_DATA_VERSION_CHECK_SECONDS", 60)
+        session = VersionSession("v1")
+        first = routing_tables.get_routing_tables(session)
+        queries = session.queries
+
+        session.version = "v2"
+        assert routing_tables.get_routing_tables(session) is first
+        assert session.queries == queries
+
+        routing_tables.invalidate_routing_tables()
+        assert routing_tables.get_routing_tables(session).version == "v2"
+
+
+class TestServiceRouter:
+    """Routing hierarchy over the compiled tables"""
+
+    @pytest.fixture
+    def router(self, monkeypatch) -> ServiceRouter:
+        tables = compile_tables()
+        categories = SimpleNamespace(name_of=lambda category_id: category_id.title())
+        monkeypatch.setattr(service_resolver, "get_routing_tables", lambda session=None: tables)
+        monkeypatch.setattr(service_resolver, "get_category_registry", lambda session=None: categories)
+
+        router = ServiceRouter(session=None)
+        router.building = SimpleNamespace(building_id=10, district="Залізничний")
+        monkeypatch.setattr(router, "_find_building", lambda street, house, city="Львів": router.building)
+        return router
+
+    def test_urgent_goes_to_emergency(self, router):
+        response = router.find_responsible_service("water_supply", True, "Городоцька", "15")
+        assert response.service_info.service_name == "Аварійна служба Водоканалу"
+        assert response.confidence == 0.95
+
+    def test_building_level(self, router):
+        response = router.find_responsible_service("elevator", False, "Городоцька", "15")
+        assert response.service_info.service_name == "ОСББ Городоцька 15"
+
+    def test_district_level(self, router):
+        response = router.find_responsible_service("roads", False, "Городоцька", "15")
+        assert response.service_info.service_name == "Залізнична районна адміністрація"
+
+    def test_citywide_level(self, router):
+        response = router.find_responsible_service("water_supply", False, "Городоцька", "15")
+        assert response.service_info.service_type == "КП"
+
+    @pytest.mark.parametrize("category_id, service_name", [
+        ("roads", "Залізнична районна адміністрація"),
+        ("water_supply", "Аварійна служба Водоканалу"),
+        # Assigned to a РА / citywide КП too, still routed to the building's ОСББ
+        ("elevator", "ОСББ Городоцька 15"),
+        ("sewage", "ОСББ Городоцька 15"),
+        ("roof", "ЛКП Західне"),
+    ])
+    def test_branch_per_category(self, router, category_id, service_name):
+        response = router.find_responsible_service(category_id, False, "Городоцька", "15")
+        assert response.service_info.service_name == service_name
+
+    def test_unknown_building_falls_back_to_hotline(self, router):
+        router.building = None
+        response = router.find_responsible_service("elevator", False, "Невідома", "1")
+        assert response.service_info.service_name == HOTLINE_NAME
+        assert response.confidence == 0.1
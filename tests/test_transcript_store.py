@@ -0,0 +1,167 @@
+"""
+Unit tests for the content-addressed transcript store and the transcription slots.
+
+No provider calls: transcriptions are async stubs, uploads are in-memory files.
+
+To run tests:
+    uv run pytest tests/test_transcript_store.py -v
+"""
+
+import asyncio
+import io
+
+import pytest
+
+from app.services import voice
+from app.services.transcript_store import TranscriptStore
+from app.services.voice import VoiceService
+
+
+@pytest.fixture
+def store() -> TranscriptStore:
+    return TranscriptStore(maxsize=10, ttl_seconds=None)
+
+
+def reader(data: bytes = b"audio", reads: list | None = None):
+    async def read_audio():
+        if reads is not None:
+            reads.append(data)
+        return data
+
+    return read_audio
+
+
+def transcriber(result: str = "текст", delay: float = 0.0, error: Exception | None = None, calls: list | None = None):
+    async def transcribe(data):
+        if calls is not None:
+            calls.append(data)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return transcribe
+
+
+class TestTranscriptStore:
+    """Stored transcripts and single-flight calls"""
+
+    async def test_stored_transcript_reused(self, store):
+        calls = []
+        assert await store.get_or_transcribe("k", reader(), transcriber(calls=calls)) == "текст"
+        assert await store.get_or_transcribe("k", reader(), transcriber(calls=calls)) == "текст"
+        assert len(calls) == 1
+
+    async def test_concurrent_requests_share_one_call(self, store):
+        """Identical uploads in flight together make one provider call, only the first is read"""
+        calls, reads = [], []
+        results = await asyncio.gather(*(
+            store.get_or_transcribe("k", reader(reads=reads), transcriber(delay=0.05, calls=calls)) for _ in range(3)
+        ))
+
+        assert results == ["текст"] * 3
+        assert (len(calls), len(reads)) == (1, 1)
+        assert store.stats()["coalesced"] == 2
+        assert store.stats()["in_flight"] == 0
+
+    async def test_one_waiter_leaving_keeps_call(self, store):
+        calls = []
+        first = asyncio.create_task(store.get_or_transcribe("k", reader(), transcriber(delay=0.05, calls=calls)))
+        second = asyncio.create_task(store.get_or_transcribe("k", reader(), transcriber(delay=0.05, calls=calls)))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        assert await second == "текст"
+        assert len(calls) == 1
+
+    async def test_last_waiter_leaving_cancels_call(self, store):
+        cancelled = asyncio.Event()
+
+        async def transcribe(data):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        request = asyncio.create_task(store.get_or_transcribe("k", reader(), transcribe))
+        await asyncio.sleep(0.01)
+        request.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0.01)
+        assert store.stats()["in_flight"] == 0
+
+    async def test_failures_and_empty_transcripts_not_stored(self, store):
+        with pytest.raises(RuntimeError):
+            await store.get_or_transcribe("k", reader(), transcriber(error=RuntimeError("provider error")))
+        assert await store.get_or_transcribe("k", reader(), transcriber("")) == ""
+
+        calls = []
+        await store.get_or_transcribe("k", reader(), transcriber(calls=calls))
+        assert len(calls) == 1
+
+
+class TestTranscriptionSlots:
+    """Uploads are copied into memory only inside a transcription slot"""
+
+    @pytest.fixture
+    def slots(self, monkeypatch) -> asyncio.Semaphore:
+        slots = asyncio.Semaphore(1)
+        monkeypatch.setattr(voice, "_transcription_slots", slots)
+        monkeypatch.setattr(voice, "get_transcript_store", lambda: TranscriptStore(maxsize=10, ttl_seconds=None))
+        monkeypatch.setattr(voice.settings, "VOICE_LONG_AUDIO_ENABLED", False)
+        return slots
+
+    @pytest.fixture
+    def service(self, monkeypatch) -> VoiceService:
+        service = VoiceService.__new__(VoiceService)
+        service.release = asyncio.Event()
+
+        def transcribe_audio(audio_file, mime_type):
+            asyncio.run_coroutine_threadsafe(service.release.wait(), service.loop).result()
+            return audio_file.read().decode()
+
+        service.transcribe_audio = transcribe_audio
+        return service
+
+    async def test_queued_upload_not_read_until_slot_free(self, slots, service):
+        service.loop = asyncio.get_running_loop()
+        first_file, second_file = io.BytesIO(b"first"), io.BytesIO(b"second")
+        reads = []
+        original_read = second_file.read
+        second_file.read = lambda *args: reads.append("second") or original_read(*args)
+
+        first = asyncio.create_task(service.atranscribe_audio(first_file, "audio/webm", "sha-1"))
+        second = asyncio.create_task(service.atranscribe_audio(second_file, "audio/webm", "sha-2"))
+        await asyncio.sleep(0.05)
+        assert reads == []
+
+        service.release.set()
+        assert await asyncio.gather(first, second) == ["first", "second"]
+        assert reads == ["second"]
+        assert not slots.locked()
+
+    async def test_slot_returned_when_request_leaves(self, slots, service):
+        """A cancelled request gives its slot back, also before the call has started running"""
+        service.loop = asyncio.get_running_loop()
+        request = asyncio.create_task(service.atranscribe_audio(io.BytesIO(b"audio"), "audio/webm", "sha"))
+        await asyncio.sleep(0.01)
+        assert slots.locked()
+
+        request.cancel()
+        service.release.set()
+        await asyncio.gather(request, return_exceptions=True)
+        await asyncio.sleep(0.05)
+        assert not slots.locked()
+
+    async def test_slot_returned_for_coalesced_request(self, slots, service):
+        service.loop = asyncio.get_running_loop()
+        requests = [
+            asyncio.create_task(service.atranscribe_audio(io.BytesIO(b"audio"), "audio/webm", "sha")) for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+
+        service.release.set()
+        assert await asyncio.gather(*requests) == ["audio", "audio"]
+        assert not slots.locked()
@@ -0,0 +1,198 @@
+"""
+Unit tests for streaming, size-limited audio uploads and their lifetime in /voice/solve.
+
+No server: requests are built from an ASGI scope and a receive callable
+that delivers the body in small chunks.
+
+To run tests:
+    uv run pytest tests/test_uploads.py -v
+"""
+
+import hashlib
+
+import pytest
+from starlette.requests import ClientDisconnect, Request
+
+from app.api.routes import voice as voice_route
+from app.schemas.orchestration import OrchestrationEvent
+from app.utils.uploads import AudioUploadError, detect_audio_mime_type, receive_audio_upload
+
+WAV = b"RIFF\x24\x00\x00\x00WAVEfmt " + b"\x00" * 200
+BOUNDARY = "testboundary"
+
+
+def multipart_body(content: bytes, field="audio", filename="voice.wav", content_type="audio/wav") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(body: bytes, content_type: str, chunk_size: int = 7) -> tuple[Request, list]:
+    """Request whose body arrives in chunk_size pieces; the list collects consumed chunks"""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    consumed = []
+
+    async def receive():
+        chunk = chunks[len(consumed)]
+        consumed.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": len(consumed) < len(chunks)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/voice/transcribe",
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())],
+    }
+    return Request(scope, receive), consumed
+
+
+MULTIPART = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+class TestDetectAudioMimeType:
+    """Container format from magic bytes"""
+
+    @pytest.mark.parametrize(
+        "head, mime_type",
+        [
+            (WAV[:12], "audio/wav"),
+            (b"OggS\x00\x02" + b"\x00" * 6, "audio/ogg"),
+            (b"\x1a\x45\xdf\xa3" + b"\x00" * 8, "audio/webm"),
+            (b"\x00\x00\x00\x20ftypM4A ", "audio/mp4"),
+            (b"ID3\x04" + b"\x00" * 8, "audio/mpeg"),
+            (b"\xff\xfb\x90\x00" + b"\x00" * 8, "audio/mpeg"),
+            (b"%PDF-1.4\n...", None),
+        ],
+    )
+    def test_formats(self, head, mime_type):
+        assert detect_audio_mime_type(head) == mime_type
+
+
+class TestReceiveAudioUpload:
+    """Multipart and raw audio bodies"""
+
+    async def test_multipart_file(self):
+        request, _ = make_request(multipart_body(WAV), MULTIPART)
+        upload = await receive_audio_upload(request, allowed_types=["audio/wav"])
+        try:
+            assert (upload.mime_type, upload.declared_type, upload.filename) == ("audio/wav", "audio/wav", "voice.wav")
+            assert upload.size == len(WAV)
+            assert upload.sha256 == hashlib.sha256(WAV).hexdigest()
+            assert upload.file.read() == WAV
+        finally:
+            upload.close()
+
+    async def test_raw_audio_body(self):
+        request, _ = make_request(WAV, "audio/wav")
+        upload = await receive_audio_upload(request)
+        assert (upload.mime_type, upload.filename, upload.size) == ("audio/wav", "upload", len(WAV))
+        upload.close()
+
+    async def test_content_sniffed_not_trusted(self):
+        """A non-audio file labeled as audio is rejected from its first bytes"""
+        request, consumed = make_request(multipart_body(b"%PDF-1.4\n" + b"x" * 500), MULTIPART)
+        with pytest.raises(AudioUploadError, match="not a supported audio format"):
+            await receive_audio_upload(request)
+        assert len(consumed) < 30
+
+    async def test_size_limit_stops_reading(self):
+        """The upload is rejected as soon as the limit is crossed, the rest of the body is not read"""
+        request, consumed = make_request(multipart_body(WAV + b"\x00" * 5000), MULTIPART, chunk_size=64)
+        request.scope["headers"] = [(b"content-type", MULTIPART.encode())]
+        with pytest.raises(AudioUploadError) as error:
+            await receive_audio_upload(request, max_bytes=1000)
+        assert error.value.status_code == 413
+        assert len(consumed) < 30
+
+    async def test_content_length_checked_first(self):
+        request, consumed = make_request(WAV * 10_000, "audio/wav")
+        with pytest.raises(AudioUploadError) as error:
+            await receive_audio_upload(request, max_bytes=1000)
+        assert error.value.status_code == 413
+        assert consumed == []
+
+    async def test_declared_type_not_allowed(self):
+        request, _ = make_request(multipart_body(WAV, content_type="video/mp4"), MULTIPART)
+        with pytest.raises(AudioUploadError, match="Unsupported format"):
+            await receive_audio_upload(request, allowed_types=["audio/wav"])
+
+    async def test_missing_field(self):
+        request, _ = make_request(multipart_body(WAV, field="file"), MULTIPART)
+        with pytest.raises(AudioUploadError, match="No audio file"):
+            await receive_audio_upload(request)
+
+    async def test_empty_file(self):
+        request, _ = make_request(multipart_body(b""), MULTIPART)
+        with pytest.raises(AudioUploadError, match="empty"):
+            await receive_audio_upload(request)
+
+    async def test_unsupported_request_type(self):
+        request, _ = make_request(b"{}", "application/json")
+        with pytest.raises(AudioUploadError, match="content type"):
+            await receive_audio_upload(request)
+
+
+class StubOrchestration:
+    """Yields one transcription event, records whether the voice flow started"""
+
+    started = False
+
+    def __init__(self, session):
+        pass
+
+    async def stream_voice_flow(self, audio_file, mime_type, content_sha256=None):
+        StubOrchestration.started = True
+        yield OrchestrationEvent(event="transcription", data={"transcription": audio_file.read().decode()[:4]})
+
+
+class TestVoiceSolveUpload:
+    """/voice/solve closes the spooled upload however the response ends"""
+
+    @pytest.fixture
+    def uploads(self, monkeypatch) -> list:
+        uploads = []
+
+        async def receive(request, **kwargs):
+            upload = await receive_audio_upload(request, **kwargs)
+            uploads.append(upload)
+            return upload
+
+        monkeypatch.setattr(voice_route, "receive_audio_upload", receive)
+        monkeypatch.setattr(voice_route, "OrchestrationService", StubOrchestration)
+        monkeypatch.setattr(StubOrchestration, "started", False)
+        return uploads
+
+    async def response(self):
+        request, _ = make_request(multipart_body(WAV), MULTIPART)
+        return await voice_route.solve_voice(request, db=None)
+
+    async def test_client_gone_before_first_chunk(self, uploads):
+        """The generator never runs, the upload is closed anyway"""
+        response = await self.response()
+
+        async def send(message):
+            raise OSError("client disconnected")
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        assert uploads[0].file.closed
+        assert not StubOrchestration.started
+
+    async def test_closed_after_last_event(self, uploads):
+        response = await self.response()
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        assert b'"transcription":"RIFF"' in b"".join(message.get("body", b"") for message in messages)
+        assert uploads[0].file.closed
@@ -0,0 +1,223 @@
+"""
+Unit tests for live voice streaming: PCM segmentation, the stream session and the websocket route.
+
+No provider calls: segments are transcribed by an async stub, audio is
+synthesized with NumPy.
+
+To run tests:
+    uv run pytest tests/test_voice_stream.py -v
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from starlette.websockets import WebSocketDisconnected
+
+from app.api.routes import voice as voice_route
+from app.services import voice
+from app.services.voice import VoiceStreamSession
+from app.utils.audio import PCMSegmenter
+
+RATE = 8000
+
+
+def tone(seconds: float) -> bytes:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (8000 * np.sin(2 * np.pi * 440 * t)).astype("<i2").tobytes()
+
+
+def silence(seconds: float) -> bytes:
+    return bytes(2 * int(seconds * RATE))
+
+
+def make_segmenter() -> PCMSegmenter:
+    return PCMSegmenter(
+        sample_rate=RATE, channels=1, min_segment_seconds=1.0, max_segment_seconds=3.0,
+        pause_seconds=0.3, silence_rms=300.0,
+    )
+
+
+class TestPCMSegmenter:
+    """Closing live segments"""
+
+    def test_pause_closes_segment(self):
+        segmenter = make_segmenter()
+        assert segmenter.feed(tone(1.5)) == []
+
+        segment, = segmenter.feed(silence(0.4))
+        assert segment.duration_seconds == pytest.approx(1.9, abs=0.01)
+        assert segmenter.flush() is None
+
+    def test_short_speech_waits_for_min_length(self):
+        """A pause before min_segment_seconds does not close the segment"""
+        segmenter = make_segmenter()
+        assert segmenter.feed(tone(0.3) + silence(0.4)) == []
+        assert segmenter.flush() is not None
+
+    def test_max_length_cut(self):
+        """Continuous speech is cut at max_segment_seconds"""
+        segmenter = make_segmenter()
+        segments = segmenter.feed(tone(7.0))
+        assert segments
+        assert all(1.0 <= segment.duration_seconds <= 3.0 for segment in segments)
+
+        rest = segmenter.flush()
+        assert rest.duration_seconds <= 3.0
+        assert sum(segment.duration_seconds for segment in segments) + rest.duration_seconds == pytest.approx(7.0)
+
+    def test_silent_segments_dropped(self):
+        segmenter = make_segmenter()
+        assert segmenter.feed(silence(2.0)) == []
+        assert segmenter.flush() is None
+        assert segmenter.received_seconds == pytest.approx(2.0)
+
+    def test_frames_split_across_feeds(self):
+        """Odd byte counts are buffered until the frame is complete"""
+        segmenter = make_segmenter()
+        data = tone(1.5) + silence(0.4)
+        segments = segmenter.feed(data[:1001]) + segmenter.feed(data[1001:])
+        assert len(segments) == 1
+
+
+class StubVoiceService:
+    """Transcribes the N-th segment to "sN", after `delays` (one per segment)"""
+
+    def __init__(self, delays=(), errors=()):
+        self.delays = list(delays)
+        self.errors = set(errors)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def atranscribe_pcm(self, segment):
+        call = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delays[call] if call < len(self.delays) else 0)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if call in self.errors:
+            raise RuntimeError("provider error")
+        return f"s{call}"
+
+
+@pytest.fixture
+def stream_settings(monkeypatch):
+    monkeypatch.setattr(voice.settings, "VOICE_STREAM_MIN_SEGMENT_SECONDS", 1.0)
+    monkeypatch.setattr(voice.settings, "VOICE_CHUNK_MAX_SECONDS", 3.0)
+    monkeypatch.setattr(voice.settings, "VOICE_STREAM_PAUSE_SECONDS", 0.3)
+    monkeypatch.setattr(voice.settings, "VOICE_STREAM_SILENCE_RMS", 300.0)
+    monkeypatch.setattr(voice.settings, "VOICE_STREAM_MAX_SECONDS", 60.0)
+
+
+def make_session(service: StubVoiceService) -> tuple[VoiceStreamSession, list]:
+    events = []
+
+    async def send(event):
+        events.append(event)
+
+    return VoiceStreamSession(service, sample_rate=RATE, channels=1, send=send), events
+
+
+@pytest.mark.usefixtures("stream_settings")
+class TestVoiceStreamSession:
+    """Background transcription of closed segments"""
+
+    async def test_transcript_in_speaking_order(self):
+        """A later segment finishing first does not jump ahead in the transcript"""
+        session, events = make_session(StubVoiceService(delays=[0.05, 0.0]))
+        session.feed(tone(1.5) + silence(0.4))
+        session.feed(tone(1.5) + silence(0.4))
+
+        assert await session.finish() == "s0 s1"
+        first, second = events
+        assert (first.segment, first.transcript) == (1, "")
+        assert (second.segment, second.transcript) == (0, "s0 s1")
+
+    async def test_rest_transcribed_on_finish(self):
+        session, events = make_session(StubVoiceService())
+        session.feed(tone(0.5))
+        assert await session.finish() == "s0"
+        assert [event.event for event in events] == ["segment"]
+
+    async def test_failed_segment_reported_and_skipped(self):
+        session, events = make_session(StubVoiceService(errors={0}))
+        session.feed(tone(1.5) + silence(0.4))
+        session.feed(tone(1.5) + silence(0.4))
+
+        assert await session.finish() == "s1"
+        assert [event.event for event in events].count("error") == 1
+
+    async def test_too_long_stream(self, monkeypatch):
+        monkeypatch.setattr(voice.settings, "VOICE_STREAM_MAX_SECONDS", 1.0)
+        session, _ = make_session(StubVoiceService())
+        with pytest.raises(ValueError):
+            session.feed(silence(1.5))
+
+    async def test_close_cancels_segments_in_flight(self):
+        service = StubVoiceService(delays=[10.0])
+        session, events = make_session(service)
+        session.feed(tone(1.5) + silence(0.4))
+        await asyncio.sleep(0)
+
+        await session.aclose()
+        assert events == []
+        assert session._tasks == set()
+
+
+class GoneClientSocket:
+    """WebSocket whose client sends `messages` and goes away: sends fail like Starlette's after a close"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    async def accept(self):
+        pass
+
+    async def receive(self) -> dict:
+        if self.messages:
+            return self.messages.pop(0)
+        await asyncio.sleep(0.05)
+        return {"type": "websocket.disconnect", "code": 1001}
+
+    async def send_text(self, data: str):
+        raise WebSocketDisconnected('Cannot call "send" once a close message has been sent.')
+
+    async def close(self, code: int = 1000):
+        raise WebSocketDisconnected('Cannot call "send" once a close message has been sent.')
+
+
+@pytest.mark.usefixtures("stream_settings")
+class TestStreamRoute:
+    """/voice/stream when the client disconnects with transcript events pending"""
+
+    @pytest.fixture
+    def service(self, monkeypatch) -> StubVoiceService:
+        service = StubVoiceService(delays=[0.02, 10.0])
+        monkeypatch.setattr(voice_route, "get_voice_service", lambda: service)
+        return service
+
+    async def test_pending_segment_event_after_disconnect(self, service):
+        """The segment and final events cannot be sent: the stream ends like a disconnect"""
+        socket = GoneClientSocket([
+            {"type": "websocket.receive", "bytes": tone(1.5) + silence(0.4)},
+            {"type": "websocket.receive", "text": "end"},
+        ])
+        await asyncio.wait_for(voice_route.stream_voice(socket, sample_rate=RATE), timeout=1)
+        assert service.calls == 1
+
+    async def test_disconnect_cancels_segments_in_flight(self, service):
+        """A failed segment event and a segment still transcribing: the stream returns, nothing keeps running"""
+        socket = GoneClientSocket([
+            {"type": "websocket.receive", "bytes": tone(1.5) + silence(0.4)},
+            {"type": "websocket.receive", "bytes": tone(1.5) + silence(0.4)},
+        ])
+        await asyncio.wait_for(voice_route.stream_voice(socket, sample_rate=RATE), timeout=1)
+        assert (service.calls, service.cancelled) == (2, 1)
+
+    async def test_rejected_stream_after_disconnect(self, service, monkeypatch):
+        """The error event of a too long stream cannot be sent either"""
+        monkeypatch.setattr(voice.settings, "VOICE_STREAM_MAX_SECONDS", 1.0)
+        socket = GoneClientSocket([{"type": "websocket.receive", "bytes": silence(1.5)}])
+        await asyncio.wait_for(voice_route.stream_voice(socket, sample_rate=RATE), timeout=1)